@@ -2,12 +2,54 @@ import os
 import streamlit as st
 from dotenv import load_dotenv, find_dotenv
 from src.common.helpers import QuizManager, rerun
-from src.generation.question_generator import QuestionGenerator
+from src.bank.question_bank import get_question_bank
+from src.storage.results_store import get_results_store, rows_to_csv
+from src.storage.session_store import get_session_store
+from src.api.client import QuizAPIClient
 from utils.logger import get_logger
+from utils.metrics import start_metrics_server
 
 # Professional environment setup
 logger = get_logger(__name__)
 
+# Prometheus-style /metrics endpoint (idempotent across Streamlit reruns)
+if os.getenv("METRICS_PORT"):
+    start_metrics_server(int(os.getenv("METRICS_PORT")))
+
+def restore_session():
+    """
+    Carrega a sessão do store do servidor (id em `?sid=` na URL) ou cria uma
+    nova: um refresh da página ou a troca de pod não perdem o quiz em andamento.
+    """
+    store = get_session_store()
+    manager, ui = None, {}
+    if store is not None:
+        session_id = st.query_params.get("sid")
+        state = store.get(session_id) if session_id else None
+        if state:
+            manager = QuizManager.restore(state["manager"])
+            ui = state.get("ui", {})
+    manager = manager or QuizManager()
+    if store is not None:
+        st.query_params["sid"] = manager.session_id
+    st.session_state.quiz_manager = manager
+    st.session_state.quiz_generated = ui.get("quiz_generated", False)
+    st.session_state.quiz_submitted = ui.get("quiz_submitted", False)
+
+def persist_session():
+    """Grava o snapshot compacto da sessão no store do servidor (se habilitado)."""
+    store = get_session_store()
+    if store is None:
+        return
+    manager = st.session_state.quiz_manager
+    store.put(manager.session_id, {
+        "manager": manager.snapshot(),
+        "ui": {
+            "quiz_generated": st.session_state.quiz_generated,
+            "quiz_submitted": st.session_state.quiz_submitted,
+        },
+    })
+
 def main():
     st.set_page_config(
         page_title="Study Buddy AI | Industrial Edition", 
@@ -17,11 +59,7 @@ def main():
 
     # Initialize Session State (Enterprise Pattern)
     if 'quiz_manager' not in st.session_state:
-        st.session_state.quiz_manager = QuizManager()
-    if 'quiz_generated' not in st.session_state:
-        st.session_state.quiz_generated = False
-    if 'quiz_submitted' not in st.session_state:
-        st.session_state.quiz_submitted = False
+        restore_session()
 
     st.title("🎓 Study Buddy AI")
     st.markdown("---")
@@ -45,24 +83,65 @@ def main():
     num_questions = st.sidebar.slider("Number of Questions", 1, 10, 3)
 
     # 2. Generation Logic
-    if st.sidebar.button("Generate Quiz") and topic:
-        with st.spinner(f"AI is crafting your {difficulty} quiz about {topic}..."):
-            try:
-                generator = QuestionGenerator()
-                st.session_state.quiz_manager.generate_questions(
-                    generator=generator,
-                    topic=topic,
-                    question_type=question_type,
-                    difficulty=difficulty,
-                    num_questions=num_questions
-                )
-                st.session_state.quiz_generated = True
-                st.session_state.quiz_submitted = False
-                logger.info(f"New quiz generated | Topic: {topic} | Qty: {num_questions}")
-                rerun()
-            except Exception as e:
-                logger.error(f"Failed to initiate quiz generation: {str(e)}")
-                st.error("We encountered an issue with the AI provider. Please try again.")
+    generate_clicked = st.sidebar.button("Generate Quiz") and topic
+    api_base_url = os.getenv("API_BASE_URL")
+
+    if generate_clicked and api_base_url:
+        # Thin-client mode: LLM work runs in the API service (src/api/server.py)
+        try:
+            with st.spinner(f"AI is crafting your {difficulty} quiz about {topic}..."):
+                quiz = QuizAPIClient(api_base_url).generate_quiz(topic, question_type, difficulty, num_questions)
+            st.session_state.quiz_manager.load_questions(
+                quiz["questions"], topic, question_type, difficulty, quiz.get("usage")
+            )
+            st.session_state.quiz_generated = True
+            st.session_state.quiz_submitted = False
+            persist_session()
+            logger.info(f"New quiz generated via API | Topic: {topic} | Qty: {num_questions}")
+            rerun()
+        except Exception as e:
+            logger.error(f"Failed to fetch quiz from API: {str(e)}")
+            st.error("The quiz service is busy or unavailable. Please try again.")
+
+    elif generate_clicked:
+        # Local mode (streaming: each question is shown as soon as it is ready)
+        from src.generation.question_generator import QuestionGenerator
+        st.caption(f"AI is crafting your {difficulty} quiz about {topic}...")
+        progress = st.progress(0.0)
+        previews = [st.empty() for _ in range(num_questions)]
+        ready = 0
+        try:
+            generator = QuestionGenerator()
+            events = st.session_state.quiz_manager.iter_questions(
+                generator=generator,
+                topic=topic,
+                question_type=question_type,
+                difficulty=difficulty,
+                num_questions=num_questions,
+                max_concurrency=int(os.getenv("QUIZ_MAX_CONCURRENCY", "4")),
+                batch_size=int(os.getenv("QUIZ_BATCH_SIZE", "0")) or None,
+                bank=get_question_bank(),
+                stream_tokens=True
+            )
+            for event in events:
+                slot = previews[event.index]
+                if event.kind == "progress":
+                    slot.caption(f"Question {event.index+1}: receiving... ({event.chars} chars)")
+                elif event.kind == "question":
+                    ready += 1
+                    slot.markdown(f"**Question {event.index+1}:** {event.record['question']}")
+                    progress.progress(ready / num_questions)
+                else:
+                    slot.warning(f"Question {event.index+1} could not be generated.")
+
+            st.session_state.quiz_generated = True
+            st.session_state.quiz_submitted = False
+            persist_session()
+            logger.info(f"New quiz generated | Topic: {topic} | Qty: {num_questions}")
+            rerun()
+        except Exception as e:
+            logger.error(f"Failed to initiate quiz generation: {str(e)}")
+            st.error("We encountered an issue with the AI provider. Please try again.")
 
     # 3. Quiz Display and Interaction
     if st.session_state.quiz_generated and not st.session_state.quiz_submitted:
@@ -84,6 +163,7 @@ def main():
             if st.form_submit_button("Submit Answers"):
                 st.session_state.quiz_manager.evaluate_quiz(user_responses)
                 st.session_state.quiz_submitted = True
+                persist_session()
                 logger.info("User submitted quiz for evaluation.")
                 rerun()
 
@@ -91,13 +171,11 @@ def main():
     if st.session_state.quiz_submitted:
         st.subheader("📊 Your Performance")
         results = st.session_state.quiz_manager.results
-        
-        correct_count = sum(1 for r in results if r['is_correct'])
-        score = (correct_count / len(results)) * 100
+        correct_count, total, score = st.session_state.quiz_manager.score()
         
         col1, col2 = st.columns(2)
         col1.metric("Score", f"{score:.1f}%")
-        col2.metric("Correct", f"{correct_count}/{len(results)}")
+        col2.metric("Correct", f"{correct_count}/{total}")
 
         for i, res in enumerate(results):
             with st.expander(f"Question {i+1} - {'✅ Correct' if res['is_correct'] else '❌ Incorrect'}"):
@@ -109,20 +187,24 @@ def main():
         # 5. DataOps: Export Results
         st.markdown("---")
         if st.button("💾 Export Results to CSV"):
-            saved_path = st.session_state.quiz_manager.save_to_csv()
-            if saved_path:
-                with open(saved_path, "rb") as f:
-                    st.download_button(
-                        label="📥 Download Dataset",
-                        data=f,
-                        file_name=os.path.basename(saved_path),
-                        mime="text/csv"
-                    )
-                st.success(f"Results archived for monitoring in {saved_path}")
+            manager = st.session_state.quiz_manager
+            store = get_results_store()
+            manager.save_results(store)
+            persist_session()
+            # Download only contains this session's rows, streamed from the store
+            csv_data = "".join(rows_to_csv(store.iter_rows(manager.session_id)))
+            st.download_button(
+                label="📥 Download Dataset",
+                data=csv_data.encode("utf-8"),
+                file_name=f"quiz_results_{manager.session_id[:8]}.csv",
+                mime="text/csv"
+            )
+            st.success(f"Results archived for monitoring in {store.path}")
 
         if st.button("🔄 Take New Quiz"):
             st.session_state.quiz_generated = False
             st.session_state.quiz_submitted = False
+            persist_session()
             rerun()
 
 if __name__ == "__main__":
@@ -0,0 +1,177 @@
+"""
+Benchmark do pipeline de geração contra o FakeChatModel (sem custo de API).
+
+Compara os modos serial / concorrente / lote para vários tamanhos de quiz e
+emite JSON (questões/s, latência p50/p95/p99 por quiz, retries, tokens de
+prompt por chamada, overhead de parsing e custo de `evaluate_quiz`) para
+acompanhar regressões.
+
+Uso:
+    python -m benchmarks.bench_generation --sizes 1,5,10 --repeats 5 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+from src.common.helpers import QuizManager
+from src.generation.question_generator import QuestionGenerator
+from src.llm.fake_llm import FakeChatModel
+from src.llm.llm_client import get_llm_client
+from utils.metrics import metrics
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ParseTimer:
+    """Accumulates time spent turning completions into validated objects."""
+
+    def __init__(self, generator: QuestionGenerator):
+        self.seconds = 0.0
+        for name in ("_parse_or_repair", "_collect_valid_items"):
+            setattr(generator, name, self._timed(getattr(generator, name)))
+        original = generator._aparse_or_repair
+
+        async def _timed_async(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - started
+
+        generator._aparse_or_repair = _timed_async
+
+    def _timed(self, fn):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - started
+        return wrapper
+
+
+def build_generator(args) -> tuple:
+    fake = FakeChatModel(
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+    generator = QuestionGenerator(llm_client=get_llm_client(args.config, provider="fake"), cache=False)
+    generator.llm = fake
+    return generator, fake
+
+
+def run_case(args, mode: str, size: int) -> dict:
+    generator, fake = build_generator(args)
+    parse_timer = ParseTimer(generator)
+    metrics.reset()
+    manager = QuizManager()
+    options = {
+        "serial": {"max_concurrency": 1},
+        "concurrent": {"max_concurrency": args.concurrency},
+        "batched": {"max_concurrency": args.concurrency, "batch_size": args.batch_size},
+    }[mode]
+
+    latencies, produced, failures = [], 0, 0
+    eval_seconds = 0.0
+    started_all = time.perf_counter()
+    for _ in range(args.repeats):
+        started = time.perf_counter()
+        try:
+            questions = asyncio.run(manager.agenerate_questions(
+                generator, args.topic, args.question_type, "Medium", size, **options
+            ))
+        except Exception:
+            failures += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+        produced += len(questions)
+
+        responses = [q.get("correct_answer", q.get("answer")) for q in questions]
+        eval_started = time.perf_counter()
+        manager.evaluate_quiz(responses)
+        eval_seconds += time.perf_counter() - eval_started
+    wall = time.perf_counter() - started_all
+    counters = metrics.snapshot()["counters"]
+    prompts = sum(counters.get("llm_prompts_total", {}).values())
+    prompt_tokens = sum(counters.get("llm_prompt_tokens_total", {}).values())
+    minimum_calls = len(latencies) * -(-size // args.batch_size) if mode == "batched" else produced
+
+    return {
+        "mode": mode,
+        "quiz_size": size,
+        "repeats": args.repeats,
+        "questions": produced,
+        "failed_quizzes": failures,
+        "questions_per_sec": round(produced / wall, 3) if wall else 0.0,
+        "quiz_latency_s": {
+            "p50": round(percentile(latencies, 0.50), 4),
+            "p95": round(percentile(latencies, 0.95), 4),
+            "p99": round(percentile(latencies, 0.99), 4),
+            "mean": round(statistics.mean(latencies), 4) if latencies else 0.0,
+        },
+        "llm_calls": fake.calls,
+        # Every call beyond the minimum for the mode is a retry or fix-up call
+        "retries": max(0, fake.calls - minimum_calls),
+        "prompt_tokens_per_call": round(prompt_tokens / prompts, 1) if prompts else 0.0,
+        "parse_overhead_ms_per_question": round(1000 * parse_timer.seconds / produced, 4) if produced else 0.0,
+        "evaluate_us_per_question": round(1e6 * eval_seconds / produced, 3) if produced else 0.0,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,5,10", help="Quiz sizes, comma separated")
+    parser.add_argument("--modes", default="serial,concurrent,batched")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--malformed-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--topic", default="Python Programming")
+    parser.add_argument("--question-type", default="Multiple Choice", choices=["Multiple Choice", "Fill in the Blank"])
+    parser.add_argument("--config", default="config/llm.yaml")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        "benchmark": "generation",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": [
+            run_case(args, mode, int(size))
+            for mode in args.modes.split(",")
+            for size in args.sizes.split(",")
+        ],
+    }
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
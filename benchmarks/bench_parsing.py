@@ -0,0 +1,219 @@
+"""
+Microbenchmark de parsing: caminho atual vs `src.generation.parsing`.
+
+Roda sobre um corpus de respostas gravadas (JSON limpo, indentado, com
+cercas markdown, com texto ao redor, com quebras de linha cruas, inválidas
+e em lote) e compara, por tipo de resposta:
+
+- `langchain`: `PydanticOutputParser` criado por chamada + `parse_json_markdown`
+  + `model_validate` (o caminho antigo do QuestionGenerator);
+- `fast`: `get_parser(schema).parse` (validadores pré-compilados, orjson,
+  `validate_json` em uma passada);
+- `stream`: `StreamingParser` alimentado em chunks + `result()`.
+
+Também mede a extração de JSON em uma completion truncada e cheia de chaves,
+onde reiniciar a varredura a cada `{` é quadrático. O relatório confere que
+os dois caminhos aceitam/rejeitam as mesmas respostas.
+
+Uso:
+    python -m benchmarks.bench_parsing --repeats 200 --output parsing.json
+    python -m benchmarks.bench_parsing --corpus respostas_gravadas.jsonl
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.utils.json import parse_json_markdown
+
+from src.generation.parsing import get_parser, json_spans, orjson
+from src.models.schema import MCQQuestion, FillBlankQuestion
+
+SCHEMAS = {"MCQQuestion": MCQQuestion, "FillBlankQuestion": FillBlankQuestion}
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "data", "parsing_corpus.jsonl")
+
+
+def load_corpus(path: str) -> list:
+    """One recorded completion per line: {"schema", "kind", "content"}."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ---- baseline (the pre-existing code paths) -------------------------------
+
+def langchain_parse(content: str, schema):
+    parser = PydanticOutputParser(pydantic_object=schema)
+    return parser.pydantic_object.model_validate(parse_json_markdown(content))
+
+
+def langchain_batch(content: str, schema) -> list:
+    text = content.strip()
+    start, end = text.find("{"), text.rfind("}")
+    list_start = text.find("[")
+    if list_start != -1 and (start == -1 or list_start < start):
+        data = json.loads(text[list_start:text.rfind("]") + 1])
+    else:
+        data = json.loads(text[start:end + 1])
+    items = data.get("questions", []) if isinstance(data, dict) else data
+    valid = []
+    for item in items:
+        try:
+            valid.append(schema.model_validate(item))
+        except ValueError:
+            pass
+    return valid
+
+
+def restart_scan(text: str):
+    """The previous `extract_json_text`: restarts at every `{` until one balances."""
+    start = text.find("{")
+    while start != -1:
+        depth, in_string, escaped = 0, False, False
+        for pos in range(start, len(text)):
+            char = text[pos]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start:pos + 1]
+        start = text.find("{", start + 1)
+    return None
+
+
+# ---- fast path -------------------------------------------------------------
+
+def fast_parse(content: str, schema):
+    return get_parser(schema).parse(content)
+
+
+def fast_batch(content: str, schema) -> list:
+    parser = get_parser(schema)
+    valid = []
+    for item in parser.items(content):
+        try:
+            valid.append(parser.validate(item))
+        except ValueError:
+            pass
+    return valid
+
+
+def make_stream_parse(chunk_size: int):
+    def stream_parse(content: str, schema):
+        stream = get_parser(schema).stream()
+        for i in range(0, len(content), chunk_size):
+            stream.feed(content[i:i + chunk_size])
+        return stream.result()
+    return stream_parse
+
+
+# ---- measurement -----------------------------------------------------------
+
+def outcome(fn, content: str, schema):
+    try:
+        result = fn(content, schema)
+    except Exception as e:
+        return "error", type(e).__name__
+    if isinstance(result, list):
+        return "ok", len(result)
+    return "ok", result.model_dump()
+
+
+def time_per_call(fn, records: list, repeats: int) -> float:
+    """Median over `repeats` rounds of the mean microseconds per record."""
+    rounds = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for record in records:
+            try:
+                fn(record["content"], SCHEMAS[record["schema"]])
+            except Exception:
+                pass
+        rounds.append((time.perf_counter() - started) / len(records))
+    return round(statistics.median(rounds) * 1e6, 2)
+
+
+def run_kind(kind: str, records: list, repeats: int, chunk_size: int) -> dict:
+    if kind == "batch":
+        contenders = {"langchain": langchain_batch, "fast": fast_batch}
+    else:
+        contenders = {"langchain": langchain_parse, "fast": fast_parse, "stream": make_stream_parse(chunk_size)}
+
+    timings = {name: time_per_call(fn, records, repeats) for name, fn in contenders.items()}
+    mismatches = [
+        i for i, r in enumerate(records)
+        if outcome(contenders["langchain"], r["content"], SCHEMAS[r["schema"]])[0]
+        != outcome(contenders["fast"], r["content"], SCHEMAS[r["schema"]])[0]
+    ]
+    return {
+        "kind": kind,
+        "responses": len(records),
+        "us_per_response": timings,
+        "speedup_fast_vs_langchain": round(timings["langchain"] / timings["fast"], 2) if timings["fast"] else None,
+        "outcome_mismatches": mismatches,
+    }
+
+
+def run_extraction(size: int, repeats: int) -> dict:
+    """A truncated completion with many unmatched braces (worst case for restart scanning)."""
+    text = "Draft: " + '{"a": {"b": ' * size + '"cut off'
+    timings = {}
+    for name, fn in (("restart_scan", restart_scan), ("json_spans", json_spans)):
+        rounds = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            fn(text)
+            rounds.append(time.perf_counter() - started)
+        timings[name] = round(statistics.median(rounds) * 1e3, 3)
+    return {"chars": len(text), "ms": timings}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL of recorded completions")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--chunk-size", type=int, default=24, help="Characters per streamed chunk")
+    parser.add_argument("--extraction-sizes", default="100,1000", help="Unmatched-brace counts, comma separated")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    by_kind = defaultdict(list)
+    for record in load_corpus(args.corpus):
+        by_kind[record["kind"]].append(record)
+
+    report = {
+        "benchmark": "parsing",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "orjson": orjson is not None,
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": [run_kind(kind, records, args.repeats, args.chunk_size) for kind, records in by_kind.items()],
+        "extraction": [run_extraction(int(n), max(1, args.repeats // 50)) for n in args.extraction_sizes.split(",")],
+    }
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
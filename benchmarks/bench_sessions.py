@@ -0,0 +1,148 @@
+"""
+Benchmark de memória do estado por sessão (tracemalloc).
+
+Simula N sessões que recebem quizzes montados a partir de um mesmo conjunto
+de questões (o caso real com banco de questões, cache e coalescing da API:
+sessões diferentes recebem as mesmas questões, cada uma como um dict novo)
+e respondem a eles. Compara:
+
+- `legacy`: questões como dicts copiados do modelo e resultados repetindo
+  enunciado, gabarito e explicação em cada linha (representação antiga);
+- `compact`: `QuestionRecord`s internados e `QuizResult`s por referência.
+
+Também mede o snapshot de cada sessão nos session stores (memória e SQLite):
+bytes por sessão e latência de put/get.
+
+Uso:
+    python -m benchmarks.bench_sessions --sessions 100,500 --output sessions.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from src.common.helpers import QuizManager
+from src.llm.fake_llm import FakeChatModel
+from src.models.schema import MCQQuestion
+from src.storage.session_store import InProcessSessionStore, SQLiteSessionStore
+
+
+def build_pool(size: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [MCQQuestion(**FakeChatModel._mcq(rng, "Python Programming", "Medium", n)) for n in range(size)]
+
+
+def legacy_results(questions: list, responses: list) -> list:
+    """Rows as the previous `evaluate_quiz` built them (one full copy per question)."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return [{
+        'question': q['question'],
+        'user_answer': answer,
+        'correct_answer': q['correct_answer'],
+        'explanation': q.get('explanation', 'Sem explicação disponível.'),
+        'is_correct': answer == q['correct_answer'],
+        'options': q.get('options'),
+        'timestamp': timestamp,
+    } for q, answer in zip(questions, responses)]
+
+
+def simulate(mode: str, sessions: int, pool: list, quiz_size: int, seed: int) -> tuple:
+    """Builds `sessions` answered quizzes; returns (managers, traced bytes)."""
+    rng = random.Random(seed)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    managers = []
+    for _ in range(sessions):
+        # Every session gets its own dicts, as they arrive from the API / cache / bank
+        quiz = [{**q.model_dump(), 'type': 'MCQ'} for q in rng.sample(pool, quiz_size)]
+        responses = [rng.choice(q['options']) for q in quiz]
+        manager = QuizManager()
+        if mode == "legacy":
+            manager.questions = quiz
+            manager.results = legacy_results(quiz, responses)
+        else:
+            manager.load_questions(quiz, "Python Programming", "Multiple Choice", "Medium")
+            manager.evaluate_quiz(responses)
+        managers.append(manager)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return managers, used
+
+
+def bench_store(store, managers: list) -> dict:
+    put, get = [], []
+    for manager in managers:
+        started = time.perf_counter()
+        store.put(manager.session_id, manager.snapshot())
+        put.append(time.perf_counter() - started)
+    for manager in managers:
+        started = time.perf_counter()
+        QuizManager.restore(store.get(manager.session_id))
+        get.append(time.perf_counter() - started)
+    return {
+        "put_ms_p50": round(statistics.median(put) * 1e3, 3),
+        "get_restore_ms_p50": round(statistics.median(get) * 1e3, 3),
+    }
+
+
+def run_case(args, sessions: int, pool: list) -> dict:
+    result = {"sessions": sessions}
+    compact_managers = None
+    for mode in ("legacy", "compact"):
+        managers, used = simulate(mode, sessions, pool, args.quiz_size, args.seed)
+        result[mode] = {"total_kib": round(used / 1024, 1), "bytes_per_session": int(used / sessions)}
+        if mode == "compact":
+            compact_managers = managers
+        del managers
+    result["reduction"] = round(1 - result["compact"]["total_kib"] / result["legacy"]["total_kib"], 3)
+
+    snapshot_bytes = [
+        len(json.dumps(m.snapshot(), default=lambda v: dict(v) if hasattr(v, "keys") else str(v)))
+        for m in compact_managers
+    ]
+    result["snapshot_json_bytes_per_session"] = int(statistics.mean(snapshot_bytes))
+    result["memory_store"] = bench_store(InProcessSessionStore(), compact_managers)
+    with tempfile.TemporaryDirectory() as tmp:
+        result["sqlite_store"] = bench_store(SQLiteSessionStore(os.path.join(tmp, "sessions.sqlite")), compact_managers)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="100,500", help="Simulated session counts, comma separated")
+    parser.add_argument("--pool-size", type=int, default=200, help="Distinct questions shared by the sessions")
+    parser.add_argument("--quiz-size", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    pool = build_pool(args.pool_size, args.seed)
+    report = {
+        "benchmark": "sessions",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": [run_case(args, int(n), pool) for n in args.sessions.split(",")],
+    }
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Benchmark de cold start: custo de import por módulo (`python -X importtime`).
+
+Cada alvo é importado em um interpretador novo, várias vezes; o relatório
+traz o tempo total (mediana), os módulos mais caros (tempo cumulativo) e se
+SDKs que deveriam ser carregados sob demanda (pandas, langchain_groq,
+langchain_openai...) vazaram para o caminho de startup.
+
+Uso:
+    python -m benchmarks.bench_startup --repeats 5 --output startup.json
+    python -m benchmarks.bench_startup --budget-ms 1500   # exit 1 se estourar
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+DEFAULT_TARGETS = "app.app,src.common.helpers,src.generation.question_generator,src.llm.llm_client"
+# Módulos que não devem ser importados só por carregar a aplicação
+LAZY_MODULES = ["pandas", "numpy", "langchain_groq", "langchain_openai", "groq", "openai", "pyarrow"]
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Maps top-level-import name -> (self_us, cumulative_us) from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2].strip()
+        modules[name] = (self_us, cumulative_us)
+    return modules
+
+
+def measure(target: str, env: dict) -> tuple:
+    """Imports `target` in a fresh interpreter; returns (total_us, modules)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+    modules = parse_importtime(proc.stderr)
+    total = modules.get(target, (0, 0))[1]
+    return total, modules
+
+
+def run_target(target: str, repeats: int, top: int, env: dict) -> dict:
+    totals, last = [], {}
+    for _ in range(repeats):
+        total, last = measure(target, env)
+        totals.append(total)
+
+    heaviest = sorted(last.items(), key=lambda item: item[1][1], reverse=True)
+    return {
+        "target": target,
+        "total_ms_median": round(statistics.median(totals) / 1000, 2),
+        "total_ms_min": round(min(totals) / 1000, 2),
+        "modules_imported": len(last),
+        "eager_heavy_modules": [m for m in LAZY_MODULES if m in last],
+        "top_cumulative_ms": [
+            {"module": name, "cumulative_ms": round(cum / 1000, 2), "self_ms": round(own / 1000, 2)}
+            for name, (own, cum) in heaviest[:top]
+        ],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default=DEFAULT_TARGETS, help="Modules to import, comma separated")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Heaviest modules listed per target")
+    parser.add_argument("--budget-ms", type=float, help="Fail (exit 1) if any target's median exceeds this")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    results = [run_target(t, args.repeats, args.top, env) for t in args.targets.split(",")]
+    report = {
+        "benchmark": "startup",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": results,
+    }
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+    if args.budget_ms is not None:
+        over = [r["target"] for r in results if r["total_ms_median"] > args.budget_ms]
+        if over:
+            print(f"Startup budget of {args.budget_ms} ms exceeded by: {', '.join(over)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
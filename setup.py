@@ -11,4 +11,9 @@ setup(
     packages=find_packages(),
     install_requires=requirements,
     python_requires=">=3.12",
+    entry_points={
+        "console_scripts": [
+            "study-buddy-bulk=src.bulk.cli:main",
+        ],
+    },
 )
@@ -0,0 +1,23 @@
+import math
+import unicodedata
+
+# Pontuação/aspas ignoradas nas bordas da resposta ("Paris." == "paris")
+_EDGE_PUNCTUATION = "\"'`.,;:!?()[]{} "
+
+
+def normalize_answer(value) -> str:
+    """
+    Forma canônica de uma resposta para correção: Unicode NFKC, casefold,
+    espaços colapsados e pontuação das bordas removida. Vazio para None/NaN.
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    text = unicodedata.normalize("NFKC", str(value)).casefold()
+    return " ".join(text.split()).strip(_EDGE_PUNCTUATION)
+
+
+def expected_answer(record: dict):
+    """Gabarito de um registro de questão: `correct_answer` (MCQ) ou `answer` (FIB)."""
+    if record.get("correct_answer") is not None:
+        return record["correct_answer"]
+    return record.get("answer")
@@ -0,0 +1,229 @@
+"""
+Correção em lote e analytics de quizzes (coluna a coluna, com pandas/NumPy).
+
+Entradas: linhas do results store ou CSV/Parquet/JSONL enviados por
+instrutores, com ao menos `question`, `user_answer` e o gabarito
+(`correct_answer`/`answer`) ou um answer key separado.
+
+Uso:
+    python -m src.analytics.grading --source store --output-dir /tmp/quiz_analytics
+    python -m src.analytics.grading --source turma.csv --answer-key gabarito.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.answers import normalize_answer
+from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+# Distratores escolhidos por menos que isso das respostas não estão "funcionando"
+NON_FUNCTIONAL_SHARE = 0.05
+
+
+def normalize_column(values: pd.Series) -> pd.Series:
+    """
+    `normalize_answer` aplicado a uma coluna inteira: normaliza cada valor
+    distinto uma única vez (respostas se repetem muito) e expande por índice.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    table = np.array([normalize_answer(u) for u in uniques] + [""], dtype=object)
+    return pd.Series(table[codes], index=values.index, dtype=object)
+
+
+def build_answer_key(questions) -> pd.DataFrame:
+    """
+    Answer key com o gabarito normalizado uma vez por questão.
+    Aceita registros de questão (dicts do QuizManager) ou um DataFrame.
+    """
+    key = pd.DataFrame(questions).copy() if not isinstance(questions, pd.DataFrame) else questions.copy()
+    if "question" not in key.columns:
+        raise AppException("Answer key requires a 'question' column")
+
+    expected = key["correct_answer"] if "correct_answer" in key.columns else pd.Series(None, index=key.index, dtype=object)
+    if "answer" in key.columns:
+        expected = expected.where(expected.notna(), key["answer"])
+    key["correct_answer"] = expected
+    key = key.drop_duplicates("question", keep="last")
+    key["expected_norm"] = normalize_column(key["correct_answer"])
+    return key.set_index("question")
+
+
+def grade_submissions(submissions: pd.DataFrame, answer_key: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Corrige todas as respostas de uma vez. Sem `answer_key`, o gabarito de
+    cada linha (`correct_answer`/`answer`) é usado, normalizado por questão.
+    Devolve as submissões com `answer_norm`, `expected_norm` e `is_correct`.
+    """
+    if "question" not in submissions.columns or "user_answer" not in submissions.columns:
+        raise AppException("Submissions require 'question' and 'user_answer' columns")
+
+    with metrics.timer("quiz_evaluation_seconds", mode="bulk"):
+        graded = submissions.copy()
+        if answer_key is None:
+            answer_key = build_answer_key(graded)
+        key_columns = [c for c in ("correct_answer", "expected_norm", "options", "topic", "difficulty", "question_type")
+                       if c in answer_key.columns]
+        graded = graded.drop(columns=[c for c in key_columns if c in graded.columns])
+        graded = graded.join(answer_key[key_columns], on="question")
+
+        graded["answer_norm"] = normalize_column(graded["user_answer"])
+        expected = graded["expected_norm"].to_numpy()
+        graded["is_correct"] = pd.notna(expected) & (graded["answer_norm"].to_numpy() == expected)
+
+    metrics.inc("quiz_graded_responses_total", len(graded), mode="bulk")
+    return graded
+
+
+def _submission_column(graded: pd.DataFrame) -> Optional[str]:
+    for column in ("submission_id", "session_id"):
+        if column in graded.columns:
+            return column
+    return None
+
+
+def question_stats(graded: pd.DataFrame) -> pd.DataFrame:
+    """
+    Análise de itens por questão: acertos, índice de dificuldade (taxa de
+    acerto), rótulo easy/medium/hard observado e discriminação (correlação
+    ponto-bisserial entre acertar a questão e a nota no resto do quiz).
+    """
+    x = graded["is_correct"].astype(float)
+    stats = graded.assign(_x=x).groupby("question", sort=False).agg(
+        attempts=("_x", "size"), correct=("_x", "sum"), accuracy=("_x", "mean")
+    )
+    stats["correct"] = stats["correct"].astype(int)
+    for column in ("topic", "difficulty"):
+        if column in graded.columns:
+            stats[column] = graded.groupby("question", sort=False)[column].first()
+    stats["observed_difficulty"] = pd.cut(
+        stats["accuracy"], [0.0, 0.3, 0.7, 1.0], labels=["hard", "medium", "easy"], include_lowest=True
+    )
+
+    submission = _submission_column(graded)
+    if submission is None:
+        stats["discrimination"] = np.nan
+        return stats.reset_index()
+
+    # Correlação via momentos agregados (sem apply por grupo)
+    rest = graded.groupby(submission)["is_correct"].transform("sum").astype(float) - x
+    moments = pd.DataFrame({"question": graded["question"], "x": x, "r": rest,
+                            "xr": x * rest, "xx": x * x, "rr": rest * rest})
+    m = moments.groupby("question", sort=False).mean()
+    cov = m["xr"] - m["x"] * m["r"]
+    var = (m["xx"] - m["x"] ** 2) * (m["rr"] - m["r"] ** 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats["discrimination"] = np.where(var > 1e-12, cov / np.sqrt(var.clip(lower=1e-12)), np.nan)
+    return stats.reset_index()
+
+
+def distractor_analysis(graded: pd.DataFrame) -> pd.DataFrame:
+    """
+    Para cada questão MCQ e opção: quantas vezes foi escolhida, a fatia das
+    respostas, se é o gabarito, se o distrator é não funcional (quase ninguém
+    escolhe) e se atrai mais respostas que a opção correta.
+    """
+    if "options" in graded.columns:
+        mcq = graded[graded["options"].map(lambda o: isinstance(o, (list, tuple, np.ndarray)))]
+    elif "question_type" in graded.columns:
+        mcq = graded[graded["question_type"] == "Multiple Choice"]
+    else:
+        mcq = graded.iloc[0:0]
+    if mcq.empty:
+        return pd.DataFrame(columns=["question", "option", "picks", "share", "is_key",
+                                     "non_functional", "outperforms_key"])
+
+    picks = mcq.groupby(["question", "answer_norm"], sort=False).size().rename("picks").reset_index()
+    picks = picks.rename(columns={"answer_norm": "option_norm"})
+
+    if "options" in mcq.columns:
+        # Opções que ninguém marcou também aparecem (com 0 escolhas)
+        offered = mcq[["question", "options"]].drop_duplicates("question").explode("options")
+        offered = offered.rename(columns={"options": "option"})
+        offered["option_norm"] = normalize_column(offered["option"])
+        table = offered.merge(picks, on=["question", "option_norm"], how="outer")
+        table["option"] = table["option"].fillna(table["option_norm"])
+    else:
+        table = picks.assign(option=picks["option_norm"])
+
+    table["picks"] = table["picks"].fillna(0).astype(int)
+    totals = table.groupby("question")["picks"].transform("sum")
+    table["share"] = table["picks"] / totals.where(totals > 0, 1)
+    expected = mcq.groupby("question", sort=False)["expected_norm"].first()
+    table["is_key"] = table["option_norm"].to_numpy() == table["question"].map(expected).to_numpy()
+    key_picks = table["picks"].where(table["is_key"], 0).groupby(table["question"]).transform("max")
+    table["non_functional"] = ~table["is_key"] & (table["share"] < NON_FUNCTIONAL_SHARE)
+    table["outperforms_key"] = ~table["is_key"] & (table["picks"] > key_picks)
+    return table[["question", "option", "picks", "share", "is_key", "non_functional", "outperforms_key"]]
+
+
+def topic_accuracy(graded: pd.DataFrame) -> pd.DataFrame:
+    """Taxa de acerto por tópico (e dificuldade, quando disponível)."""
+    if "topic" not in graded.columns:
+        raise AppException("Per-topic accuracy requires a 'topic' column")
+    by = ["topic"] + (["difficulty"] if "difficulty" in graded.columns else [])
+    aggregations = {"responses": ("is_correct", "size"), "accuracy": ("is_correct", "mean"),
+                    "questions": ("question", "nunique")}
+    submission = _submission_column(graded)
+    if submission is not None:
+        aggregations["submissions"] = (submission, "nunique")
+    return graded.groupby(by, dropna=False).agg(**aggregations).reset_index()
+
+
+def load_submissions(source) -> pd.DataFrame:
+    """Carrega submissões de um ResultsStore ou de um arquivo CSV/Parquet/JSONL."""
+    if hasattr(source, "iter_rows"):
+        return pd.DataFrame(list(source.iter_rows()))
+    ext = os.path.splitext(str(source))[1].lower()
+    if ext == ".csv":
+        return pd.read_csv(source, dtype={"user_answer": object})
+    if ext == ".parquet":
+        return pd.read_parquet(source)
+    if ext in (".jsonl", ".json"):
+        return pd.read_json(source, lines=ext == ".jsonl", dtype={"user_answer": object})
+    raise AppException(f"Unsupported submissions file: {source}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="store", help="'store' (results store) or a CSV/Parquet/JSONL file")
+    parser.add_argument("--answer-key", help="Optional answer key file (same formats)")
+    parser.add_argument("--output-dir", help="Write question_stats/distractors/topics CSVs here")
+    args = parser.parse_args(argv)
+
+    if args.source == "store":
+        from src.storage.results_store import get_results_store
+        submissions = load_submissions(get_results_store())
+    else:
+        submissions = load_submissions(args.source)
+    answer_key = build_answer_key(load_submissions(args.answer_key)) if args.answer_key else None
+
+    graded = grade_submissions(submissions, answer_key)
+    reports = {"question_stats": question_stats(graded), "distractors": distractor_analysis(graded)}
+    if "topic" in graded.columns:
+        reports["topics"] = topic_accuracy(graded)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for name, frame in reports.items():
+            frame.to_csv(os.path.join(args.output_dir, f"{name}.csv"), index=False)
+
+    print(json.dumps({
+        "responses": len(graded),
+        "accuracy": round(float(graded["is_correct"].mean()), 4) if len(graded) else None,
+        "questions": int(graded["question"].nunique()),
+        "reports": sorted(reports),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
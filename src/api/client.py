@@ -0,0 +1,53 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+from utils.logger import get_logger
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+
+class QuizAPIClient:
+    """
+    Thin HTTP client for `src.api.server`, used by the Streamlit app when
+    API_BASE_URL is set (UI and LLM work then scale independently).
+    Only the standard library is used, so the UI image needs no extra deps.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 120, poll_interval: float = 1.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    def _request(self, method: str, path: str, payload: dict = None) -> tuple:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(
+            f"{self.base_url}{path}", data=data, method=method, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                raise AppException(f"Quiz service is busy, retry in {e.headers.get('Retry-After', '?')}s", e)
+            raise AppException(f"Quiz service error {e.code}: {e.read().decode('utf-8', 'replace')}", e)
+        except urllib.error.URLError as e:
+            raise AppException(f"Quiz service unreachable at {self.base_url}", e)
+
+    def generate_quiz(self, topic: str, question_type: str, difficulty: str, num_questions: int) -> dict:
+        """Returns {"questions": [...], "usage": {...}}, polling the job if the server answers 202."""
+        status, body = self._request("POST", "/v1/quizzes", {
+            "topic": topic, "question_type": question_type,
+            "difficulty": difficulty, "num_questions": num_questions,
+        })
+        deadline = time.monotonic() + self.timeout
+        while status == 202 and body.get("state") == "pending":
+            if time.monotonic() > deadline:
+                raise AppException(f"Quiz job {body.get('job_id')} did not finish in {self.timeout}s")
+            time.sleep(self.poll_interval)
+            status, body = self._request("GET", f"/v1/jobs/{body['job_id']}")
+        if body.get("state") != "done":
+            raise AppException(f"Quiz job failed: {body.get('error', body)}")
+        return body
@@ -0,0 +1,148 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.common.helpers import QuizManager
+from src.generation.dedup import normalize_text
+from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+
+class QueueFullError(AppException):
+    """The job queue is at capacity; the caller should retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Quiz job queue is full, retry in {retry_after:.0f}s")
+
+
+@dataclass
+class QuizJob:
+    topic: str
+    question_type: str
+    difficulty: str
+    num_questions: int
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: float = field(default_factory=time.monotonic)
+    future: Optional[asyncio.Future] = None
+    subscribers: int = 1
+
+    @property
+    def key(self) -> tuple:
+        return (self.question_type, normalize_text(self.topic), self.difficulty, self.num_questions)
+
+    def status(self) -> dict:
+        payload = {"job_id": self.id, "state": "pending", "subscribers": self.subscribers}
+        if self.future.done():
+            if self.future.cancelled() or self.future.exception() is not None:
+                payload.update(state="failed", error=str(self.future.exception() or "cancelled"))
+            else:
+                payload.update(state="done", **self.future.result())
+        return payload
+
+
+class QuizJobQueue:
+    """
+    Bounded, coalescing queue of quiz generation jobs served by async workers.
+
+    - Identical requests (type, normalized topic, difficulty, size) that are
+      in flight at the same time share one job and one set of LLM calls.
+    - At most `max_pending` distinct jobs wait for a worker; beyond that
+      `submit` raises `QueueFullError` (HTTP 429 upstream) instead of queuing
+      unbounded work.
+    - `workers` jobs run concurrently, each with `max_concurrency` questions
+      in flight (see `QuizManager.aiter_questions`).
+    """
+
+    def __init__(self, generator, workers: int = 4, max_pending: int = 32, max_concurrency: int = 4,
+                 batch_size: Optional[int] = None, bank=None, keep_finished: int = 1000):
+        self.generator = generator
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.bank = bank
+        self.keep_finished = keep_finished
+        self._queue: Optional[asyncio.Queue] = None
+        self._inflight: dict = {}
+        self._jobs: OrderedDict = OrderedDict()
+        self._tasks: list = []
+        self._durations: list = []
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        logger.info(f"Quiz job queue started | workers: {self.workers} | max_pending: {self.max_pending}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def retry_after(self) -> float:
+        """Rough wait until a slot frees up: the backlog drained at the recent job rate."""
+        recent = self._durations[-20:]
+        average = sum(recent) / len(recent) if recent else 5.0
+        return max(1.0, average * (self.pending + 1) / max(1, self.workers))
+
+    def submit(self, topic: str, question_type: str, difficulty: str, num_questions: int) -> QuizJob:
+        """Returns the (possibly shared) job for this request."""
+        job = QuizJob(topic, question_type, difficulty, num_questions)
+        shared = self._inflight.get(job.key)
+        if shared is not None:
+            shared.subscribers += 1
+            metrics.inc("api_requests_coalesced_total")
+            return shared
+
+        try:
+            job.future = asyncio.get_running_loop().create_future()
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            metrics.inc("api_requests_rejected_total", reason="queue_full")
+            raise QueueFullError(self.retry_after())
+
+        self._inflight[job.key] = job
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.keep_finished + self.max_pending + self.workers:
+            self._jobs.popitem(last=False)
+        metrics.observe("api_queue_depth", self.pending)
+        return job
+
+    def get(self, job_id: str) -> Optional[QuizJob]:
+        return self._jobs.get(job_id)
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job = await self._queue.get()
+            started = time.monotonic()
+            metrics.observe("api_queue_wait_seconds", started - job.created_at)
+            try:
+                manager = QuizManager()
+                questions = await manager.agenerate_questions(
+                    self.generator, job.topic, job.question_type, job.difficulty, job.num_questions,
+                    self.max_concurrency, self.batch_size, self.bank
+                )
+                job.future.set_result({"questions": questions, "usage": manager.last_usage})
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Quiz job {job.id} failed: {str(e)}")
+                job.future.set_exception(e)
+                # Evita "Future exception was never retrieved" quando ninguém espera o job
+                job.future.exception()
+            finally:
+                self._inflight.pop(job.key, None)
+                self._durations = (self._durations + [time.monotonic() - started])[-100:]
+                self._queue.task_done()
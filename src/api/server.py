@@ -0,0 +1,127 @@
+"""
+Servidor HTTP assíncrono (FastAPI) para geração de quizzes fora do Streamlit.
+
+Uso local contra o LLM stub:
+    LLM_PROVIDER=fake python -m src.api.server
+    curl -XPOST localhost:8000/v1/quizzes -H 'content-type: application/json' \
+         -d '{"topic": "Python", "num_questions": 3}'
+
+Variáveis: API_HOST, API_PORT, API_WORKERS, API_MAX_PENDING, API_WAIT_SECONDS,
+QUIZ_MAX_CONCURRENCY, QUIZ_BATCH_SIZE.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Literal
+
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+
+from src.api.jobs import QuizJobQueue, QueueFullError
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class QuizRequest(BaseModel):
+    topic: str = Field(..., min_length=1, max_length=200)
+    question_type: Literal["Multiple Choice", "Fill in the Blank"] = "Multiple Choice"
+    difficulty: Literal["Easy", "Medium", "Hard"] = "Medium"
+    num_questions: int = Field(5, ge=1, le=10)
+    wait: bool = Field(True, description="Block until the quiz is ready (up to API_WAIT_SECONDS)")
+
+
+def create_app(generator=None, bank=None, workers: int = None, max_pending: int = None,
+               wait_seconds: float = None) -> FastAPI:
+    """
+    Builds the API. `generator` defaults to a QuestionGenerator for the
+    configured provider (LLM_PROVIDER=fake runs fully offline).
+    """
+    workers = workers or int(os.getenv("API_WORKERS", "4"))
+    max_pending = max_pending or int(os.getenv("API_MAX_PENDING", "32"))
+    wait_seconds = wait_seconds or float(os.getenv("API_WAIT_SECONDS", "60"))
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        nonlocal generator, bank
+        if generator is None:
+            from src.generation.question_generator import QuestionGenerator
+            from src.bank.question_bank import get_question_bank
+            generator = QuestionGenerator()
+            bank = bank or get_question_bank()
+        app.state.jobs = QuizJobQueue(
+            generator,
+            workers=workers,
+            max_pending=max_pending,
+            max_concurrency=int(os.getenv("QUIZ_MAX_CONCURRENCY", "4")),
+            batch_size=int(os.getenv("QUIZ_BATCH_SIZE", "0")) or None,
+            bank=bank,
+        )
+        await app.state.jobs.start()
+        yield
+        await app.state.jobs.stop()
+
+    app = FastAPI(title="Study Buddy AI API", lifespan=lifespan)
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.get("/readyz")
+    async def readyz():
+        jobs = app.state.jobs
+        ready = jobs.pending < jobs.max_pending
+        return JSONResponse({"ready": ready, "pending": jobs.pending}, status_code=200 if ready else 503)
+
+    @app.get("/metrics")
+    async def prometheus_metrics():
+        return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    @app.post("/v1/quizzes")
+    async def create_quiz(request: QuizRequest, response: Response):
+        metrics.inc("api_requests_total", endpoint="quizzes")
+        try:
+            job = app.state.jobs.submit(request.topic, request.question_type, request.difficulty, request.num_questions)
+        except QueueFullError as e:
+            return JSONResponse(
+                {"detail": e.message},
+                status_code=429,
+                headers={"Retry-After": str(int(e.retry_after))},
+            )
+
+        if request.wait:
+            try:
+                await asyncio.wait_for(asyncio.shield(job.future), wait_seconds)
+            except Exception:
+                # Timeout -> 202 com job_id para polling; falhas aparecem em job.status()
+                pass
+        status = job.status()
+        if status["state"] == "failed":
+            raise HTTPException(status_code=502, detail=status["error"])
+        response.status_code = 200 if status["state"] == "done" else 202
+        return status
+
+    @app.get("/v1/jobs/{job_id}")
+    async def get_job(job_id: str):
+        job = app.state.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown job")
+        return job.status()
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+    uvicorn.run(
+        create_app(),
+        host=os.getenv("API_HOST", "0.0.0.0"),
+        port=int(os.getenv("API_PORT", "8000")),
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import threading
+from collections import deque
+from typing import Optional
+
+import yaml
+
+from src.generation.dedup import DedupIndex, normalize_text
+from src.models.records import intern_question
+from src.llm.rate_limit import current_session
+from utils.logger import get_logger
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+def _slot(question_type: str, topic: str, difficulty: str) -> tuple:
+    return (question_type, normalize_text(topic), difficulty)
+
+
+class QuestionBank:
+    """
+    Thread-safe stock of pre-generated, already-validated question records.
+
+    Records are stored per (question_type, topic, difficulty) slot. A slot is
+    refilled up to `high_watermark` whenever it drops below `low_watermark`;
+    near-duplicate questions (see `DedupIndex`) are never stored twice in a
+    slot, including ones that were already served.
+    """
+
+    def __init__(self, low_watermark: int = 5, high_watermark: int = 20, dedup_threshold: float = 0.75):
+        if high_watermark < low_watermark:
+            raise AppException("QuestionBank: high_watermark must be >= low_watermark")
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.dedup_threshold = dedup_threshold
+        self._lock = threading.Lock()
+        self._slots: dict = {}
+        self._seen: dict = {}
+        self.refill_needed = threading.Event()
+
+    def add(self, question_type: str, topic: str, difficulty: str, records: list) -> int:
+        """Stores question records (see `intern_question`), skipping duplicates. Returns how many were kept."""
+        key = _slot(question_type, topic, difficulty)
+        kept = 0
+        with self._lock:
+            stock = self._slots.setdefault(key, deque())
+            seen = self._seen.get(key)
+            if seen is None:
+                seen = self._seen[key] = DedupIndex(self.dedup_threshold)
+            for record in records:
+                if len(stock) >= self.high_watermark:
+                    break
+                if seen.add_if_new(record["question"]) is not None:
+                    continue
+                stock.append(intern_question(record))
+                kept += 1
+        return kept
+
+    def take(self, question_type: str, topic: str, difficulty: str, count: int, accept=None) -> list:
+        """
+        Removes and returns up to `count` records; wakes the worker if the slot runs low.
+        With `accept(record)`, records it refuses (e.g. already seen by the session)
+        are skipped and stay in the bank, in order, for other sessions.
+        """
+        key = _slot(question_type, topic, difficulty)
+        with self._lock:
+            stock = self._slots.get(key)
+            if not stock:
+                return []
+            # Records are immutable and shared, so they are handed out without copying
+            drawn, skipped = [], []
+            try:
+                while stock and len(drawn) < count:
+                    accepted = accept is None or accept(stock[0])
+                    (drawn if accepted else skipped).append(stock.popleft())
+            finally:
+                stock.extendleft(reversed(skipped))
+            low = len(stock) < self.low_watermark
+
+        if low:
+            self.refill_needed.set()
+        return drawn
+
+    def size(self, question_type: str, topic: str, difficulty: str) -> int:
+        with self._lock:
+            return len(self._slots.get(_slot(question_type, topic, difficulty), ()))
+
+    def deficit(self, question_type: str, topic: str, difficulty: str) -> int:
+        """How many records the slot needs to reach `high_watermark` (0 if above the low mark)."""
+        current = self.size(question_type, topic, difficulty)
+        if current >= self.low_watermark:
+            return 0
+        return self.high_watermark - current
+
+
+class BankWarmupWorker(threading.Thread):
+    """
+    Daemon thread that keeps the hot (topic, difficulty, type) slots stocked
+    using the regular QuestionGenerator (batch mode, so refills are cheap).
+    """
+
+    def __init__(self, bank: QuestionBank, generator, hot_slots: list,
+                 refill_batch_size: int = 5, poll_interval_seconds: float = 30):
+        super().__init__(name="question-bank-warmup", daemon=True)
+        self.bank = bank
+        self.generator = generator
+        self.hot_slots = hot_slots
+        self.refill_batch_size = max(1, refill_batch_size)
+        self.poll_interval_seconds = poll_interval_seconds
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        self.bank.refill_needed.set()
+
+    def run(self):
+        # Refills compete with live quizzes as one session in the rate limiter's fair queue
+        current_session.set("bank-warmup")
+        logger.info(f"Question bank warm-up started for {len(self.hot_slots)} slot(s)")
+        while not self._stop_event.is_set():
+            self.refill_once()
+            self.bank.refill_needed.wait(self.poll_interval_seconds)
+            self.bank.refill_needed.clear()
+
+    def refill_once(self) -> int:
+        """One pass over every hot slot. Returns how many records were added."""
+        added = 0
+        for question_type, topic, difficulty in self.hot_slots:
+            if self._stop_event.is_set():
+                break
+            missing = self.bank.deficit(question_type, topic, difficulty)
+            while missing > 0 and not self._stop_event.is_set():
+                count = min(missing, self.refill_batch_size)
+                try:
+                    records = self._generate(question_type, topic, difficulty, count)
+                except Exception as e:
+                    logger.warning(f"Warm-up failed for {topic} ({difficulty}, {question_type}): {str(e)}")
+                    break
+                kept = self.bank.add(question_type, topic, difficulty, records)
+                added += kept
+                if kept == 0:
+                    # Only duplicates came back; try again on the next pass
+                    break
+                missing -= kept
+        if added:
+            logger.info(f"Question bank refilled with {added} question(s)")
+        return added
+
+    def _generate(self, question_type: str, topic: str, difficulty: str, count: int) -> list:
+        if question_type == "Multiple Choice":
+            questions = self.generator.generate_mcq_batch(topic, difficulty, count)
+        else:
+            questions = self.generator.generate_fill_blank_batch(topic, difficulty, count)
+        return [intern_question(q, question_type) for q in questions]
+
+
+def load_bank_config(path: str = "config/bank.yaml") -> dict:
+    try:
+        with open(path, "r") as f:
+            return yaml.safe_load(f) or {}
+    except Exception as exc:
+        logger.error(f"Critical failure while loading config file: {path}")
+        raise AppException("Infrastructure Configuration Error", exc)
+
+
+def expand_hot_slots(conf: dict) -> list:
+    """Turns the `hot_topics` entries into (question_type, topic, difficulty) tuples."""
+    slots = []
+    for entry in conf.get("hot_topics", []):
+        for question_type in entry.get("question_types", ["Multiple Choice"]):
+            for difficulty in entry.get("difficulties", ["Medium"]):
+                slots.append((question_type, entry["topic"], difficulty))
+    return slots
+
+
+_bank_lock = threading.Lock()
+_bank: Optional[QuestionBank] = None
+_worker: Optional[BankWarmupWorker] = None
+
+
+def get_question_bank(config_path: str = "config/bank.yaml", generator=None) -> Optional[QuestionBank]:
+    """
+    Process-wide bank plus its warm-up worker, started on first use.
+    Returns None when the bank is disabled in config/bank.yaml.
+    """
+    global _bank, _worker
+    with _bank_lock:
+        if _bank is not None:
+            return _bank
+
+        conf = load_bank_config(config_path)
+        if not conf.get("enabled", False):
+            return None
+
+        if generator is None:
+            from src.generation.question_generator import QuestionGenerator
+            generator = QuestionGenerator()
+
+        _bank = QuestionBank(
+            conf.get("low_watermark", 5), conf.get("high_watermark", 20), conf.get("dedup_threshold", 0.75)
+        )
+        _worker = BankWarmupWorker(
+            _bank,
+            generator,
+            expand_hot_slots(conf),
+            refill_batch_size=conf.get("refill_batch_size", 5),
+            poll_interval_seconds=conf.get("poll_interval_seconds", 30),
+        )
+        _worker.start()
+        return _bank
@@ -0,0 +1,184 @@
+import io
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+from utils.logger import get_logger
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+def to_chat_messages(messages) -> list:
+    """LangChain messages -> the `{"role", "content"}` dicts batch APIs take."""
+    return [{"role": _ROLES.get(m.type, m.type), "content": m.content} for m in messages]
+
+
+class BatchSubmitter(ABC):
+    """
+    A provider's asynchronous batch API: requests are uploaded at once and
+    answered within a completion window at a discount (`discount` is the
+    fraction of the regular price that is paid).
+
+    Requests are `{"custom_id": ..., "messages": [...]}`; results map each
+    custom_id to `{"content", "input_tokens", "output_tokens"}` or `{"error"}`.
+    """
+
+    provider = "abstract"
+
+    def __init__(self, model: str, discount: float = 0.5, max_tokens: int = 1024, temperature: float = 0.2):
+        self.model = model
+        self.discount = discount
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+
+    @abstractmethod
+    def submit(self, requests: list) -> str:
+        """Uploads the requests; returns the provider's batch id."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """One of "in_progress" or `TERMINAL_STATES`."""
+
+    @abstractmethod
+    def results(self, batch_id: str) -> dict:
+        ...
+
+
+class OpenAIBatchSubmitter(BatchSubmitter):
+    """
+    OpenAI Batch API (`/v1/chat/completions`, 24h window, half price). Groq's
+    batch API is wire-compatible: pass its `base_url` and API key variable.
+    """
+
+    provider = "openai"
+
+    def __init__(self, model: str, discount: float = 0.5, max_tokens: int = 1024, temperature: float = 0.2,
+                 completion_window: str = "24h", base_url: str = None, api_key_env: str = "OPENAI_API_KEY",
+                 provider: str = "openai"):
+        super().__init__(model, discount, max_tokens, temperature)
+        self.completion_window = completion_window
+        self.provider = provider
+        # SDK imported on demand, like the chat models in LLMClient
+        from openai import OpenAI
+        self.client = OpenAI(base_url=base_url, api_key=os.getenv(api_key_env), max_retries=2)
+
+    def submit(self, requests: list) -> str:
+        lines = [
+            json.dumps({
+                "custom_id": r["custom_id"],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": r["messages"],
+                    "max_tokens": self.max_tokens,
+                    "temperature": self.temperature,
+                },
+            }, ensure_ascii=False)
+            for r in requests
+        ]
+        payload = io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+        try:
+            upload = self.client.files.create(file=("bulk_requests.jsonl", payload), purpose="batch")
+            batch = self.client.batches.create(
+                input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window=self.completion_window
+            )
+        except Exception as exc:
+            raise AppException(f"Batch submission to {self.provider} failed", exc)
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        state = self.client.batches.retrieve(batch_id).status
+        return state if state in TERMINAL_STATES else "in_progress"
+
+    def results(self, batch_id: str) -> dict:
+        batch = self.client.batches.retrieve(batch_id)
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                body = (entry.get("response") or {}).get("body") or {}
+                if entry.get("error") or not body.get("choices"):
+                    results[entry["custom_id"]] = {"error": str(entry.get("error") or body.get("error"))}
+                    continue
+                usage = body.get("usage") or {}
+                results[entry["custom_id"]] = {
+                    "content": body["choices"][0]["message"]["content"],
+                    "input_tokens": usage.get("prompt_tokens", 0),
+                    "output_tokens": usage.get("completion_tokens", 0),
+                }
+        return results
+
+
+class LocalBatchSubmitter(BatchSubmitter):
+    """
+    Offline stand-in for tests and dry runs: answers the requests with a
+    LangChain chat model (the fake provider by default) and keeps batches as
+    files under `directory`, so submit / poll / resume after a restart
+    behave like the provider's. A batch completes `completion_delay_seconds`
+    after submission.
+    """
+
+    provider = "local"
+
+    def __init__(self, llm, directory: str = "/tmp/quiz_bulk/local_batches", model: str = "local",
+                 discount: float = 0.5, completion_delay_seconds: float = 0.0):
+        super().__init__(model, discount)
+        self.llm = llm
+        self.directory = directory
+        self.completion_delay_seconds = completion_delay_seconds
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, batch_id: str, kind: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.{kind}.json")
+
+    def submit(self, requests: list) -> str:
+        batch_id = f"local_{uuid.uuid4().hex}"
+        with open(self._path(batch_id, "input"), "w", encoding="utf-8") as f:
+            json.dump({"submitted_at": time.time(), "requests": requests}, f, ensure_ascii=False)
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        try:
+            with open(self._path(batch_id, "input"), "r", encoding="utf-8") as f:
+                submitted_at = json.load(f)["submitted_at"]
+        except FileNotFoundError:
+            return "expired"
+        return "completed" if time.time() - submitted_at >= self.completion_delay_seconds else "in_progress"
+
+    def results(self, batch_id: str) -> dict:
+        output = self._path(batch_id, "output")
+        if os.path.exists(output):
+            with open(output, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+        classes = {"system": SystemMessage, "user": HumanMessage, "assistant": AIMessage}
+        with open(self._path(batch_id, "input"), "r", encoding="utf-8") as f:
+            requests = json.load(f)["requests"]
+        results = {}
+        for r in requests:
+            try:
+                response = self.llm.invoke([classes[m["role"]](content=m["content"]) for m in r["messages"]])
+            except Exception as e:
+                results[r["custom_id"]] = {"error": str(e)}
+                continue
+            usage = getattr(response, "usage_metadata", None) or {}
+            results[r["custom_id"]] = {
+                "content": response.content,
+                "input_tokens": usage.get("input_tokens", 0),
+                "output_tokens": usage.get("output_tokens", 0),
+            }
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False)
+        return results
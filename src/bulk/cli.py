@@ -0,0 +1,119 @@
+"""
+Geração em massa do banco de questões a partir de um manifesto de tópicos.
+
+Expande o manifesto (tópico x dificuldade x tipo) em tarefas de até
+`batch_size` questões, gera com concorrência limitada (ou pela Batch API
+assíncrona do provedor) e grava as questões validadas em shards JSONL no
+diretório de saída, junto com `checkpoint.jsonl`. Rodar de novo com o mesmo
+manifesto e diretório retoma de onde parou, sem regerar tarefas concluídas.
+
+Códigos de saída: 0 concluído, 2 parou antes (falhas seguidas ou batches
+pendentes; rode de novo para retomar), 1 erro.
+
+Uso:
+    study-buddy-bulk --manifest config/bulk_topics.yaml --output data/bank
+    LLM_PROVIDER=fake study-buddy-bulk --manifest config/bulk_topics.yaml --output /tmp/bank --batch-api local
+"""
+import argparse
+import json
+import sys
+
+import yaml
+
+from src.bulk.batch_api import LocalBatchSubmitter, OpenAIBatchSubmitter
+from src.bulk.manifest import load_manifest
+from src.bulk.runner import BulkJob
+from utils.logger import get_logger
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+
+def load_bulk_config(path: str = "config/bulk.yaml") -> dict:
+    try:
+        with open(path, "r") as f:
+            return yaml.safe_load(f) or {}
+    except Exception as exc:
+        logger.error(f"Critical failure while loading config file: {path}")
+        raise AppException("Infrastructure Configuration Error", exc)
+
+
+def build_submitter(provider: str, conf: dict, llm_client):
+    """The batch API named by `provider` (None for live generation)."""
+    if provider in (None, "none"):
+        return None
+    discount = conf.get("discount", 0.5)
+    if provider == "local":
+        model = llm_client.config["providers"][llm_client.provider]["model"]["name"]
+        return LocalBatchSubmitter(
+            llm_client.get_llm(), conf.get("local_path", "/tmp/quiz_bulk/local_batches"), model, discount,
+            conf.get("local_completion_delay_seconds", 0),
+        )
+    endpoint = (conf.get("endpoints") or {}).get(provider)
+    model_conf = llm_client.config["providers"].get(provider, {}).get("model")
+    if endpoint is None or model_conf is None:
+        raise AppException(f"No batch API configured for provider: {provider}")
+    return OpenAIBatchSubmitter(
+        model_conf["name"], discount, model_conf.get("max_tokens", 1024), model_conf.get("temperature", 0.2),
+        conf.get("completion_window", "24h"), endpoint.get("base_url"), endpoint.get("api_key_env"), provider,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifest", required=True, help="Topics manifest (YAML)")
+    parser.add_argument("--output", required=True, help="Directory for the JSONL shards and the checkpoint")
+    parser.add_argument("--config", default="config/bulk.yaml")
+    parser.add_argument("--llm-config", default="config/llm.yaml")
+    parser.add_argument("--provider", help="LLM provider (default: LLM_PROVIDER / config default)")
+    parser.add_argument("--concurrency", type=int, help="Tasks in flight (live mode)")
+    parser.add_argument("--batch-size", type=int, help="Questions per task")
+    parser.add_argument("--shard-size", type=int, help="Lines per JSONL shard")
+    parser.add_argument("--batch-api", choices=["none", "openai", "groq", "local"],
+                        help="Submit through the provider's asynchronous batch API")
+    parser.add_argument("--dry-run", action="store_true", help="Print the task plan and exit")
+    args = parser.parse_args(argv)
+
+    try:
+        conf = load_bulk_config(args.config)
+        batch_conf = conf.get("batch_api") or {}
+        batch_size = args.batch_size or conf.get("batch_size", 10)
+        tasks = load_manifest(args.manifest, batch_size)
+        if args.dry_run:
+            print(json.dumps({
+                "tasks": len(tasks),
+                "questions": sum(t.count for t in tasks),
+                "task_ids": [t.id for t in tasks],
+            }, indent=2, ensure_ascii=False))
+            return 0
+
+        from src.generation.question_generator import QuestionGenerator
+        from src.llm.llm_client import get_llm_client
+
+        llm_client = get_llm_client(args.llm_config, args.provider)
+        generator = QuestionGenerator(llm_client=llm_client, cache=False)
+        job = BulkJob(
+            generator,
+            tasks,
+            args.output,
+            concurrency=args.concurrency or conf.get("concurrency", 4),
+            shard_size=args.shard_size or conf.get("shard_size", 1000),
+            dedup_attempts=conf.get("dedup_attempts", 3),
+            dedup_threshold=conf.get("dedup_threshold", 0.75),
+            stop_after_failures=conf.get("stop_after_failures", 5),
+            report_interval_seconds=conf.get("report_interval_seconds", 10),
+            submitter=build_submitter(args.batch_api or batch_conf.get("provider"), batch_conf, llm_client),
+            max_requests_per_batch=batch_conf.get("max_requests_per_batch", 1000),
+            poll_interval_seconds=batch_conf.get("poll_interval_seconds", 60),
+        )
+        report = job.run()
+    except AppException as e:
+        logger.error(str(e))
+        return 1
+
+    print(json.dumps(report, indent=2))
+    return 0 if report["tasks_done"] == report["tasks_total"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+
+import yaml
+
+from src.generation.dedup import normalize_text
+from utils.custom_exception import AppException
+
+QUESTION_TYPES = {"Multiple Choice": "mcq", "Fill in the Blank": "fib"}
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+
+@dataclass(frozen=True)
+class BulkTask:
+    """
+    One unit of bulk work: `count` questions for a (type, topic, difficulty)
+    slot, generated in a single completion. `part` numbers the tasks of a
+    slot, so ids stay stable across runs and the checkpoint can match them.
+    """
+    question_type: str
+    topic: str
+    difficulty: str
+    count: int
+    part: int
+
+    @property
+    def slot(self) -> tuple:
+        return (self.question_type, normalize_text(self.topic), self.difficulty)
+
+    @property
+    def id(self) -> str:
+        return f"{QUESTION_TYPES[self.question_type]}:{self.difficulty}:{normalize_text(self.topic)}:{self.part}"
+
+
+def expand_manifest(manifest: dict, batch_size: int) -> list:
+    """
+    Topic x difficulty x type matrix -> tasks of at most `batch_size` questions.
+
+    Each entry of `topics` is a topic name or a mapping overriding the
+    manifest `defaults` (`count` per slot, `difficulties`, `question_types`).
+    """
+    defaults = manifest.get("defaults") or {}
+    tasks = []
+    for entry in manifest.get("topics") or []:
+        spec = {**defaults, **({"topic": entry} if isinstance(entry, str) else entry)}
+        topic = spec.get("topic")
+        if not topic:
+            raise AppException(f"Manifest entry without a topic: {entry}")
+        count = int(spec.get("count", 10))
+        for question_type in spec.get("question_types", list(QUESTION_TYPES)):
+            if question_type not in QUESTION_TYPES:
+                raise AppException(f"Unknown question type in manifest: {question_type}")
+            for difficulty in spec.get("difficulties", list(DIFFICULTIES)):
+                if difficulty not in DIFFICULTIES:
+                    raise AppException(f"Unknown difficulty in manifest: {difficulty}")
+                for part, start in enumerate(range(0, count, batch_size)):
+                    tasks.append(BulkTask(question_type, topic, difficulty, min(batch_size, count - start), part))
+    return tasks
+
+
+def load_manifest(path: str, batch_size: int) -> list:
+    try:
+        with open(path, "r") as f:
+            manifest = yaml.safe_load(f) or {}
+    except Exception as exc:
+        raise AppException(f"Could not read topics manifest: {path}", exc)
+    return expand_manifest(manifest, batch_size)
@@ -0,0 +1,162 @@
+import json
+import os
+import re
+import threading
+
+from utils.logger import get_logger
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+_SHARD_NAME = re.compile(r"^(?P<prefix>.+)-(?P<index>\d{5})\.jsonl$")
+
+
+def _append(path: str, data: bytes) -> None:
+    """One O_APPEND write + fsync: the lines are on disk before the caller checkpoints them."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Checkpoint:
+    """
+    Append-only progress log of a bulk job (`checkpoint.jsonl` in the output directory).
+
+    A task is finished once its line is here, and only then: its questions
+    were fsynced to a shard first. Provider batch submissions are logged
+    too, so a restarted job polls the batch it already paid for instead of
+    submitting it again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: dict = {}
+        self.batches: dict = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if data and not data.endswith(b"\n"):
+            # Torn last line from a crash: that entry never happened. Cut it,
+            # or the next append would be glued to it.
+            data = data[:data.rfind(b"\n") + 1]
+            with open(self.path, "r+b") as f:
+                f.truncate(len(data))
+                os.fsync(f.fileno())
+        for line in data.decode("utf-8").splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            event = entry.get("event")
+            if event == "task_done":
+                self.done[entry["task_id"]] = entry
+            elif event == "batch_submitted":
+                self.batches[entry["batch_id"]] = entry
+            elif event == "batch_closed":
+                self.batches.pop(entry["batch_id"], None)
+
+    def _log(self, entry: dict) -> None:
+        with self._lock:
+            _append(self.path, (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def task_done(self, task_id: str, **details) -> None:
+        entry = {"event": "task_done", "task_id": task_id, **details}
+        self._log(entry)
+        self.done[task_id] = entry
+
+    def batch_submitted(self, batch_id: str, task_ids: list, provider: str) -> None:
+        entry = {"event": "batch_submitted", "batch_id": batch_id, "task_ids": task_ids, "provider": provider}
+        self._log(entry)
+        self.batches[batch_id] = entry
+
+    def batch_closed(self, batch_id: str, status: str) -> None:
+        self._log({"event": "batch_closed", "batch_id": batch_id, "status": status})
+        self.batches.pop(batch_id, None)
+
+    def totals(self) -> dict:
+        """Questions and cost already produced by earlier runs."""
+        return {
+            "questions": sum(e.get("questions", 0) for e in self.done.values()),
+            "cost_usd": round(sum(e.get("cost_usd", 0.0) for e in self.done.values()), 6),
+        }
+
+
+class ShardedJSONLWriter:
+    """
+    Validated questions as JSONL shards of about `shard_size` lines
+    (`questions-00000.jsonl`, ...). A task's lines go out in one write and
+    never straddle two shards.
+    """
+
+    def __init__(self, directory: str, shard_size: int = 1000, prefix: str = "questions"):
+        self.directory = directory
+        self.shard_size = shard_size
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as exc:
+            raise AppException(f"Could not create output directory {directory}", exc)
+        self._index, self._lines = 0, 0
+
+    def shards(self) -> list:
+        names = []
+        for name in os.listdir(self.directory):
+            match = _SHARD_NAME.match(name)
+            if match and match.group("prefix") == self.prefix:
+                names.append((int(match.group("index")), name))
+        return [os.path.join(self.directory, name) for _, name in sorted(names)]
+
+    def _shard_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"{self.prefix}-{index:05d}.jsonl")
+
+    def recover(self, committed) -> list:
+        """
+        Drops lines of tasks missing from the checkpoint (a crash between
+        the shard write and the checkpoint), rewriting only the shards that
+        had any, and positions the writer after the last shard. Returns the
+        surviving records (used to seed deduplication).
+        """
+        kept_all = []
+        for path in self.shards():
+            kept, dropped = [], 0
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        dropped += 1
+                        continue
+                    if record.get("task_id") in committed:
+                        kept.append(record)
+                    else:
+                        dropped += 1
+            if dropped:
+                tmp = path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in kept)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, path)
+                logger.warning(f"Dropped {dropped} uncommitted line(s) from {os.path.basename(path)}")
+            kept_all.extend(kept)
+            self._index, self._lines = int(_SHARD_NAME.match(os.path.basename(path)).group("index")), len(kept)
+        return kept_all
+
+    def write(self, records: list) -> str:
+        """Appends the records of one task; returns the shard they went to."""
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        with self._lock:
+            if self._lines >= self.shard_size:
+                self._index, self._lines = self._index + 1, 0
+            path = self._shard_path(self._index)
+            _append(path, data)
+            self._lines += len(records)
+        return os.path.basename(path)
@@ -0,0 +1,296 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Optional
+
+from src.bulk.batch_api import BatchSubmitter, to_chat_messages
+from src.bulk.output import Checkpoint, ShardedJSONLWriter
+from src.generation.dedup import DedupIndex, normalize_text
+from src.llm.rate_limit import current_session
+from src.models.records import intern_question
+from src.models.schema import MCQQuestion, FillBlankQuestion
+from src.prompts.builder import MCQ_BATCH_PROMPT, FILL_BLANK_BATCH_PROMPT
+from utils.logger import get_logger
+from utils.metrics import metrics, current_usage, UsageAccumulator
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+
+class BulkJob:
+    """
+    Offline generation of a topics manifest into sharded JSONL.
+
+    - Live mode fans the tasks out to `QuestionGenerator` batch calls, at
+      most `concurrency` in flight (the provider's rate limiter still
+      applies, as one "bulk" session in its fair queue).
+    - With a `submitter`, the tasks go through the provider's discounted
+      asynchronous batch API instead and the job polls until they finish.
+    - Every finished task is fsynced to a shard and then checkpointed, so a
+      re-run skips it. After `stop_after_failures` consecutive failed tasks
+      (rate limits, outages) the job stops scheduling and can be resumed later.
+    - Questions are deduplicated per slot against everything already written,
+      including earlier runs.
+    """
+
+    def __init__(self, generator, tasks: list, output_dir: str, concurrency: int = 4, shard_size: int = 1000,
+                 dedup_attempts: int = 3, dedup_threshold: float = 0.75, stop_after_failures: int = 5,
+                 report_interval_seconds: float = 10.0, submitter: Optional[BatchSubmitter] = None,
+                 max_requests_per_batch: int = 1000, poll_interval_seconds: float = 60.0):
+        self.generator = generator
+        self.tasks = tasks
+        self.output_dir = output_dir
+        self.concurrency = concurrency
+        self.dedup_attempts = dedup_attempts
+        self.dedup_threshold = dedup_threshold
+        self.stop_after_failures = stop_after_failures
+        self.report_interval_seconds = report_interval_seconds
+        self.submitter = submitter
+        self.max_requests_per_batch = max_requests_per_batch
+        self.poll_interval_seconds = poll_interval_seconds
+
+        self.writer = ShardedJSONLWriter(output_dir, shard_size)
+        self.checkpoint = Checkpoint(os.path.join(output_dir, "checkpoint.jsonl"))
+        self._indexes: dict = {}
+        self._recent: dict = {}
+        self.usage = UsageAccumulator()
+        self.questions = 0
+        self.tasks_done = 0
+        self.tasks_failed = 0
+        self.stopped: Optional[str] = None
+        self._consecutive_failures = 0
+        self._started = time.monotonic()
+
+    # ---- state -----------------------------------------------------------
+
+    def _resume(self) -> list:
+        """Reconciles shards with the checkpoint, seeds dedup, and returns the tasks still to do."""
+        for record in self.writer.recover(set(self.checkpoint.done)):
+            slot = (record["question_type"], normalize_text(record["topic"]), record["difficulty"])
+            self._remember(slot, record["question"])
+        pending = [t for t in self.tasks if t.id not in self.checkpoint.done]
+        previous = self.checkpoint.totals()
+        logger.info(
+            f"Bulk job | {len(self.tasks)} task(s), {len(self.tasks) - len(pending)} already done "
+            f"({previous['questions']} questions, ${previous['cost_usd']:.4f}) | {len(pending)} to go"
+        )
+        return pending
+
+    def _index(self, slot: tuple) -> DedupIndex:
+        if slot not in self._indexes:
+            self._indexes[slot] = DedupIndex(self.dedup_threshold)
+            self._recent[slot] = deque(maxlen=10)
+        return self._indexes[slot]
+
+    def _remember(self, slot: tuple, text: str) -> None:
+        self._index(slot).add(text)
+        self._recent[slot].append(text)
+
+    def _dedup(self, task, items: list) -> tuple:
+        """(accepted, rejected texts): near-duplicates of anything in the slot are dropped."""
+        index = self._index(task.slot)
+        accepted, rejected = [], []
+        for q in items:
+            if index.add_if_new(q.question) is None:
+                accepted.append(q)
+                self._recent[task.slot].append(q.question)
+            else:
+                rejected.append(q.question)
+        if rejected:
+            metrics.inc("quiz_duplicates_rejected_total", len(rejected), scope="bulk")
+        return accepted, rejected
+
+    def _commit(self, task, questions: list, usage: UsageAccumulator) -> None:
+        if not questions:
+            raise AppException(f"No valid question for task {task.id}")
+        records = [
+            {
+                "task_id": task.id,
+                "question_type": task.question_type,
+                "topic": task.topic,
+                **intern_question(q, task.question_type).to_dict(),
+                "difficulty": task.difficulty,
+            }
+            for q in questions
+        ]
+        shard = self.writer.write(records)
+        self.checkpoint.task_done(
+            task.id, questions=len(records), requested=task.count, shard=shard, **usage.as_dict()
+        )
+        self.questions += len(records)
+        self.tasks_done += 1
+        self._consecutive_failures = 0
+        for field in ("input_tokens", "output_tokens", "cost_usd", "llm_calls"):
+            setattr(self.usage, field, getattr(self.usage, field) + getattr(usage, field))
+        metrics.inc("bulk_tasks_total", outcome="done")
+        metrics.inc("bulk_questions_total", len(records), question_type=task.question_type)
+
+    def _fail(self, task, error) -> None:
+        self.tasks_failed += 1
+        self._consecutive_failures += 1
+        metrics.inc("bulk_tasks_total", outcome="failed")
+        logger.warning(f"Task {task.id} failed (will be retried on the next run): {str(error)}")
+        if self.stopped is None and self._consecutive_failures >= self.stop_after_failures:
+            self.stopped = "too_many_failures"
+            logger.error(f"{self._consecutive_failures} consecutive failures: stopping. Re-run to resume.")
+
+    # ---- live mode -------------------------------------------------------
+
+    async def _run_task(self, task) -> None:
+        # Each asyncio task runs in its own context copy: this usage is the task's alone
+        usage = UsageAccumulator()
+        current_usage.set(usage)
+        multiple_choice = task.question_type == "Multiple Choice"
+        generate = self.generator.agenerate_mcq_batch if multiple_choice else self.generator.agenerate_fill_blank_batch
+
+        accepted, rejected = [], []
+        for _ in range(self.dedup_attempts):
+            missing = task.count - len(accepted)
+            if missing <= 0:
+                break
+            avoid = (list(self._recent[task.slot]) + rejected) if rejected else None
+            items = await generate(task.topic, task.difficulty, missing, avoid=avoid)
+            new, duplicates = self._dedup(task, items[:missing])
+            accepted += new
+            rejected += duplicates
+            if not duplicates:
+                break
+        self._commit(task, accepted, usage)
+
+    async def _run_live(self, pending: list) -> None:
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def _guarded(task):
+            async with semaphore:
+                if self.stopped:
+                    return
+                try:
+                    await self._run_task(task)
+                except Exception as e:
+                    self._fail(task, e)
+
+        for task in pending:
+            self._index(task.slot)
+        await asyncio.gather(*(_guarded(t) for t in pending))
+
+    # ---- provider batch API ----------------------------------------------
+
+    def _requests(self, tasks: list) -> list:
+        requests = []
+        for task in tasks:
+            prompt = MCQ_BATCH_PROMPT if task.question_type == "Multiple Choice" else FILL_BLANK_BATCH_PROMPT
+            messages = prompt.render("", topic=task.topic, difficulty=task.difficulty, count=task.count)
+            requests.append({"custom_id": task.id, "messages": to_chat_messages(messages)})
+        return requests
+
+    def _batch_pricing(self) -> dict:
+        # Same prefix match as the generator's usage accounting, then the batch discount
+        configured = next((m for m in self.generator._pricing if self.submitter.model.startswith(m)), None)
+        _, pricing = self.generator._pricing.get(configured, (None, {}))
+        return {k: v * self.submitter.discount for k, v in (pricing or {}).items()}
+
+    def _ingest(self, task, result: Optional[dict]) -> None:
+        usage = UsageAccumulator()
+        token = current_usage.set(usage)
+        try:
+            if not result or "error" in result:
+                raise AppException(f"Batch API returned no completion: {(result or {}).get('error', 'missing')}")
+            metrics.record_usage(self.submitter.provider, self.submitter.model, result.get("input_tokens", 0),
+                                 result.get("output_tokens", 0), self._batch_pricing())
+            item_model = MCQQuestion if task.question_type == "Multiple Choice" else FillBlankQuestion
+            collected = []
+            self.generator._collect_valid_items(result["content"], item_model, task.count, collected)
+            accepted, _ = self._dedup(task, collected)
+            self._commit(task, accepted, usage)
+        except Exception as e:
+            self._fail(task, e)
+        finally:
+            current_usage.reset(token)
+
+    async def _run_batch_api(self, pending: list) -> None:
+        submitter = self.submitter
+        in_flight = {tid for entry in self.checkpoint.batches.values() for tid in entry["task_ids"]}
+        to_submit = [t for t in pending if t.id not in in_flight]
+        for start in range(0, len(to_submit), self.max_requests_per_batch):
+            chunk = to_submit[start:start + self.max_requests_per_batch]
+            batch_id = await asyncio.to_thread(submitter.submit, self._requests(chunk))
+            self.checkpoint.batch_submitted(batch_id, [t.id for t in chunk], submitter.provider)
+            logger.info(f"Submitted batch {batch_id} | {len(chunk)} request(s) | provider: {submitter.provider}")
+
+        by_id = {t.id: t for t in self.tasks}
+        while not self.stopped:
+            open_batches = {
+                batch_id: entry for batch_id, entry in self.checkpoint.batches.items()
+                if entry.get("provider") == submitter.provider
+            }
+            if not open_batches:
+                break
+            for batch_id, entry in open_batches.items():
+                state = await asyncio.to_thread(submitter.status, batch_id)
+                if state == "in_progress":
+                    continue
+                if state == "completed":
+                    results = await asyncio.to_thread(submitter.results, batch_id)
+                    for task_id in entry["task_ids"]:
+                        task = by_id.get(task_id)
+                        if task is not None and task_id not in self.checkpoint.done:
+                            self._ingest(task, results.get(task_id))
+                else:
+                    logger.warning(f"Batch {batch_id} ended as {state}: its tasks will be resubmitted on the next run")
+                self.checkpoint.batch_closed(batch_id, state)
+            if any(entry.get("provider") == submitter.provider for entry in self.checkpoint.batches.values()):
+                await asyncio.sleep(self.poll_interval_seconds)
+
+    # ---- reporting -------------------------------------------------------
+
+    def progress(self) -> dict:
+        elapsed = time.monotonic() - self._started
+        previous = len(self.checkpoint.done) - self.tasks_done
+        remaining = len(self.tasks) - len(self.checkpoint.done)
+        task_rate = self.tasks_done / elapsed if elapsed else 0.0
+        return {
+            "tasks_total": len(self.tasks),
+            "tasks_done": len(self.checkpoint.done),
+            "tasks_done_this_run": self.tasks_done,
+            "tasks_from_previous_runs": previous,
+            "tasks_failed": self.tasks_failed,
+            "questions_this_run": self.questions,
+            "questions_per_sec": round(self.questions / elapsed, 3) if elapsed else 0.0,
+            "usage_this_run": self.usage.as_dict(),
+            "cost_usd_total": round(self.checkpoint.totals()["cost_usd"], 6),
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": round(remaining / task_rate, 1) if task_rate and not self.submitter else None,
+            "shards": len(self.writer.shards()),
+            "stopped": self.stopped,
+        }
+
+    async def _report_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval_seconds)
+            p = self.progress()
+            logger.info(
+                f"Bulk progress | tasks {p['tasks_done']}/{p['tasks_total']} ({p['tasks_failed']} failed) | "
+                f"{p['questions_this_run']} questions, {p['questions_per_sec']} q/s | "
+                f"cost ${p['usage_this_run']['cost_usd']:.4f} this run | eta {p['eta_seconds']}s"
+            )
+
+    async def arun(self) -> dict:
+        """Runs (or resumes) the job; returns the final `progress()` report."""
+        current_session.set("bulk")
+        pending = self._resume()
+        self._started = time.monotonic()
+        reporter = asyncio.create_task(self._report_loop())
+        try:
+            if self.submitter is not None:
+                await self._run_batch_api(pending)
+            else:
+                await self._run_live(pending)
+        finally:
+            reporter.cancel()
+        report = self.progress()
+        logger.info(f"Bulk job finished | {report['tasks_done']}/{report['tasks_total']} task(s) done")
+        return report
+
+    def run(self) -> dict:
+        return asyncio.run(self.arun())
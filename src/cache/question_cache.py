@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from utils.logger import get_logger
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+
+def make_cache_key(template_id: str, topic: str, difficulty: str, model: str) -> str:
+    """
+    Stable key for (template, topic, difficulty, model).
+    The topic is normalized so "Python Programming " and "python programming" share a pool.
+    """
+    normalized_topic = " ".join(topic.lower().split())
+    raw = f"{template_id}|{normalized_topic}|{difficulty.lower()}|{model}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class QuestionCache(ABC):
+    """
+    Cache of already-validated question payloads.
+
+    Each key owns a *sample pool* of up to `pool_size` distinct questions.
+    While a pool is still filling, `get` reports a miss so new variants get
+    generated; once full, hits return a random member so repeated requests
+    don't always see the same question. Entries expire after `ttl_seconds`
+    and the number of keys is bounded by `max_keys` (LRU eviction).
+    """
+
+    def __init__(self, ttl_seconds: float = 86400, max_keys: int = 1000, pool_size: int = 5):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self.pool_size = max(1, pool_size)
+        self._rng = random.Random()
+
+    def get(self, key: str, exclude: Iterable[str] = ()) -> Optional[dict]:
+        """Returns a random pooled payload, or None if the pool is not full yet."""
+        pool = self._live_pool(key)
+        if len(pool) < self.pool_size:
+            return None
+
+        excluded = set(exclude)
+        candidates = [p for p in pool if p.get("question") not in excluded]
+        if not candidates:
+            return None
+        return self._rng.choice(candidates)
+
+    def put(self, key: str, payload: dict) -> None:
+        """Adds a validated payload to the key's pool (ignored when the pool is full or it's a repeat)."""
+        pool = self._live_pool(key)
+        if len(pool) >= self.pool_size:
+            return
+        if any(p.get("question") == payload.get("question") for p in pool):
+            return
+        self._append(key, payload)
+
+    @abstractmethod
+    def _live_pool(self, key: str) -> list:
+        """Non-expired payloads stored under `key` (also marks the key as recently used)."""
+
+    @abstractmethod
+    def _append(self, key: str, payload: dict) -> None:
+        """Persists one payload and enforces `max_keys`."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drops every entry."""
+
+
+class InMemoryLRUCache(QuestionCache):
+    """
+    Per-process LRU backend. Fast, but lost on restart and not shared between replicas.
+    """
+
+    def __init__(self, ttl_seconds: float = 86400, max_keys: int = 1000, pool_size: int = 5):
+        super().__init__(ttl_seconds, max_keys, pool_size)
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, list]" = OrderedDict()
+
+    def _live_pool(self, key: str) -> list:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            entries = self._data.get(key)
+            if entries is None:
+                return []
+            entries[:] = [(ts, p) for ts, p in entries if ts >= cutoff]
+            if not entries:
+                # Fully expired: the key must not keep counting towards max_keys
+                del self._data[key]
+                return []
+            self._data.move_to_end(key)
+            return [p for _, p in entries]
+
+    def _append(self, key: str, payload: dict) -> None:
+        with self._lock:
+            now = time.time()
+            self._data.setdefault(key, []).append((now, payload))
+            self._data.move_to_end(key)
+            if len(self._data) > self.max_keys:
+                # Keys whose entries all expired go before live ones
+                cutoff = now - self.ttl_seconds
+                for stale in [k for k, entries in self._data.items() if entries[-1][0] < cutoff]:
+                    del self._data[stale]
+            while len(self._data) > self.max_keys:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache(QuestionCache):
+    """
+    On-disk backend (SQLite in WAL mode). Survives restarts and can be shared
+    by every process that mounts the same file.
+    """
+
+    def __init__(self, path: str = "/tmp/cache/questions.sqlite", ttl_seconds: float = 86400,
+                 max_keys: int = 1000, pool_size: int = 5):
+        super().__init__(ttl_seconds, max_keys, pool_size)
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS cache_keys (
+                    key TEXT PRIMARY KEY,
+                    last_access REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    payload TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_cache_entries_key ON cache_entries(key);
+                """
+            )
+            self._conn.commit()
+        except sqlite3.Error as exc:
+            logger.error(f"Could not open question cache at {path}")
+            raise AppException("Question cache initialization failed", exc)
+
+    def _live_pool(self, key: str) -> list:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE key = ? AND created_at < ?",
+                (key, now - self.ttl_seconds),
+            )
+            rows = self._conn.execute(
+                "SELECT payload FROM cache_entries WHERE key = ? ORDER BY created_at", (key,)
+            ).fetchall()
+            if rows:
+                self._conn.execute("UPDATE cache_keys SET last_access = ? WHERE key = ?", (now, key))
+            else:
+                # Fully expired: the key must not keep counting towards max_keys
+                self._conn.execute("DELETE FROM cache_keys WHERE key = ?", (key,))
+            self._conn.commit()
+        return [json.loads(r[0]) for r in rows]
+
+    def _append(self, key: str, payload: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cache_keys (key, last_access) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET last_access = excluded.last_access",
+                (key, now),
+            )
+            self._conn.execute(
+                "INSERT INTO cache_entries (key, created_at, payload) VALUES (?, ?, ?)",
+                (key, now, json.dumps(payload, ensure_ascii=False)),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM cache_keys").fetchone()[0] - self.max_keys
+            if overflow > 0:
+                # Expired entries (and the keys left without any) go before live ones
+                self._conn.execute("DELETE FROM cache_entries WHERE created_at < ?", (now - self.ttl_seconds,))
+                self._conn.execute(
+                    "DELETE FROM cache_keys WHERE key NOT IN (SELECT DISTINCT key FROM cache_entries)"
+                )
+                overflow = self._conn.execute("SELECT COUNT(*) FROM cache_keys").fetchone()[0] - self.max_keys
+            if overflow > 0:
+                stale = [r[0] for r in self._conn.execute(
+                    "SELECT key FROM cache_keys ORDER BY last_access LIMIT ?", (overflow,)
+                )]
+                self._conn.executemany("DELETE FROM cache_entries WHERE key = ?", [(k,) for k in stale])
+                self._conn.executemany("DELETE FROM cache_keys WHERE key = ?", [(k,) for k in stale])
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.execute("DELETE FROM cache_keys")
+            self._conn.commit()
+
+
+_shared_caches: dict = {}
+_shared_lock = threading.Lock()
+
+
+def get_question_cache(conf: Optional[dict]) -> Optional[QuestionCache]:
+    """
+    Builds (once per process) the cache described by the `cache` section of
+    config/llm.yaml. Returns None when caching is disabled.
+    """
+    if not conf or conf.get("backend", "none") == "none":
+        return None
+
+    key = json.dumps(conf, sort_keys=True)
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is not None:
+            return cache
+
+        options = {
+            "ttl_seconds": conf.get("ttl_seconds", 86400),
+            "max_keys": conf.get("max_keys", 1000),
+            "pool_size": conf.get("pool_size", 5),
+        }
+        backend = conf["backend"]
+        if backend == "memory":
+            cache = InMemoryLRUCache(**options)
+        elif backend == "sqlite":
+            cache = SQLiteCache(path=conf.get("path", "/tmp/cache/questions.sqlite"), **options)
+        else:
+            raise AppException(f"Unsupported cache backend: {backend}")
+
+        logger.info(f"Question cache enabled | backend: {backend} | pool_size: {options['pool_size']}")
+        _shared_caches[key] = cache
+        return cache
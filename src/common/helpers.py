@@ -1,88 +1,449 @@
-import pandas as pd
+import asyncio
+import contextvars
+import time
+import queue
+import threading
+import uuid
+from typing import NamedTuple, Optional
 from datetime import datetime
-import os
-import streamlit as st
 from utils.logger import get_logger
+from utils.custom_exception import AppException
+from utils.metrics import metrics, current_usage, UsageAccumulator
+from src.generation.dedup import DedupIndex
+from src.analytics.answers import normalize_answer, expected_answer
+from src.models.records import QuizResult, intern_question
+from src.llm.rate_limit import current_session
 
 logger = get_logger(__name__)
 
+
+class GenerationEvent(NamedTuple):
+    """Evento emitido durante a geração incremental do quiz."""
+    kind: str
+    index: int
+    record: Optional[dict]
+    chars: int
+
+
 class QuizManager:
     """
     Manager de Sessão Industrial.
     Responsável por coordenar a geração, avaliação e persistência dos dados do quiz.
     """
     def __init__(self):
+        # QuestionRecords internados (compartilhados entre sessões) e QuizResults
+        # que só referenciam a questão: o estado por sessão fica pequeno
         self.questions = []
         self.results = []
-        # Define um caminho de exportação seguro (padrão Linux/Container)
-        self.export_path = "/tmp/quiz_results.csv"
+        # Tokens/custo do último quiz gerado (preenchido por aiter_questions)
+        self.last_usage = {}
+        # Identifica as linhas desta sessão no results store (download por usuário)
+        self.session_id = uuid.uuid4().hex
+        # Tópico/dificuldade/tipo do quiz atual, gravados junto dos resultados
+        self.quiz_meta = {}
+        self._results_saved = False
+        # Índice de near-duplicates da sessão: vale dentro do quiz e entre quizzes
+        # (criado no primeiro uso, ver `dedup_index`)
+        self._dedup_index = None
+        # Quantas vezes uma vaga é pedida de novo ao LLM quando vem duplicada
+        self.dedup_attempts = 3
+        self._quiz_serial = 0
+        # Gabarito normalizado, calculado uma vez por quiz (ver _answer_key)
+        self._answer_key_cache = (None, [])
+
+    @property
+    def dedup_index(self) -> DedupIndex:
+        """
+        Criado sob demanda: o MinHash importa NumPy, que fica fora do startup
+        e de sessões que nunca geram um quiz.
+        """
+        if self._dedup_index is None:
+            self._dedup_index = DedupIndex()
+        return self._dedup_index
 
-    def generate_questions(self, generator, topic, question_type, difficulty, num_questions):
+    def generate_questions(self, generator, topic, question_type, difficulty, num_questions, max_concurrency=4, batch_size=None, bank=None):
         """
         Orquestra o QuestionGenerator para criar a lista de questões.
         Este é o método exato que o seu app.py está tentando chamar.
+
+        As questões são geradas em paralelo (asyncio + `ainvoke`), limitadas por
+        `max_concurrency` (1 = sequencial). A ordem é preservada e uma falha
+        isolada não descarta as questões que deram certo.
+
+        Com `batch_size` definido, cada completion traz até `batch_size` questões
+        (modo lote), economizando o preâmbulo do prompt a cada questão.
+
+        Com `bank` (QuestionBank), questões pré-geradas são usadas primeiro e o
+        LLM só é chamado para o que faltar.
         """
-        self.questions = [] # Limpa o estado para um novo quiz
-        
-        for i in range(num_questions):
+        return _run_sync(self.agenerate_questions(
+            generator, topic, question_type, difficulty, num_questions, max_concurrency, batch_size, bank
+        ))
+
+    async def agenerate_questions(self, generator, topic, question_type, difficulty, num_questions, max_concurrency=4, batch_size=None, bank=None):
+        """
+        Versão assíncrona de `generate_questions`.
+        """
+        async for _ in self.aiter_questions(
+            generator, topic, question_type, difficulty, num_questions, max_concurrency, batch_size, bank
+        ):
+            pass
+        return self.questions
+
+    def iter_questions(self, generator, topic, question_type, difficulty, num_questions, max_concurrency=4, batch_size=None, bank=None, stream_tokens=False):
+        """
+        Versão síncrona e incremental: entrega `GenerationEvent`s à medida que
+        cada questão fica pronta, para a UI renderizar a questão 1 enquanto as
+        demais ainda estão sendo geradas.
+
+        A geração roda no event loop compartilhado (ver `_background_loop`); os
+        eventos são consumidos na thread chamadora (necessário para o Streamlit
+        desenhar os widgets).
+        """
+        events = queue.Queue()
+        finished = object()
+        stop = threading.Event()
+
+        async def _pump():
+            agen = self.aiter_questions(
+                generator, topic, question_type, difficulty, num_questions,
+                max_concurrency, batch_size, bank, stream_tokens
+            )
             try:
-                if question_type == "Multiple Choice":
-                    # Chama o método do seu QuestionGenerator
-                    q = generator.generate_mcq(topic, difficulty)
-                    q_data = q.dict() if hasattr(q, 'dict') else q
-                    q_data['type'] = 'MCQ'
-                else:
-                    q = generator.generate_fill_blank(topic, difficulty)
-                    q_data = q.dict() if hasattr(q, 'dict') else q
-                    q_data['type'] = 'FIB'
-                
-                self.questions.append(q_data)
-                logger.info(f"Questão {i+1} adicionada ao manager.")
-                
-            except Exception as e:
-                logger.error(f"Erro ao processar questão {i+1}: {str(e)}")
-                raise e
+                async for event in agen:
+                    events.put(event)
+                    if stop.is_set():
+                        break
+            finally:
+                await agen.aclose()
+
+        def _done(future):
+            if future.cancelled():
+                events.put(asyncio.CancelledError())
+            else:
+                events.put(future.exception() or finished)
+
+        asyncio.run_coroutine_threadsafe(_pump(), _background_loop()).add_done_callback(_done)
+        try:
+            while True:
+                item = events.get()
+                if item is finished:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    async def aiter_questions(self, generator, topic, question_type, difficulty, num_questions, max_concurrency=4, batch_size=None, bank=None, stream_tokens=False):
+        """
+        Núcleo da geração: async generator de `GenerationEvent`s.
+
+        - "question": uma questão ficou pronta (`index` = posição no quiz);
+        - "progress": caracteres recebidos até agora (apenas com `stream_tokens`);
+        - "error": a questão `index` falhou e ficará de fora do quiz.
+
+        Ao final, `self.questions` contém as questões na ordem original.
+
+        Questões quase idênticas a outras deste quiz (ou de quizzes anteriores
+        da sessão) são rejeitadas e pedidas de novo, com as já usadas listadas
+        no prompt como exclusões (até `dedup_attempts` vezes por vaga).
+        """
+        self.questions = []
+        self.quiz_meta = {'topic': topic, 'difficulty': difficulty, 'question_type': question_type}
+        slots = [None] * num_questions
+        started = time.perf_counter()
+        first_ready = None
+        mode = "batched" if batch_size else ("serial" if max_concurrency <= 1 else "concurrent")
+
+        self._quiz_serial += 1
+        quiz_id = self._quiz_serial
+        multiple_choice = question_type == "Multiple Choice"
+        generate_one = generator.agenerate_mcq if multiple_choice else generator.agenerate_fill_blank
+        generate_batch = generator.agenerate_mcq_batch if multiple_choice else generator.agenerate_fill_blank_batch
+
+        drawn = self._draw_from_bank(bank, topic, question_type, difficulty, num_questions, quiz_id)
+        for i, record in enumerate(drawn):
+            slots[i] = record
+            first_ready = first_ready or time.perf_counter()
+            yield GenerationEvent("question", i, record, 0)
+
+        # Evita que o cache devolva a mesma questão duas vezes no quiz
+        seen = {r['question'] for r in drawn}
+        # Questões aceitas neste quiz, em ordem (exclusões dos re-prompts)
+        recent = [r['question'] for r in drawn]
+        pending = list(range(len(drawn), num_questions))
+        events = asyncio.Queue()
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        def _progress(i):
+            if not stream_tokens:
+                return None
+            return lambda chars: events.put_nowait(GenerationEvent("progress", i, None, chars))
+
+        async def _one(i):
+            async with semaphore:
+                try:
+                    rejected = []
+                    for attempt in range(self.dedup_attempts):
+                        q = await generate_one(
+                            topic, difficulty, exclude=seen, on_progress=_progress(i),
+                            avoid=(recent + rejected) if rejected else None
+                        )
+                        seen.add(q.question)
+                        if self._accept(q.question, quiz_id, final=attempt + 1 == self.dedup_attempts):
+                            break
+                        rejected.append(q.question)
+                    else:
+                        raise AppException(f"Só vieram duplicatas após {self.dedup_attempts} tentativas.")
+                    recent.append(q.question)
+                    logger.info(f"Questão {i+1} gerada.")
+                    events.put_nowait(GenerationEvent("question", i, _to_record(q, question_type), 0))
+                except Exception as e:
+                    logger.error(f"Erro ao processar questão {i+1}: {str(e)}")
+                    events.put_nowait(GenerationEvent("error", i, None, 0))
+
+        async def _chunk(indices):
+            # Modo lote: um bloco de `batch_size` questões por completion
+            async with semaphore:
+                batch, rejected = [], []
+                for attempt in range(self.dedup_attempts):
+                    missing = len(indices) - len(batch)
+                    if missing <= 0:
+                        break
+                    try:
+                        items = await generate_batch(
+                            topic, difficulty, missing, avoid=(recent + rejected) if rejected else None
+                        )
+                    except Exception as e:
+                        logger.error(f"Erro ao processar lote {indices[0]+1}-{indices[-1]+1}: {str(e)}")
+                        break
+                    for q in items[:missing]:
+                        if self._accept(q.question, quiz_id, final=attempt + 1 == self.dedup_attempts):
+                            batch.append(q)
+                            recent.append(q.question)
+                        else:
+                            rejected.append(q.question)
+                for i, q in zip(indices, batch):
+                    events.put_nowait(GenerationEvent("question", i, _to_record(q, question_type), 0))
+                for i in indices[len(batch):]:
+                    events.put_nowait(GenerationEvent("error", i, None, 0))
+
+        if batch_size:
+            jobs = [_chunk(pending[k:k + batch_size]) for k in range(0, len(pending), batch_size)]
+        else:
+            jobs = [_one(i) for i in pending]
+        # Tokens/custo das chamadas deste quiz são somados via contextvar nas tasks;
+        # a sessão identifica o quiz no escalonador justo do rate limiter
+        usage = UsageAccumulator()
+        context = contextvars.copy_context()
+        context.run(current_usage.set, usage)
+        context.run(current_session.set, self.session_id)
+        loop = asyncio.get_running_loop()
+        tasks = [loop.create_task(job, context=context) for job in jobs]
+
+        try:
+            remaining = len(pending)
+            while remaining:
+                event = await events.get()
+                if event.kind != "progress":
+                    remaining -= 1
+                if event.kind == "question":
+                    slots[event.index] = event.record
+                    first_ready = first_ready or time.perf_counter()
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        self.questions = [r for r in slots if r is not None]
+        self.last_usage = usage.as_dict()
+        self._record_quiz_metrics(mode, started, first_ready, len(drawn), num_questions)
+        self._ensure_generated(num_questions)
+
+    def load_questions(self, questions, topic, question_type, difficulty, usage=None):
+        """Adota um quiz gerado fora deste processo (ex.: pelo servidor de API)."""
+        self.questions = [intern_question(q, question_type) for q in questions]
+        self.quiz_meta = {'topic': topic, 'difficulty': difficulty, 'question_type': question_type}
+        self.last_usage = usage or {}
+        self.results = []
+
+    def _accept(self, text, quiz_id, final):
+        """
+        Registra a questão no índice da sessão se não for near-duplicate.
+        Repetir uma questão do próprio quiz nunca é aceito; repetir uma de um
+        quiz anterior só é tolerado na última tentativa (melhor que perder a vaga).
+        """
+        match = self.dedup_index.add_if_new(text, quiz_id, within={quiz_id} if final else None)
+        if match is None:
+            return True
+        scope = "quiz" if match.key == quiz_id else "history"
+        metrics.inc("quiz_duplicates_rejected_total", scope=scope)
+        logger.info(f"Questão rejeitada como duplicata ({scope}, similaridade {match.similarity:.2f}).")
+        return False
+
+    def _record_quiz_metrics(self, mode, started, first_ready, from_bank, num_questions):
+        """Métricas agregadas por quiz (latência, time-to-first-question, custo)."""
+        metrics.observe("quiz_generation_seconds", time.perf_counter() - started, mode=mode)
+        if first_ready is not None:
+            metrics.observe("quiz_time_to_first_question_seconds", first_ready - started, mode=mode)
+        metrics.observe("quiz_cost_usd", self.last_usage.get("cost_usd", 0.0), mode=mode)
+        metrics.inc("quiz_questions_total", from_bank, source="bank")
+        metrics.inc("quiz_questions_total", len(self.questions) - from_bank, source="live")
+        metrics.inc("quiz_questions_failed_total", num_questions - len(self.questions))
+
+    def _draw_from_bank(self, bank, topic, question_type, difficulty, num_questions, quiz_id):
+        """
+        Retira do banco de questões o que estiver disponível (pode ser menos que o
+        pedido). Duplicatas do que a sessão já viu ficam no banco para outras sessões.
+        """
+        if bank is None:
+            return []
+        drawn = bank.take(
+            question_type, topic, difficulty, num_questions,
+            accept=lambda r: self._accept(r['question'], quiz_id, final=False),
+        )
+        if drawn:
+            logger.info(f"{len(drawn)}/{num_questions} questões servidas pelo banco.")
+        return drawn
+
+    def _ensure_generated(self, num_questions):
+        """Só falha o quiz inteiro se nenhuma questão foi gerada."""
+        if not self.questions:
+            raise AppException(f"Nenhuma das {num_questions} questões pôde ser gerada.")
+        if len(self.questions) < num_questions:
+            logger.warning(f"Quiz parcial: {len(self.questions)}/{num_questions} questões geradas.")
 
     def evaluate_quiz(self, user_responses):
         """
         Compara as respostas do usuário com o gabarito da IA.
+
+        A comparação é normalizada (caixa, espaços, pontuação nas bordas; ver
+        `normalize_answer`) e o gabarito normalizado é calculado uma vez por
+        quiz. Para corrigir milhares de submissões de uma vez, use
+        `src.analytics.grading.grade_submissions`.
         """
-        self.results = []
-        for i, q in enumerate(self.questions):
-            user_ans = user_responses[i]
-            # Lógica de correção (MCQ usa índice/texto, FIB usa texto direto)
-            is_correct = str(user_ans).strip().lower() == str(q['correct_answer']).strip().lower()
-            
-            self.results.append({
-                'question': q['question'],
-                'user_answer': user_ans,
-                'correct_answer': q['correct_answer'],
-                'explanation': q.get('explanation', 'Sem explicação disponível.'),
-                'is_correct': is_correct,
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
-
-    def save_to_csv(self):
-        """
-        Persiste os resultados para monitoramento (DataOps).
-        """
-        if not self.results:
-            return None
-            
+        self._results_saved = False
+        started = time.perf_counter()
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Cada linha referencia a questão em vez de copiar enunciado/gabarito/explicação
+        self.results = [
+            QuizResult(q, user_ans, normalize_answer(user_ans) == expected, timestamp)
+            for q, expected, user_ans in zip(self.questions, self._answer_key(), user_responses)
+        ]
+        metrics.observe("quiz_evaluation_seconds", time.perf_counter() - started)
+
+    def _answer_key(self):
+        """Gabarito normalizado do quiz atual (recalculado só se as questões mudarem)."""
+        questions, key = self._answer_key_cache
+        if questions is not self.questions or len(key) != len(self.questions):
+            key = [normalize_answer(expected_answer(q)) for q in self.questions]
+            self._answer_key_cache = (self.questions, key)
+        return key
+
+    def score(self):
+        """(acertos, total, percentual) da última avaliação."""
+        correct = sum(1 for r in self.results if r['is_correct'])
+        total = len(self.results)
+        return correct, total, (correct / total) * 100 if total else 0.0
+
+    def snapshot(self) -> dict:
+        """
+        Estado serializável da sessão para um `SessionStore`. Os resultados
+        vão como (resposta, acerto), na ordem das questões, sem repeti-las.
+        """
+        return {
+            'session_id': self.session_id,
+            'quiz_meta': dict(self.quiz_meta),
+            'last_usage': dict(self.last_usage),
+            'questions': list(self.questions),
+            'results': [[r.user_answer, r.is_correct] for r in self.results],
+            'evaluated_at': self.results[0].timestamp if self.results else None,
+            'results_saved': self._results_saved,
+            'quiz_serial': self._quiz_serial,
+        }
+
+    @classmethod
+    def restore(cls, state: dict) -> 'QuizManager':
+        """
+        Reconstrói a sessão a partir de `snapshot()`. O índice de duplicatas
+        volta só com as questões do quiz atual (o histórico de quizzes
+        anteriores não é persistido).
+        """
+        manager = cls()
+        manager.session_id = state['session_id']
+        manager.quiz_meta = dict(state.get('quiz_meta') or {})
+        manager.last_usage = dict(state.get('last_usage') or {})
+        manager.questions = [intern_question(q) for q in state.get('questions') or []]
+        timestamp = state.get('evaluated_at')
+        manager.results = [
+            QuizResult(q, user_ans, bool(is_correct), timestamp)
+            for q, (user_ans, is_correct) in zip(manager.questions, state.get('results') or [])
+        ]
+        manager._results_saved = bool(state.get('results_saved'))
+        manager._quiz_serial = state.get('quiz_serial', 0)
+        for q in manager.questions:
+            manager.dedup_index.add(q['question'], manager._quiz_serial)
+        return manager
+
+    def save_results(self, store):
+        """
+        Persiste os resultados para monitoramento (DataOps) no results store
+        append-only. A escrita em disco acontece em lote, em background; a
+        chamada só enfileira as linhas. Cada avaliação é gravada uma única vez.
+        """
+        if not self.results or self._results_saved:
+            return 0
+
         try:
-            df = pd.DataFrame(self.results)
-            # Se o arquivo já existe, anexa (append), se não, cria novo
-            if not os.path.isfile(self.export_path):
-                df.to_csv(self.export_path, index=False)
-            else:
-                df.to_csv(self.export_path, mode='a', header=False, index=False)
-                
-            logger.info(f"Resultados exportados com sucesso para {self.export_path}")
-            return self.export_path
+            rows = [{'session_id': self.session_id, **self.quiz_meta, **r} for r in self.results]
+            count = store.append(rows)
+            self._results_saved = True
+            logger.info(f"{count} resultados enfileirados para persistência (sessão {self.session_id}).")
+            return count
         except Exception as e:
             logger.error(f"Falha na exportação DataOps: {str(e)}")
-            return None
+            return 0
+
+def _to_record(q, question_type):
+    """Converte o objeto Pydantic no registro (imutável e internado) consumido pela UI."""
+    return intern_question(q, question_type)
+
+_loop_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Event loop de longa duração (thread daemon) compartilhado pelas chamadas
+    síncronas, iniciado no primeiro uso. O cliente async do modelo compartilhado
+    (`get_llm`) mantém conexões httpx presas ao loop em que foram abertas: um
+    `asyncio.run` por quiz fecharia esse loop e a chamada seguinte falharia
+    com "Event loop is closed".
+    """
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="quiz-event-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def _run_sync(coro):
+    """
+    Executa uma corrotina a partir de código síncrono, no event loop
+    compartilhado (também quando a thread chamadora já tem um loop ativo).
+    """
+    loop = _background_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise AppException("Chamada síncrona feita de dentro do event loop compartilhado; use a versão async.")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
 
 def rerun():
     """Helper para compatibilidade de versões do Streamlit."""
+    # Import tardio: o servidor de API e os scripts usam este módulo sem Streamlit
+    import streamlit as st
     st.rerun()
\ No newline at end of file
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import zlib
+from functools import lru_cache
+from typing import TYPE_CHECKING, Hashable, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = 0xFFFFFFFF
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, no punctuation, single spaces: the identity used for dedup."""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+class DuplicateMatch(NamedTuple):
+    """An already-indexed question that a candidate duplicates."""
+    key: Hashable
+    similarity: float
+
+
+class MinHasher:
+    """
+    MinHash signatures over character shingles of the normalized text.
+
+    The `num_perm` universal hash functions (a*x + b mod p) are applied to all
+    shingles at once with NumPy; the fraction of equal signature slots
+    estimates the Jaccard similarity of the two shingle sets.
+
+    NumPy is imported here and in `DedupIndex`, not at module level:
+    `normalize_text` and the quiz manager import this module on the startup path.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 4, seed: int = 1):
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+        self._prime = np.uint64(_MERSENNE_PRIME)
+        self._mask = np.uint64(_MAX_HASH)
+
+    def shingles(self, normalized: str) -> set:
+        k = self.shingle_size
+        if len(normalized) <= k:
+            return {normalized}
+        return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+    def signature(self, normalized: str) -> np.ndarray:
+        import numpy as np
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in self.shingles(normalized)), dtype=np.uint64
+        )
+        # a, x < 2**32 keeps a*x + b below 2**64, so uint64 never wraps
+        permuted = (np.outer(hashes, self._a) + self._b) % self._prime & self._mask
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+@lru_cache(maxsize=None)
+def _shared_hasher(num_perm: int, shingle_size: int, seed: int) -> MinHasher:
+    # Stateless once built: every index with the same parameters shares one
+    return MinHasher(num_perm, shingle_size, seed)
+
+
+class DedupIndex:
+    """
+    Thread-safe near-duplicate index for question texts.
+
+    Exact repeats are caught by a hash of the normalized text. Near-duplicates
+    go through MinHash + LSH banding: only questions sharing at least one band
+    are compared, so lookups stay sub-linear on banks of tens of thousands of
+    questions. A candidate is a duplicate when its estimated Jaccard
+    similarity reaches `threshold`.
+
+    Each entry carries a `key` (e.g. the quiz it belongs to) so callers can
+    tell "repeated in this quiz" from "seen in an earlier one".
+    """
+
+    def __init__(self, threshold: float = 0.75, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 4, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("DedupIndex: num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._hasher = _shared_hasher(num_perm, shingle_size, seed)
+        self._lock = threading.Lock()
+        self._exact: dict = {}
+        # (band number, band bytes) -> entry ids; one dict for all bands
+        self._buckets: dict = {}
+        # There is one index per session and per bank slot: storage starts
+        # empty and doubles as questions arrive
+        import numpy as np
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._keys: list = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def _digest(normalized: str) -> bytes:
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+    def _band_keys(self, signature: np.ndarray) -> list:
+        return [(i, signature[i * self.rows:(i + 1) * self.rows].tobytes()) for i in range(self.bands)]
+
+    def _find(self, digest: bytes, signature: np.ndarray, bands: list, within=None) -> Optional[DuplicateMatch]:
+        exact = self._exact.get(digest)
+        if exact is not None and (within is None or self._keys[exact] in within):
+            return DuplicateMatch(self._keys[exact], 1.0)
+
+        candidates = set()
+        for band in bands:
+            candidates.update(self._buckets.get(band, ()))
+        if within is not None:
+            candidates = {i for i in candidates if self._keys[i] in within}
+        if not candidates:
+            return None
+
+        import numpy as np
+        ids = np.fromiter(candidates, dtype=np.int64)
+        similarity = (self._signatures[ids] == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < self.threshold:
+            return None
+        return DuplicateMatch(self._keys[ids[best]], float(similarity[best]))
+
+    def _insert(self, digest: bytes, signature: np.ndarray, bands: list, key: Hashable) -> None:
+        idx = len(self._keys)
+        if idx == len(self._signatures):
+            import numpy as np
+            grown = np.empty((max(8, 2 * idx), self._signatures.shape[1]), dtype=np.uint32)
+            grown[:idx] = self._signatures
+            self._signatures = grown
+        self._signatures[idx] = signature
+        self._keys.append(key)
+        self._exact.setdefault(digest, idx)
+        for band in bands:
+            self._buckets.setdefault(band, []).append(idx)
+
+    def _prepare(self, text: str) -> tuple:
+        normalized = normalize_text(text)
+        signature = self._hasher.signature(normalized)
+        return self._digest(normalized), signature, self._band_keys(signature)
+
+    def find(self, text: str) -> Optional[DuplicateMatch]:
+        """The closest indexed question at or above the threshold, if any."""
+        prepared = self._prepare(text)
+        with self._lock:
+            return self._find(*prepared)
+
+    def add(self, text: str, key: Hashable = None) -> None:
+        prepared = self._prepare(text)
+        with self._lock:
+            self._insert(*prepared, key)
+
+    def add_if_new(self, text: str, key: Hashable = None, within=None) -> Optional[DuplicateMatch]:
+        """
+        Indexes `text` unless it duplicates an entry; returns the match when rejected.
+        With `within`, only entries whose key is in it count as duplicates.
+        """
+        prepared = self._prepare(text)
+        with self._lock:
+            match = self._find(*prepared, within)
+            if match is not None:
+                return match
+            self._insert(*prepared, key)
+            return None
@@ -0,0 +1,307 @@
+import json
+import re
+from functools import lru_cache
+from typing import Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib decoder gives the same results
+    orjson = None
+
+# Only the characters that change nesting or string state. A single-character
+# class can't backtrack, so every scan below is linear in the text length.
+_STRUCTURAL = re.compile(r'[{}\[\]"\\]')
+_STREAM_TOKENS = re.compile(r'[{}\[\]",:]')
+_CLOSERS = {"}": "{", "]": "["}
+
+
+def loads(text: str):
+    """
+    Decodes one JSON document, with orjson when it is installed.
+    Literal control characters inside strings (raw newlines are a common LLM
+    slip) are tolerated by falling back to the lenient stdlib decoder.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text, strict=False)
+
+
+def json_spans(text: str, openers: str = "{") -> list:
+    """
+    `(start, end)` of the outermost balanced JSON values in `text` that open
+    with one of `openers`, in order, found in a single pass.
+
+    Markdown fences, chatty prose and stray unmatched brackets around the
+    payload are skipped; brackets inside strings are ignored. Unlike
+    restarting the scan at every `{`, the cost stays linear on long or
+    truncated completions.
+    """
+    stack, spans = [], []
+    in_string = False
+    skip_to = 0
+    for match in _STRUCTURAL.finditer(text):
+        pos = match.start()
+        if pos < skip_to:
+            continue
+        char = match.group()
+        if in_string:
+            if char == "\\":
+                skip_to = pos + 2
+            elif char == '"':
+                in_string = False
+        elif not stack:
+            # Outside any value only an opener matters (quotes in prose don't)
+            if char in openers:
+                stack.append((char, pos))
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append((char, pos))
+        elif char in _CLOSERS and stack[-1][0] == _CLOSERS[char]:
+            opener, start = stack.pop()
+            if opener in openers:
+                # An enclosing value supersedes the spans nested in it
+                while spans and spans[-1][0] > start:
+                    spans.pop()
+                spans.append((start, pos + 1))
+    return spans
+
+
+def extract_json(text: str, openers: str = "{") -> Optional[str]:
+    """The first balanced JSON value in `text` (see `json_spans`), or None."""
+    spans = json_spans(text, openers)
+    if not spans:
+        return None
+    start, end = spans[0]
+    return text[start:end]
+
+
+def decode_first(text: str, types: tuple = (dict,), openers: str = "{"):
+    """
+    Decodes the first embedded JSON value of one of `types`.
+    Raises `json.JSONDecodeError` (an output-format error for the retry
+    policy) when there is none.
+    """
+    # Common case first: one value, maybe inside a fence, sliced and decoded at C speed
+    starts = [i for i in (text.find(o) for o in openers) if i != -1]
+    if starts:
+        start = min(starts)
+        end = text.rfind("}" if text[start] == "{" else "]") + 1
+        try:
+            data = loads(text[start:end])
+            if isinstance(data, types):
+                return data
+        except json.JSONDecodeError:
+            pass
+
+    error = None
+    for start, end in json_spans(text, openers):
+        try:
+            data = loads(text[start:end])
+        except json.JSONDecodeError as e:
+            error = error or e
+            continue
+        if isinstance(data, types):
+            return data
+    raise error or json.JSONDecodeError("No JSON object found in the completion", text, 0)
+
+
+class SchemaParser:
+    """
+    Completion text -> validated `schema` instance.
+
+    The pydantic validator is compiled once per schema (`get_parser`), and a
+    completion that is already a bare JSON object is decoded and validated in
+    one pass by pydantic-core (`validate_json`), with no intermediate dict.
+    Anything else (fences, prose, raw newlines in strings) takes the
+    extraction path: `json_spans` + `loads` + `validate`.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.adapter = TypeAdapter(schema)
+
+    def validate(self, data):
+        return self.adapter.validate_python(data)
+
+    def decode(self, text: str) -> dict:
+        return decode_first(text)
+
+    def parse(self, text: str):
+        stripped = text.strip()
+        if stripped.startswith("{") and stripped.endswith("}"):
+            try:
+                return self.adapter.validate_json(stripped)
+            except ValidationError as e:
+                if not any(err["type"] == "json_invalid" for err in e.errors()):
+                    raise
+        return self.validate(self.decode(text))
+
+    def items(self, text: str) -> list:
+        """
+        The raw item list of a batch completion (`{"questions": [...]}` or a
+        bare list), undecoded by the schema so each item can be validated on its own.
+        """
+        data = decode_first(text, (dict, list), openers="{[")
+        items = data.get("questions", []) if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise ValueError("Batch response does not contain a 'questions' list")
+        return items
+
+    def stream(self, fail_fast: bool = False, tolerate=()) -> "StreamingParser":
+        return StreamingParser(self, fail_fast, tolerate)
+
+
+@lru_cache(maxsize=None)
+def get_parser(schema) -> SchemaParser:
+    """Shared `SchemaParser` per schema class (validators are built once per process)."""
+    return SchemaParser(schema)
+
+
+class StreamingParser:
+    """
+    Incremental parser for a streamed single-object completion.
+
+    `feed(chunk)` scans only the new characters. Each top-level field is
+    decoded as soon as its value is complete and validated against the
+    schema right away, so a bad field is known while the rest of the
+    completion is still arriving; with `fail_fast` its `ValidationError` is
+    raised from `feed` (fields in `tolerate`, e.g. the ones local repair can
+    fix, only fail at the end). `result()` then validates the fields already
+    decoded instead of re-parsing the whole text.
+    """
+
+    def __init__(self, parser: SchemaParser, fail_fast: bool = False, tolerate=()):
+        self.parser = parser
+        self.fail_fast = fail_fast
+        self.tolerate = frozenset(tolerate)
+        self.text = ""
+        self.fields: dict = {}
+        self.errors: dict = {}
+        self.complete = False
+        self._broken = False
+        self._scanned = 0
+        self._depth = 0
+        self._string_start = None
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+    def feed(self, chunk: str) -> list:
+        """Consumes a chunk; returns the names of the fields completed by it."""
+        self.text += chunk
+        if self.complete:
+            return []
+        completed = []
+        text, pos = self.text, self._scanned
+        while not self.complete:
+            if self._string_start is not None:
+                # Jump straight to the closing quote: string contents are never tokenized
+                end = self._string_end(pos)
+                if end == -1:
+                    pos = len(text)
+                    break
+                self._close_string(end)
+                pos = end + 1
+                continue
+            match = _STREAM_TOKENS.search(text, pos)
+            if match is None:
+                pos = len(text)
+                break
+            pos = match.end()
+            self._step(match.group(), match.start(), completed)
+        self._scanned = pos
+        for name in completed:
+            self._check(name)
+        return completed
+
+    def _string_end(self, pos: int) -> int:
+        """Position of the unescaped quote closing the current string, or -1 if it hasn't arrived."""
+        text = self.text
+        while True:
+            end = text.find('"', pos)
+            if end == -1:
+                # A trailing backslash may escape the first character of the next chunk
+                return -1
+            backslashes = 0
+            while text[end - 1 - backslashes] == "\\":
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return end
+            pos = end + 1
+
+    def _close_string(self, end: int) -> None:
+        if self._key_start is not None:
+            self._key = self._decode(self._key_start, end + 1)
+            self._key_start = None
+        self._string_start = None
+
+    def _step(self, char: str, pos: int, completed: list) -> None:
+        if self._depth == 0:
+            # Preamble / markdown fence before the object
+            if char == "{":
+                self._depth = 1
+            return
+
+        top_level = self._depth == 1
+        if char == '"':
+            self._string_start = pos
+            if top_level and self._key is None and self._value_start is None:
+                self._key_start = pos
+        elif char == ":" and top_level and self._key is not None and self._value_start is None:
+            self._value_start = pos + 1
+        elif char == "," and top_level:
+            self._end_value(pos, completed)
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self._end_value(pos, completed)
+                self.complete = True
+
+    def _decode(self, start: int, end: int):
+        try:
+            return loads(self.text[start:end])
+        except json.JSONDecodeError:
+            self._broken = True
+            return None
+
+    def _end_value(self, pos: int, completed: list) -> None:
+        if self._key is not None and self._value_start is not None:
+            value = self._decode(self._value_start, pos)
+            if not self._broken:
+                self.fields[self._key] = value
+                completed.append(self._key)
+        self._key = None
+        self._value_start = None
+
+    def _check(self, name: str) -> None:
+        try:
+            self.parser.validate(self.fields)
+            return
+        except ValidationError as e:
+            # Fields not streamed yet show up as "missing": only `name`'s own errors count here
+            errors = [err for err in e.errors() if err["loc"][:1] == (name,) and err["type"] != "missing"]
+            if not errors:
+                return
+            self.errors[name] = errors
+            if self.fail_fast and name not in self.tolerate:
+                raise ValidationError.from_exception_data(e.title, [
+                    {"type": err["type"], "loc": err["loc"], "input": err["input"], "ctx": err.get("ctx", {})}
+                    for err in errors
+                ])
+
+    def result(self):
+        """The validated instance; falls back to parsing the full text when the stream didn't decode cleanly."""
+        if self.complete and not self._broken and self.fields:
+            try:
+                return self.parser.validate(self.fields)
+            except ValidationError:
+                pass
+        return self.parser.parse(self.text)
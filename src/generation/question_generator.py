@@ -1,8 +1,18 @@
-from langchain_core.output_parsers import PydanticOutputParser
+import asyncio
+import time
+from contextlib import aclosing
+from pydantic import ValidationError
 from src.models.schema import MCQQuestion, FillBlankQuestion
-from src.prompts.templates import mcq_prompt_template, fill_blank_prompt_template
-from src.llm.llm_client import LLMClient
+from src.prompts.templates import format_exclusions
+from src.prompts.builder import MCQ_PROMPT, FILL_BLANK_PROMPT, MCQ_BATCH_PROMPT, FILL_BLANK_BATCH_PROMPT
+from src.llm.llm_client import get_llm_client
+from src.llm.router import LLMRouter, get_llm_router
+from src.cache.question_cache import get_question_cache, make_cache_key
+from src.generation.retry import RetryPolicy, ErrorKind, classify_error
+from src.generation.repair import repair_locally, repair_payload, repairable_fields, build_fixup_prompt
+from src.generation.parsing import get_parser
 from utils.logger import get_logger
+from utils.metrics import metrics
 from utils.custom_exception import AppException
 
 class QuestionGenerator:
@@ -14,41 +24,369 @@ class QuestionGenerator:
     educational content with high reliability.
     """
 
-    def __init__(self, max_retries: int = 3):
-        # We use our agnostic LLMClient factory
-        self.llm_client = LLMClient()
-        self.llm = self.llm_client.get_llm()
+    def __init__(self, max_retries: int = None, llm_client=None, cache=None, retry_policy: RetryPolicy = None):
+        # We use our agnostic LLMClient factory (shared, process-wide)
+        self.llm_client = llm_client or get_llm_client()
+        # Multi-provider router (config/llm.yaml -> routing) or the single configured model
+        self.llm = get_llm_router(self.llm_client.config_path) or self.llm_client.get_llm()
         self.logger = get_logger(self.__class__.__name__)
-        self.max_retries = max_retries
+        # Retry budget/timeouts come from `request` in config/llm.yaml unless overridden
+        self.retry_policy = retry_policy or RetryPolicy.from_request_config(
+            self.llm_client.config["providers"][self.llm_client.provider].get("request"), max_retries
+        )
+        self.max_retries = self.retry_policy.max_attempts
+        # model name -> (provider, pricing) for token/cost accounting
+        self._pricing = {
+            conf["model"]["name"]: (name, conf.get("pricing") or {})
+            for name, conf in self.llm_client.config["providers"].items()
+        }
+        # Validated-question cache in front of the provider (config/llm.yaml -> cache)
+        # (pass cache=False to disable it explicitly)
+        if cache is None:
+            cache = get_question_cache(self.llm_client.config.get("cache"))
+        self.cache = cache or None
 
-    def _generate_with_retry(self, prompt_template, parser, topic: str, difficulty: str):
+    def _model_id(self, provider: str = None) -> str:
+        provider = provider or self.llm_client.provider
+        conf = self.llm_client.config["providers"].get(provider) or {}
+        return f"{provider}:{(conf.get('model') or {}).get('name', '')}"
+
+    def _served_by(self, response) -> str:
+        """Provider that produced `response` (stamped by the router; the configured one otherwise)."""
+        metadata = getattr(response, "response_metadata", None) or {}
+        return metadata.get("served_by") or self.llm_client.provider
+
+    def _cache_key(self, prompt, topic: str, difficulty: str, provider: str = None) -> str:
+        # The compiled prompt's fingerprint changes with any prompt edit, starting a fresh pool
+        return make_cache_key(prompt.fingerprint, topic, difficulty, self._model_id(provider))
+
+    def _cache_lookup(self, prompt, topic: str, difficulty: str, schema, exclude):
+        """
+        Returns a cached question or None. Each model has its own pool; behind
+        the router, the pools of every routed provider are tried in routing order.
+        Payloads were validated before being stored, so they are rebuilt with
+        `model_construct` (no parsing, no validators).
+        """
+        if self.cache is None:
+            return None
+        providers = self.llm.order if isinstance(self.llm, LLMRouter) else [self.llm_client.provider]
+        payload = None
+        for provider in providers:
+            payload = self.cache.get(self._cache_key(prompt, topic, difficulty, provider), exclude or ())
+            if payload is not None:
+                break
+        metrics.inc("question_cache_total", result="miss" if payload is None else "hit")
+        if payload is None:
+            return None
+        self.logger.info(f"Cache hit | {schema.__name__}")
+        return schema.model_construct(**payload)
+
+    def _cache_store(self, prompt, topic: str, difficulty: str, question, provider: str) -> None:
+        if self.cache is not None:
+            self.cache.put(self._cache_key(prompt, topic, difficulty, provider), question.model_dump())
+
+    def _generate_with_retry(self, prompt, parser, topic: str, difficulty: str, avoid=None):
         """
         Internal logic to handle LLM non-determinism with retry mechanisms.
+
+        Failures are classified (see `src.generation.retry`): transient provider
+        errors back off with jitter, honoring Retry-After; malformed output is
+        first repaired locally or with a short fix-up call before paying for a
+        full regeneration; fatal errors are not retried at all.
+
+        Returns `(question, provider that answered)`.
         """
-        for attempt in range(self.max_retries):
+        policy = self.retry_policy
+        for attempt in range(policy.max_attempts):
             try:
-                self.logger.info(f"Attempt {attempt + 1}/{self.max_retries} | Generating {topic} ({difficulty})")
+                self.logger.info(f"Attempt {attempt + 1}/{policy.max_attempts} | Generating {topic} ({difficulty})")
                 
                 # Formatting prompt and calling the LLM
-                formatted_prompt = prompt_template.format(topic=topic, difficulty=difficulty)
-                response = self.llm.invoke(formatted_prompt)
+                with metrics.timer("generation_stage_seconds", stage="prompt_format"):
+                    formatted_prompt = prompt.render(format_exclusions(avoid), topic=topic, difficulty=difficulty)
+                response = self._invoke(formatted_prompt, parser)
                 
-                # Parsing string content into a Pydantic Object
-                return parser.parse(response.content)
+                # Parsing string content into a Pydantic Object (repairing it if needed)
+                question = self._parse_or_repair(response.content, parser)
+                metrics.inc("llm_attempts_total", outcome="success", kind="none")
+                return question, self._served_by(response)
             
             except Exception as e:
-                self.logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt == self.max_retries - 1:
-                    self.logger.error(f"Generation failed after {self.max_retries} attempts for topic: {topic}")
+                kind = classify_error(e)
+                metrics.inc("llm_attempts_total", outcome="failure", kind=kind.value)
+                self.logger.warning(f"Attempt {attempt + 1} failed ({kind.value}): {str(e)}")
+                if not policy.should_retry(kind, attempt):
+                    self.logger.error(f"Generation failed after {attempt + 1} attempts for topic: {topic}")
                     raise AppException("LLM Generation Final Failure", e)
+                time.sleep(policy.delay(kind, attempt, e))
+
+    async def _agenerate_with_retry(self, prompt, parser, topic: str, difficulty: str, on_progress=None, avoid=None):
+        """
+        Async twin of `_generate_with_retry`, built on the LangChain `ainvoke` API
+        so several questions can be in flight on the same event loop.
+
+        When `on_progress` is given the completion is consumed through `astream`
+        and the callback receives the number of characters received so far.
+        """
+        policy = self.retry_policy
+        for attempt in range(policy.max_attempts):
+            try:
+                self.logger.info(f"Attempt {attempt + 1}/{policy.max_attempts} | Generating {topic} ({difficulty}) [async]")
+
+                with metrics.timer("generation_stage_seconds", stage="prompt_format"):
+                    formatted_prompt = prompt.render(format_exclusions(avoid), topic=topic, difficulty=difficulty)
+                stream = None
+                if on_progress is None:
+                    call = self._ainvoke(formatted_prompt, parser)
+                else:
+                    # Without a fix-up call to fall back on, an unrepairable field ends the stream early
+                    stream = parser.stream(fail_fast=not policy.fixup_call, tolerate=repairable_fields(parser.schema))
+                    call = self._astream_content(formatted_prompt, on_progress, stream)
+                response = await asyncio.wait_for(call, self._call_timeout())
+
+                question = await self._aparse_or_repair(response.content, parser, stream)
+                metrics.inc("llm_attempts_total", outcome="success", kind="none")
+                return question, self._served_by(response)
+
+            except Exception as e:
+                kind = classify_error(e)
+                metrics.inc("llm_attempts_total", outcome="failure", kind=kind.value)
+                self.logger.warning(f"Attempt {attempt + 1} failed ({kind.value}): {str(e)}")
+                if not policy.should_retry(kind, attempt):
+                    self.logger.error(f"Generation failed after {attempt + 1} attempts for topic: {topic}")
+                    raise AppException("LLM Generation Final Failure", e)
+                await asyncio.sleep(policy.delay(kind, attempt, e))
+
+    def _record_usage(self, response) -> None:
+        """Feeds provider-reported token usage (LangChain `usage_metadata`) into the metrics."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        metadata = getattr(response, "response_metadata", None) or {}
+        if not usage and metadata.get("token_usage"):
+            token_usage = metadata["token_usage"]
+            usage = {"input_tokens": token_usage.get("prompt_tokens", 0), "output_tokens": token_usage.get("completion_tokens", 0)}
+        if not usage:
+            return
+
+        # Priced as the provider that answered (behind the router, not necessarily the configured one)
+        provider = self._served_by(response)
+        conf = self.llm_client.config["providers"].get(provider) or {}
+        served_model = (conf.get("model") or {}).get("name")
+        model = metadata.get("model_name") or served_model or self._model_id().split(":", 1)[1]
+        # Providers report dated snapshots ("gpt-4o-2024-08-06"), so match on prefix
+        if served_model and model.startswith(served_model):
+            configured, pricing = served_model, conf.get("pricing") or {}
+        else:
+            configured = next((m for m in self._pricing if model.startswith(m)), None)
+            provider, pricing = self._pricing.get(configured, (provider, {}))
+        metrics.record_usage(provider, configured or model, usage.get("input_tokens", 0), usage.get("output_tokens", 0), pricing)
+
+    def _parse(self, content: str, parser, stream=None):
+        """
+        JSON decoding and schema validation. Clean JSON is decoded and validated
+        in one pass (see `SchemaParser.parse`), so both are timed as one stage;
+        a streamed completion reuses the fields its `StreamingParser` already decoded.
+        """
+        with metrics.timer("generation_stage_seconds", stage="parse"):
+            return stream.result() if stream is not None else parser.parse(content)
+
+    def _repair(self, content: str, schema):
+        with metrics.timer("generation_stage_seconds", stage="repair"):
+            return repair_locally(content, schema)
+
+    def _accepts(self, content: str, parser) -> None:
+        """Cheap acceptance check used by the router to pick the first valid hedge."""
+        try:
+            self._parse(content, parser)
+        except Exception:
+            if self._repair(content, parser.schema) is None:
+                raise
+
+    def _call_timeout(self):
+        """
+        Timeout for one async provider call. Rate-limited models enforce it
+        themselves once budget is granted, so the budget wait (bounded by
+        `max_wait_seconds`) is not cut short by it.
+        """
+        return None if getattr(self.llm, "times_calls", False) else self.retry_policy.timeout
+
+    def _invoke(self, formatted_prompt, parser=None):
+        with metrics.timer("generation_stage_seconds", stage="provider_call"):
+            if isinstance(self.llm, LLMRouter) and parser is not None:
+                response = self.llm.invoke(formatted_prompt, validate=lambda r: self._accepts(r.content, parser))
+            else:
+                response = self.llm.invoke(formatted_prompt)
+        self._record_usage(response)
+        return response
+
+    async def _ainvoke(self, formatted_prompt, parser=None):
+        with metrics.timer("generation_stage_seconds", stage="provider_call"):
+            if isinstance(self.llm, LLMRouter) and parser is not None:
+                response = await self.llm.ainvoke(formatted_prompt, validate=lambda r: self._accepts(r.content, parser))
+            else:
+                response = await self.llm.ainvoke(formatted_prompt)
+        self._record_usage(response)
+        return response
+
+    def _parse_or_repair(self, content: str, parser, stream=None):
+        """
+        Parses the completion; on failure tries a local repair, then a short
+        fix-up call. Re-raises the original error if nothing worked.
+        """
+        try:
+            return self._parse(content, parser, stream)
+        except Exception as e:
+            schema = parser.schema
+            repaired = self._repair(content, schema)
+            if repaired is not None:
+                self.logger.info(f"Output repaired locally | {schema.__name__}")
+                metrics.inc("llm_repairs_total", method="local")
+                return repaired
+            if not self.retry_policy.fixup_call:
+                raise
+            self.logger.info(f"Requesting fix-up call | {schema.__name__}")
+            fixed = self._invoke(build_fixup_prompt(content, e, schema)).content
+            repaired = self._repair(fixed, schema)
+            if repaired is None:
+                raise
+            metrics.inc("llm_repairs_total", method="fixup_call")
+            return repaired
+
+    async def _aparse_or_repair(self, content: str, parser, stream=None):
+        """Async twin of `_parse_or_repair`."""
+        try:
+            return self._parse(content, parser, stream)
+        except Exception as e:
+            schema = parser.schema
+            repaired = self._repair(content, schema)
+            if repaired is not None:
+                self.logger.info(f"Output repaired locally | {schema.__name__}")
+                metrics.inc("llm_repairs_total", method="local")
+                return repaired
+            if not self.retry_policy.fixup_call:
+                raise
+            self.logger.info(f"Requesting fix-up call | {schema.__name__}")
+            fixed = await asyncio.wait_for(self._ainvoke(build_fixup_prompt(content, e, schema)), self._call_timeout())
+            repaired = self._repair(fixed.content, schema)
+            if repaired is None:
+                raise
+            metrics.inc("llm_repairs_total", method="fixup_call")
+            return repaired
+
+    async def _astream_content(self, formatted_prompt, on_progress, stream=None):
+        """
+        Accumulates streamed chunks into one message, reporting progress after each one.
+        `stream` (a `StreamingParser`) is fed every chunk, so fields are decoded and
+        validated while the rest of the completion is still arriving.
+        """
+        message = None
+        received = 0
+        with metrics.timer("generation_stage_seconds", stage="provider_call"):
+            async with aclosing(self.llm.astream(formatted_prompt)) as chunks:
+                async for chunk in chunks:
+                    message = chunk if message is None else message + chunk
+                    received += len(chunk.content)
+                    if stream is not None:
+                        stream.feed(chunk.content)
+                    on_progress(received)
+        if message is None:
+            raise AppException("Empty streamed completion")
+        self._record_usage(message)
+        return message
+
+    def _collect_valid_items(self, content: str, item_model, wanted: int, collected: list) -> None:
+        """Validates each batch item on its own and appends the survivors to `collected`."""
+        item_parser = get_parser(item_model)
+        try:
+            with metrics.timer("generation_stage_seconds", stage="parse"):
+                items = item_parser.items(content)
+        except Exception as e:
+            self.logger.warning(f"Batch response could not be decoded: {str(e)}")
+            return
+
+        with metrics.timer("generation_stage_seconds", stage="validate"):
+            for item in items:
+                if len(collected) >= wanted:
+                    break
+                try:
+                    collected.append(item_parser.validate(item))
+                    continue
+                except ValidationError as e:
+                    error = e
+                try:
+                    collected.append(item_parser.validate(repair_payload(item, item_model)))
+                    self.logger.info(f"Batch item repaired locally | {item_model.__name__}")
+                except ValidationError:
+                    self.logger.warning(f"Discarding invalid batch item: {error.errors()[0].get('msg')}")
+
+    def _finish_batch(self, collected: list, count: int, topic: str):
+        if not collected:
+            self.logger.error(f"Batch generation failed after {self.max_retries} attempts for topic: {topic}")
+            raise AppException("LLM Batch Generation Final Failure")
+        if len(collected) < count:
+            self.logger.warning(f"Batch generation returned {len(collected)}/{count} valid items for topic: {topic}")
+        return collected
+
+    def _generate_batch_with_retry(self, prompt, item_model, topic: str, difficulty: str, count: int, avoid=None) -> list:
+        """
+        Asks for `count` questions in a single completion.
+        Only the items that fail validation are requested again on the next attempt.
+        """
+        collected = []
+        for attempt in range(self.max_retries):
+            missing = count - len(collected)
+            if missing <= 0:
+                break
+            try:
+                self.logger.info(f"Batch attempt {attempt + 1}/{self.max_retries} | {missing} x {topic} ({difficulty})")
+                formatted_prompt = prompt.render(format_exclusions(avoid), topic=topic, difficulty=difficulty, count=missing)
+                response = self._invoke(formatted_prompt)
+                self._collect_valid_items(response.content, item_model, count, collected)
+            except Exception as e:
+                kind = classify_error(e)
+                self.logger.warning(f"Batch attempt {attempt + 1} failed ({kind.value}): {str(e)}")
+                if kind == ErrorKind.FATAL or attempt + 1 >= self.max_retries:
+                    break
+                time.sleep(self.retry_policy.delay(kind, attempt, e))
+
+        return self._finish_batch(collected, count, topic)
+
+    async def _agenerate_batch_with_retry(self, prompt, item_model, topic: str, difficulty: str, count: int, avoid=None) -> list:
+        """
+        Async twin of `_generate_batch_with_retry`.
+        """
+        collected = []
+        for attempt in range(self.max_retries):
+            missing = count - len(collected)
+            if missing <= 0:
+                break
+            try:
+                self.logger.info(f"Batch attempt {attempt + 1}/{self.max_retries} | {missing} x {topic} ({difficulty}) [async]")
+                formatted_prompt = prompt.render(format_exclusions(avoid), topic=topic, difficulty=difficulty, count=missing)
+                response = await asyncio.wait_for(self._ainvoke(formatted_prompt), self._call_timeout())
+                self._collect_valid_items(response.content, item_model, count, collected)
+            except Exception as e:
+                kind = classify_error(e)
+                self.logger.warning(f"Batch attempt {attempt + 1} failed ({kind.value}): {str(e)}")
+                if kind == ErrorKind.FATAL or attempt + 1 >= self.max_retries:
+                    break
+                await asyncio.sleep(self.retry_policy.delay(kind, attempt, e))
+
+        return self._finish_batch(collected, count, topic)
 
-    def generate_mcq(self, topic: str, difficulty: str = 'Medium') -> MCQQuestion:
+    def generate_mcq(self, topic: str, difficulty: str = 'Medium', exclude=None, avoid=None) -> MCQQuestion:
         """
         Generates a validated Multiple Choice Question.
+        `exclude` holds question texts already used in this quiz, so cache hits don't repeat them.
+        `avoid` lists questions the model is told not to repeat or paraphrase (dedup re-prompts).
         """
         try:
-            parser = PydanticOutputParser(pydantic_object=MCQQuestion)
-            question = self._generate_with_retry(mcq_prompt_template, parser, topic, difficulty)
+            cached = self._cache_lookup(MCQ_PROMPT, topic, difficulty, MCQQuestion, exclude)
+            if cached is not None:
+                return cached
+
+            parser = get_parser(MCQQuestion)
+            question, provider = self._generate_with_retry(MCQ_PROMPT, parser, topic, difficulty, avoid)
+            self._cache_store(MCQ_PROMPT, topic, difficulty, question, provider)
             
             # Semantic validation is handled internally by the MCQQuestion schema
             self.logger.info("Successfully generated MCQ Question")
@@ -57,16 +395,101 @@ class QuestionGenerator:
         except Exception as e:
             raise AppException(f"Failed to deliver valid MCQ for topic {topic}", e)
 
-    def generate_fill_blank(self, topic: str, difficulty: str = 'Medium') -> FillBlankQuestion:
+    def generate_fill_blank(self, topic: str, difficulty: str = 'Medium', exclude=None, avoid=None) -> FillBlankQuestion:
         """
         Generates a validated Fill in the Blanks Question.
+        `exclude` holds question texts already used in this quiz, so cache hits don't repeat them.
+        `avoid` lists questions the model is told not to repeat or paraphrase (dedup re-prompts).
         """
         try:
-            parser = PydanticOutputParser(pydantic_object=FillBlankQuestion)
-            question = self._generate_with_retry(fill_blank_prompt_template, parser, topic, difficulty)
+            cached = self._cache_lookup(FILL_BLANK_PROMPT, topic, difficulty, FillBlankQuestion, exclude)
+            if cached is not None:
+                return cached
+
+            parser = get_parser(FillBlankQuestion)
+            question, provider = self._generate_with_retry(FILL_BLANK_PROMPT, parser, topic, difficulty, avoid)
+            self._cache_store(FILL_BLANK_PROMPT, topic, difficulty, question, provider)
             
             self.logger.info("Successfully generated Fill-Blank Question")
             return question
         
         except Exception as e:
-            raise AppException(f"Failed to deliver valid Fill-Blank for topic {topic}", e)
\ No newline at end of file
+            raise AppException(f"Failed to deliver valid Fill-Blank for topic {topic}", e)
+
+    async def agenerate_mcq(self, topic: str, difficulty: str = 'Medium', exclude=None, on_progress=None, avoid=None) -> MCQQuestion:
+        """
+        Async version of `generate_mcq`.
+        `on_progress(chars)` switches the provider call to token streaming.
+        """
+        try:
+            cached = self._cache_lookup(MCQ_PROMPT, topic, difficulty, MCQQuestion, exclude)
+            if cached is not None:
+                return cached
+
+            parser = get_parser(MCQQuestion)
+            question, provider = await self._agenerate_with_retry(MCQ_PROMPT, parser, topic, difficulty, on_progress, avoid)
+            self._cache_store(MCQ_PROMPT, topic, difficulty, question, provider)
+
+            self.logger.info("Successfully generated MCQ Question")
+            return question
+
+        except Exception as e:
+            raise AppException(f"Failed to deliver valid MCQ for topic {topic}", e)
+
+    async def agenerate_fill_blank(self, topic: str, difficulty: str = 'Medium', exclude=None, on_progress=None, avoid=None) -> FillBlankQuestion:
+        """
+        Async version of `generate_fill_blank`.
+        `on_progress(chars)` switches the provider call to token streaming.
+        """
+        try:
+            cached = self._cache_lookup(FILL_BLANK_PROMPT, topic, difficulty, FillBlankQuestion, exclude)
+            if cached is not None:
+                return cached
+
+            parser = get_parser(FillBlankQuestion)
+            question, provider = await self._agenerate_with_retry(FILL_BLANK_PROMPT, parser, topic, difficulty, on_progress, avoid)
+            self._cache_store(FILL_BLANK_PROMPT, topic, difficulty, question, provider)
+
+            self.logger.info("Successfully generated Fill-Blank Question")
+            return question
+
+        except Exception as e:
+            raise AppException(f"Failed to deliver valid Fill-Blank for topic {topic}", e)
+
+    def generate_mcq_batch(self, topic: str, difficulty: str = 'Medium', count: int = 5, avoid=None) -> list[MCQQuestion]:
+        """
+        Generates up to `count` validated MCQs in one completion
+        (see `MCQQuestionList`), re-requesting only the rejected items.
+        """
+        try:
+            return self._generate_batch_with_retry(MCQ_BATCH_PROMPT, MCQQuestion, topic, difficulty, count, avoid)
+        except Exception as e:
+            raise AppException(f"Failed to deliver MCQ batch for topic {topic}", e)
+
+    def generate_fill_blank_batch(self, topic: str, difficulty: str = 'Medium', count: int = 5, avoid=None) -> list[FillBlankQuestion]:
+        """
+        Generates up to `count` validated Fill-Blank questions in one completion
+        (see `FillBlankQuestionList`).
+        """
+        try:
+            return self._generate_batch_with_retry(FILL_BLANK_BATCH_PROMPT, FillBlankQuestion, topic, difficulty, count, avoid)
+        except Exception as e:
+            raise AppException(f"Failed to deliver Fill-Blank batch for topic {topic}", e)
+
+    async def agenerate_mcq_batch(self, topic: str, difficulty: str = 'Medium', count: int = 5, avoid=None) -> list[MCQQuestion]:
+        """
+        Async version of `generate_mcq_batch`.
+        """
+        try:
+            return await self._agenerate_batch_with_retry(MCQ_BATCH_PROMPT, MCQQuestion, topic, difficulty, count, avoid)
+        except Exception as e:
+            raise AppException(f"Failed to deliver MCQ batch for topic {topic}", e)
+
+    async def agenerate_fill_blank_batch(self, topic: str, difficulty: str = 'Medium', count: int = 5, avoid=None) -> list[FillBlankQuestion]:
+        """
+        Async version of `generate_fill_blank_batch`.
+        """
+        try:
+            return await self._agenerate_batch_with_retry(FILL_BLANK_BATCH_PROMPT, FillBlankQuestion, topic, difficulty, count, avoid)
+        except Exception as e:
+            raise AppException(f"Failed to deliver Fill-Blank batch for topic {topic}", e)
@@ -0,0 +1,105 @@
+import difflib
+import json
+import re
+
+from pydantic import ValidationError
+
+from src.generation.parsing import decode_first, get_parser
+
+# "A", "b)", "(C)", "Option D", "D." ...
+_LETTER_ANSWER = re.compile(r"^\s*(?:option\s+)?\(?([a-dA-D])\)?[.):]?\s*$", re.IGNORECASE)
+_BLANK_VARIANTS = re.compile(r"_{2,}|\[blank\]|\(blank\)|\.\.\.\.+", re.IGNORECASE)
+
+
+def _fix_mcq(data: dict) -> dict:
+    options = data.get("options")
+    answer = data.get("correct_answer")
+    if not isinstance(options, list) or not isinstance(answer, str) or answer in options:
+        return data
+
+    options = [str(o) for o in options]
+    letter = _LETTER_ANSWER.match(answer)
+    if letter:
+        index = ord(letter.group(1).upper()) - ord("A")
+        if index < len(options):
+            return {**data, "correct_answer": options[index]}
+
+    def fold(value: str) -> str:
+        return " ".join(value.lower().split())
+
+    folded = {fold(o): o for o in options}
+    # "B) Paris" -> "Paris"
+    stripped = re.sub(r"^\s*\(?[a-dA-D][.)]\s+", "", answer)
+    for candidate in (answer, stripped):
+        if fold(candidate) in folded:
+            return {**data, "correct_answer": folded[fold(candidate)]}
+
+    # Lightly paraphrased option
+    match = difflib.get_close_matches(fold(stripped), list(folded), n=1, cutoff=0.8)
+    if match:
+        return {**data, "correct_answer": folded[match[0]]}
+    return data
+
+
+def _fix_fill_blank(data: dict) -> dict:
+    question = data.get("question")
+    answer = data.get("answer")
+    if not isinstance(question, str) or "___" in question:
+        return data
+
+    if _BLANK_VARIANTS.search(question):
+        return {**data, "question": _BLANK_VARIANTS.sub("___", question, count=1)}
+    if isinstance(answer, str) and answer and answer.lower() in question.lower():
+        pattern = re.compile(re.escape(answer), re.IGNORECASE)
+        return {**data, "question": pattern.sub("___", question, count=1)}
+    return data
+
+
+def repair_payload(data: dict, schema) -> dict:
+    """Cheap, deterministic fixes for the slips LLMs make most often against our schemas."""
+    if not isinstance(data, dict):
+        return data
+    if "options" in schema.model_fields:
+        return _fix_mcq(data)
+    if "answer" in schema.model_fields:
+        return _fix_fill_blank(data)
+    return data
+
+
+def repairable_fields(schema) -> frozenset:
+    """Fields `repair_payload` may rewrite: errors on them are worth waiting for the full completion."""
+    if "options" in schema.model_fields:
+        return frozenset({"correct_answer"})
+    if "answer" in schema.model_fields:
+        return frozenset({"question"})
+    return frozenset()
+
+
+def repair_locally(text: str, schema):
+    """
+    Tries to turn a rejected completion into a valid `schema` instance
+    without another LLM call. Returns None when the output is beyond repair.
+    """
+    try:
+        data = decode_first(text)
+    except json.JSONDecodeError:
+        return None
+    try:
+        return get_parser(schema).validate(repair_payload(data, schema))
+    except ValidationError:
+        return None
+
+
+def build_fixup_prompt(text: str, error: BaseException, schema) -> str:
+    """Short corrective prompt: much cheaper than regenerating the question from scratch."""
+    from src.prompts.builder import compact_schema
+
+    fields = ", ".join(schema.model_fields)
+    return (
+        "The JSON below was rejected by the validator.\n"
+        f"Error: {str(error)[:500]}\n"
+        f"Required fields: {fields}.\n"
+        f"JSON schema: {compact_schema(schema)}\n"
+        "Fix ONLY what the error describes and return ONLY the corrected JSON object.\n\n"
+        f"{text[:4000]}"
+    )
@@ -0,0 +1,143 @@
+import asyncio
+import email.utils
+import json
+import random
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+from pydantic import ValidationError
+
+
+class ErrorKind(str, Enum):
+    """How a failed generation attempt should be retried."""
+    TRANSIENT = "transient"    # rate limit, timeout, 5xx: back off and retry the same call
+    PARSE = "parse"            # output is not JSON: repair locally, then retry immediately
+    VALIDATION = "validation"  # JSON doesn't satisfy the schema: repair locally, then retry immediately
+    FATAL = "fatal"            # auth / bad request: retrying won't help
+
+
+_TRANSIENT_NAMES = ("ratelimit", "timeout", "apiconnection", "connecterror", "serviceunavailable",
+                    "internalserver", "overloaded", "remoteprotocol")
+_FATAL_NAMES = ("authentication", "permissiondenied", "badrequest", "notfound")
+
+
+def _root_cause(exc: BaseException) -> BaseException:
+    """Unwraps AppException / chained exceptions down to the provider error."""
+    seen = set()
+    while id(exc) not in seen:
+        seen.add(id(exc))
+        inner = getattr(exc, "original_exception", None) or exc.__cause__
+        if inner is None:
+            break
+        exc = inner
+    return exc
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def classify_error(exc: BaseException) -> ErrorKind:
+    """
+    Maps an exception raised during generation to an `ErrorKind`.
+    Provider SDK errors are recognized by status code or class name so we
+    don't have to import every SDK's exception hierarchy.
+    """
+    exc = _root_cause(exc)
+    name = type(exc).__name__.lower()
+
+    if isinstance(exc, ValidationError):
+        return ErrorKind.VALIDATION
+    if isinstance(exc, json.JSONDecodeError):
+        return ErrorKind.PARSE
+    if name == "outputparserexception":
+        return ErrorKind.PARSE if "invalid json" in str(exc).lower() else ErrorKind.VALIDATION
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return ErrorKind.TRANSIENT
+
+    status = _status_code(exc)
+    if status is not None:
+        if status in (408, 409, 429) or status >= 500:
+            return ErrorKind.TRANSIENT
+        if 400 <= status < 500:
+            return ErrorKind.FATAL
+
+    if any(token in name for token in _TRANSIENT_NAMES):
+        return ErrorKind.TRANSIENT
+    if any(token in name for token in _FATAL_NAMES):
+        return ErrorKind.FATAL
+    if isinstance(exc, ValueError):
+        return ErrorKind.VALIDATION
+    # Unknown failures keep the historical behavior: retry them
+    return ErrorKind.TRANSIENT
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Reads `retry-after-ms` / `retry-after` (seconds or HTTP date) from the provider response."""
+    exc = _root_cause(exc)
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            parsed = email.utils.parsedate_to_datetime(value)
+            return max(0.0, parsed.timestamp() - time.time())
+    except Exception:
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry budget and backoff schedule for one question.
+
+    `max_attempts` counts the first call. Transient errors wait with
+    exponential backoff and full jitter (never less than the provider's
+    Retry-After); parse/validation errors retry immediately after the
+    local repair failed. `timeout` bounds each provider call.
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    timeout: Optional[float] = None
+    fixup_call: bool = True
+
+    @classmethod
+    def from_request_config(cls, request_conf: Optional[dict], max_attempts: Optional[int] = None) -> "RetryPolicy":
+        """Builds the policy from the `request` block of a provider in config/llm.yaml."""
+        request_conf = request_conf or {}
+        if max_attempts is None:
+            max_attempts = int(request_conf.get("retries", 2)) + 1
+        return cls(
+            max_attempts=max(1, max_attempts),
+            base_delay=float(request_conf.get("backoff_base", 0.5)),
+            max_delay=float(request_conf.get("backoff_max", 20.0)),
+            timeout=request_conf.get("timeout"),
+            fixup_call=bool(request_conf.get("fixup_call", True)),
+        )
+
+    def should_retry(self, kind: ErrorKind, attempt: int) -> bool:
+        """`attempt` is zero-based: the attempt that just failed."""
+        return kind != ErrorKind.FATAL and attempt + 1 < self.max_attempts
+
+    def delay(self, kind: ErrorKind, attempt: int, exc: Optional[BaseException] = None) -> float:
+        if kind != ErrorKind.TRANSIENT:
+            return 0.0
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        hinted = retry_after_seconds(exc) if exc is not None else None
+        if hinted is not None:
+            return min(max(backoff, hinted), max(self.max_delay, hinted))
+        return backoff
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Iterator, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+_BATCH_COUNT = re.compile(r"Generate (\d+) DISTINCT")
+_TOPIC = re.compile(r"about the topic: (.+?)\.\s*$", re.MULTILINE)
+_DIFFICULTY = re.compile(r"Generate (?:an? |\d+ DISTINCT )?(Easy|Medium|Hard)\b")
+_FIXUP_FIELDS = re.compile(r"Required fields: ([^\n]+)")
+# Vocabulary for varied question wording (so near-duplicate detection has real work to do)
+_WORDS = (
+    "scope closure iterator generator decorator context manager coroutine buffer cache index "
+    "thread lock queue schema parser token vector matrix gradient kernel socket stream "
+    "module package namespace exception handler callback pipeline registry adapter proxy"
+).split()
+
+
+class FakeProviderError(Exception):
+    """Mimics a provider rate-limit (HTTP 429) with a Retry-After header."""
+    status_code = 429
+
+    def __init__(self, message: str = "Fake rate limit", retry_after: float = 0.0):
+        super().__init__(message)
+        self.response = type("FakeResponse", (), {"headers": {"retry-after": str(retry_after)}})()
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic, offline chat model for benchmarks and local runs.
+
+    Answers the repo's own prompts (single, batch and fix-up) with schema-valid
+    JSON, after a simulated `latency` ± `jitter`. `failure_rate` raises a
+    429-style error and `malformed_rate` returns broken output (truncated JSON,
+    chatty fences, letter answers, missing blanks) to exercise retries and repair.
+    Seeded: the same sequence of calls yields the same outputs.
+    """
+
+    latency: float = 0.2
+    jitter: float = 0.05
+    failure_rate: float = 0.0
+    malformed_rate: float = 0.0
+    seed: int = 42
+    stream_chunk_size: int = 24
+    model_name: str = "fake-quiz"
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _calls: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-quiz"
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    # ---- content --------------------------------------------------------
+
+    def _next_rng(self) -> random.Random:
+        with self._lock:
+            self._calls += 1
+            return random.Random(self.seed * 1_000_003 + self._calls)
+
+    @staticmethod
+    def _prompt_text(messages: List[BaseMessage]) -> str:
+        return "\n".join(str(m.content) for m in messages)
+
+    @staticmethod
+    def _phrase(rng: random.Random, words: int = 6) -> str:
+        return " ".join(rng.sample(_WORDS, words))
+
+    @classmethod
+    def _mcq(cls, rng: random.Random, topic: str, difficulty: str, n: int) -> dict:
+        options = [f"{topic} concept {rng.randint(100, 999)}-{i}" for i in range(4)]
+        return {
+            "question": f"In {topic}, how do the {cls._phrase(rng)} interact? (variant {n})",
+            "options": options,
+            "correct_answer": options[rng.randrange(4)],
+            "explanation": f"This is the accepted definition used when studying {topic}.",
+            "difficulty": difficulty,
+        }
+
+    @classmethod
+    def _fill_blank(cls, rng: random.Random, topic: str, n: int) -> dict:
+        answer = f"term{rng.randint(100, 999)}"
+        return {
+            "question": f"In {topic}, the ___ links {cls._phrase(rng)} (variant {n}).",
+            "answer": answer,
+            "explanation": f"'{answer}' is the standard name for this idea in {topic}.",
+        }
+
+    def _answer(self, prompt: str, rng: random.Random) -> str:
+        topic_match = _TOPIC.search(prompt)
+        topic = topic_match.group(1) if topic_match else "General Knowledge"
+        difficulty_match = _DIFFICULTY.search(prompt)
+        difficulty = difficulty_match.group(1) if difficulty_match else "Medium"
+        fixup = _FIXUP_FIELDS.search(prompt)
+        fill_blank = ("options" not in fixup.group(1)) if fixup else ("fill-in-the-blank" in prompt)
+
+        def item(n):
+            return self._fill_blank(rng, topic, n) if fill_blank else self._mcq(rng, topic, difficulty, n)
+
+        batch = _BATCH_COUNT.search(prompt)
+        payload = {"questions": [item(n) for n in range(int(batch.group(1)))]} if batch else item(0)
+
+        if rng.random() < self.malformed_rate:
+            return self._malform(payload, rng)
+        return json.dumps(payload)
+
+    @staticmethod
+    def _malform(payload: dict, rng: random.Random) -> str:
+        text = json.dumps(payload)
+        kind = rng.randrange(4)
+        if kind == 0:
+            return text[: max(1, len(text) // 2)]  # truncated: needs a retry / fix-up
+        if kind == 1:
+            return f"Sure! Here is your question:\n```json\n{text}\n```\nGood luck!"  # chatty but extractable
+        target = payload["questions"][0] if "questions" in payload else payload
+        if kind == 2 and "options" in target:
+            target["correct_answer"] = "ABCD"[target["options"].index(target["correct_answer"])]
+        elif "question" in target:
+            target["question"] = target["question"].replace("___", "_____")
+        return json.dumps(payload)
+
+    def _usage(self, prompt: str, content: str) -> dict:
+        input_tokens, output_tokens = max(1, len(prompt) // 4), max(1, len(content) // 4)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    def _prepare(self, messages: List[BaseMessage]):
+        rng = self._next_rng()
+        delay = max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+        failed = rng.random() < self.failure_rate
+        prompt = self._prompt_text(messages)
+        content = self._answer(prompt, rng)
+        return delay, failed, prompt, content
+
+    def _message(self, prompt: str, content: str) -> AIMessage:
+        return AIMessage(
+            content=content,
+            usage_metadata=self._usage(prompt, content),
+            response_metadata={"model_name": self.model_name},
+        )
+
+    # ---- BaseChatModel hooks -------------------------------------------
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        delay, failed, prompt, content = self._prepare(messages)
+        time.sleep(delay)
+        if failed:
+            raise FakeProviderError()
+        return ChatResult(generations=[ChatGeneration(message=self._message(prompt, content))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        delay, failed, prompt, content = self._prepare(messages)
+        await asyncio.sleep(delay)
+        if failed:
+            raise FakeProviderError()
+        return ChatResult(generations=[ChatGeneration(message=self._message(prompt, content))])
+
+    def _chunks(self, prompt: str, content: str) -> list:
+        size = max(1, self.stream_chunk_size)
+        pieces = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+        chunks = [ChatGenerationChunk(message=AIMessageChunk(content=p)) for p in pieces]
+        chunks[-1] = ChatGenerationChunk(message=AIMessageChunk(content=pieces[-1], usage_metadata=self._usage(prompt, content)))
+        return chunks
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        delay, failed, prompt, content = self._prepare(messages)
+        chunks = self._chunks(prompt, content)
+        if failed:
+            time.sleep(delay)
+            raise FakeProviderError()
+        for chunk in chunks:
+            time.sleep(delay / len(chunks))
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        delay, failed, prompt, content = self._prepare(messages)
+        chunks = self._chunks(prompt, content)
+        if failed:
+            await asyncio.sleep(delay)
+            raise FakeProviderError()
+        for chunk in chunks:
+            await asyncio.sleep(delay / len(chunks))
+            yield chunk
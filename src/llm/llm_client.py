@@ -1,11 +1,60 @@
+import json
 import os
+import threading
+from typing import Optional
 import yaml
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
 from utils.logger import get_logger
 from utils.custom_exception import AppException
+from utils.metrics import metrics
 from dotenv import load_dotenv, find_dotenv
 
+# Process-wide registry: one client per (config file, provider), one chat model
+# (and therefore one HTTP connection pool) per distinct provider/model config.
+_registry_lock = threading.RLock()
+_client_registry: dict = {}
+_llm_registry: dict = {}
+_env_loaded = False
+
+
+def _load_env_once():
+    """`load_dotenv(find_dotenv())` walks the filesystem; do it once per process."""
+    global _env_loaded
+    with _registry_lock:
+        if not _env_loaded:
+            load_dotenv(find_dotenv())
+            _env_loaded = True
+
+
+def get_llm_client(config_path: str = "config/llm.yaml", provider: Optional[str] = None) -> "LLMClient":
+    """
+    Returns the shared LLMClient for `config_path`/`provider`.
+
+    The YAML is only re-read when the file's mtime changes, and chat model
+    objects are reused as long as their provider/model section is unchanged,
+    so HTTP keep-alive connections survive across requests and sessions.
+    """
+    path = os.path.abspath(config_path)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError as exc:
+        raise AppException("Infrastructure Configuration Error", exc)
+
+    key = (path, provider)
+    with _registry_lock:
+        cached = _client_registry.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        client = LLMClient(path, provider=provider)
+        _client_registry[key] = (mtime, client)
+        return client
+
+
+def reset_llm_registry():
+    """Drops every shared client and chat model (tests, config hot-swaps)."""
+    with _registry_lock:
+        _client_registry.clear()
+        _llm_registry.clear()
 
 
 class LLMClient:
@@ -17,22 +66,44 @@ class LLMClient:
     without changing the generation logic.
     """
 
-    def __init__(self, config_path: str = "config/llm.yaml"):
-        load_dotenv(find_dotenv())
+    def __init__(self, config_path: str = "config/llm.yaml", provider: Optional[str] = None):
+        _load_env_once()
         self.logger = get_logger(self.__class__.__name__)
+        self.config_path = config_path
         self.config = self._load_config(config_path)
-        self.provider = self.config.get("default_provider", "openai")
-        self.llm = self._setup_llm()
+        # LLM_PROVIDER lets a deployment (or a local run against `fake`) override the YAML default
+        self.provider = provider or os.getenv("LLM_PROVIDER") or self.config.get("default_provider", "openai")
+        self.llm = self._get_or_create_llm()
 
     def _load_config(self, path: str) -> dict:
         """Loads definitions from the YAML configuration file."""
         try:
+            metrics.inc("llm_config_loads_total")
             with open(path, "r") as f:
                 return yaml.safe_load(f)
         except Exception as exc:
             self.logger.error(f"Critical failure while loading config file: {path}")
             raise AppException("Infrastructure Configuration Error", exc)
 
+    def _get_or_create_llm(self):
+        """
+        Reuses an existing chat model when another client already built one
+        for the exact same provider/model settings.
+        """
+        conf = self.config["providers"].get(self.provider)
+        if conf is None:
+            self.logger.error(f"Unsupported provider requested: {self.provider}")
+            raise AppException(f"Provider not supported by infrastructure: {self.provider}")
+
+        key = (self.provider, json.dumps(conf, sort_keys=True, default=str))
+        with _registry_lock:
+            llm = _llm_registry.get(key)
+            if llm is None:
+                with metrics.timer("llm_client_setup_seconds", provider=self.provider):
+                    llm = self._with_rate_limit(self._setup_llm(), conf)
+                _llm_registry[key] = llm
+            return llm
+
     def _setup_llm(self):
         """
         Instantiates the configured provider.
@@ -43,24 +114,66 @@ class LLMClient:
         
         self.logger.info(f"Initializing LLM Provider | provider: {self.provider} | model: {model_conf['name']}")
 
+        # Retries (with backoff/Retry-After) are owned by QuestionGenerator's RetryPolicy,
+        # so the SDK's own retry loop is disabled to avoid multiplying attempts.
+        request_conf = conf.get("request", {})
+
+        # Provider SDKs are imported on demand: only the configured one is ever loaded,
+        # which keeps container cold start (and readiness) fast.
         if self.provider == "groq":
+            from langchain_groq import ChatGroq
             return ChatGroq(
                 model_name=model_conf["name"],
                 temperature=model_conf["temperature"],
                 max_tokens=model_conf["max_tokens"],
+                timeout=request_conf.get("timeout"),
+                max_retries=0,
                 api_key=os.getenv("GROQ_API_KEY")
             )
         elif self.provider == "openai":
+            from langchain_openai import ChatOpenAI
             return ChatOpenAI(
                 model_name=model_conf["name"],
                 temperature=model_conf["temperature"],
                 max_tokens=model_conf["max_tokens"],
+                timeout=request_conf.get("timeout"),
+                max_retries=0,
+                # Token usage on streamed completions too (metrics / cost accounting)
+                stream_usage=True,
                 api_key=os.getenv("OPENAI_API_KEY")
             )
+        elif self.provider == "fake":
+            # Offline provider for benchmarks, local runs and the API stub mode
+            from src.llm.fake_llm import FakeChatModel
+            return FakeChatModel(model_name=model_conf["name"], **conf.get("simulation", {}))
         else:
             self.logger.error(f"Unsupported provider requested: {self.provider}")
             raise AppException(f"Provider not supported by infrastructure: {self.provider}")
 
+    def _with_rate_limit(self, llm, conf: dict):
+        """
+        Wraps the model with the provider's client-side RPM/TPM limiter
+        (`rate_limit` in config/llm.yaml); models without one are returned as is.
+        """
+        limits = conf.get("rate_limit")
+        if not limits:
+            return llm
+        from src.llm.rate_limit import RateLimiter, RateLimitedLLM, get_budget_backend
+
+        limiter = RateLimiter(
+            self.provider,
+            requests_per_minute=limits.get("requests_per_minute"),
+            tokens_per_minute=limits.get("tokens_per_minute"),
+            expected_output_tokens=limits.get("expected_output_tokens", 400),
+            max_wait_seconds=limits.get("max_wait_seconds", 60),
+            backend=get_budget_backend(self.config.get("rate_limiting")),
+        )
+        self.logger.info(
+            f"Rate limit enabled | provider: {self.provider} | rpm: {limiter.requests_per_minute} | tpm: {limiter.tokens_per_minute}"
+        )
+        # The call timeout starts once budget is granted (see RateLimitedLLM)
+        return RateLimitedLLM(llm, limiter, timeout=conf.get("request", {}).get("timeout"))
+
     def get_llm(self):
         """
         Exports the instantiated LLM object to be consumed by the QuestionGenerator.
@@ -0,0 +1,449 @@
+import asyncio
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Optional
+
+from utils.logger import get_logger
+from utils.custom_exception import AppException
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Who is asking: QuizManager sets it per quiz (session_id), so the scheduler
+# can interleave sessions instead of serving requests in arrival order.
+current_session: contextvars.ContextVar = contextvars.ContextVar("llm_session", default="anonymous")
+
+
+class RateLimitTimeout(AppException):
+    """Waited longer than `max_wait_seconds` for provider budget (classified as transient, 429)."""
+
+    status_code = 429
+
+    def __init__(self, provider: str, waited: float):
+        super().__init__(f"Rate limit budget for {provider} not available after {waited:.1f}s")
+
+
+class BudgetBackend(ABC):
+    """
+    Storage for token buckets. Each request is a list of
+    `(key, amount, rate_per_second, capacity)` buckets that must ALL have
+    room; implementations take them atomically or not at all.
+
+    The in-process backend budgets one replica; a shared backend (e.g. the
+    SQLite one on a shared volume) lets replicas split one provider quota.
+    Backends that do I/O set `blocking`, and async callers then run them in
+    a worker thread instead of on the event loop.
+    """
+
+    blocking = False
+
+    @abstractmethod
+    def acquire(self, buckets: list) -> float:
+        """Takes every amount and returns 0, or takes nothing and returns the seconds to wait."""
+
+    @abstractmethod
+    def adjust(self, buckets: list) -> None:
+        """Charges (positive) or refunds (negative) amounts after the fact; levels may go negative."""
+
+
+def _refill(level: float, updated: float, now: float, rate: float, capacity: float) -> float:
+    return min(capacity, level + (now - updated) * rate)
+
+
+def _plan(states: dict, buckets: list, now: float) -> tuple:
+    """Shared bucket math: new levels if everything fits, else the wait in seconds."""
+    levels, wait = {}, 0.0
+    for key, amount, rate, capacity in buckets:
+        level, updated = states.get(key, (capacity, now))
+        level = _refill(level, updated, now, rate, capacity)
+        amount = min(amount, capacity)
+        levels[key] = level - amount
+        if level < amount:
+            wait = max(wait, (amount - level) / rate if rate > 0 else float("inf"))
+    return levels, wait
+
+
+class InProcessBudgetBackend(BudgetBackend):
+    """Token buckets in a dict behind a lock (one replica, tests)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: dict = {}
+
+    def acquire(self, buckets: list) -> float:
+        now = time.monotonic()
+        with self._lock:
+            levels, wait = _plan(self._states, buckets, now)
+            if wait > 0:
+                return wait
+            for key, level in levels.items():
+                self._states[key] = (level, now)
+            return 0.0
+
+    def adjust(self, buckets: list) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for key, amount, rate, capacity in buckets:
+                level, updated = self._states.get(key, (capacity, now))
+                self._states[key] = (_refill(level, updated, now, rate, capacity) - amount, now)
+
+
+class SQLiteBudgetBackend(BudgetBackend):
+    """
+    Token buckets in a SQLite file (WAL). Replicas mounting the same volume
+    share one provider quota; `BEGIN IMMEDIATE` serializes the updates.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str = "/tmp/cache/rate_limits.sqlite"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        try:
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, level REAL NOT NULL, updated REAL NOT NULL)"
+                )
+        except sqlite3.Error as exc:
+            raise AppException(f"Could not open rate limit store at {path}", exc)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def _transaction(self, buckets: list, commit_if) -> float:
+        # Wall clock: the buckets are shared between processes
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            keys = [b[0] for b in buckets]
+            rows = conn.execute(
+                f"SELECT key, level, updated FROM buckets WHERE key IN ({','.join('?' * len(keys))})", keys
+            ).fetchall()
+            states = {key: (level, updated) for key, level, updated in rows}
+            wait, levels = commit_if(states, now)
+            if wait > 0:
+                conn.execute("ROLLBACK")
+                return wait
+            conn.executemany(
+                "INSERT OR REPLACE INTO buckets (key, level, updated) VALUES (?, ?, ?)",
+                [(key, level, now) for key, level in levels.items()],
+            )
+            conn.execute("COMMIT")
+            return 0.0
+        finally:
+            conn.close()
+
+    def acquire(self, buckets: list) -> float:
+        def _take(states, now):
+            levels, wait = _plan(states, buckets, now)
+            return wait, levels
+        return self._transaction(buckets, _take)
+
+    def adjust(self, buckets: list) -> None:
+        def _charge(states, now):
+            levels = {}
+            for key, amount, rate, capacity in buckets:
+                level, updated = states.get(key, (capacity, now))
+                levels[key] = _refill(level, updated, now, rate, capacity) - amount
+            return 0.0, levels
+        self._transaction(buckets, _charge)
+
+
+def estimate_tokens(value) -> int:
+    """Cheap prompt size estimate (~4 characters per token) used to reserve TPM budget."""
+    if isinstance(value, str):
+        return len(value) // 4 + 1
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_tokens(getattr(m, "content", m)) for m in value)
+    return estimate_tokens(str(getattr(value, "content", value)))
+
+
+class RateLimiter:
+    """
+    Client-side RPM/TPM limiter for one provider with fair queuing.
+
+    Each call reserves 1 request plus (prompt estimate + `expected_output_tokens`)
+    tokens; the reservation is reconciled with the provider-reported usage
+    afterwards. When budget is short, waiting calls are served round-robin
+    per session (`current_session`), so a session with ten queued questions
+    gets one grant per round like everybody else instead of draining the
+    bucket first.
+    """
+
+    def __init__(self, provider: str, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, expected_output_tokens: int = 400,
+                 max_wait_seconds: float = 60.0, backend: Optional[BudgetBackend] = None,
+                 poll_interval: float = 0.05):
+        self.provider = provider
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.expected_output_tokens = expected_output_tokens
+        self.max_wait_seconds = max_wait_seconds
+        self.poll_interval = poll_interval
+        self.backend = backend or InProcessBudgetBackend()
+        self._lock = threading.Condition()
+        self._waiting: OrderedDict = OrderedDict()
+
+    def _buckets(self, tokens: int) -> list:
+        buckets = []
+        if self.requests_per_minute:
+            buckets.append((f"{self.provider}:requests", 1, self.requests_per_minute / 60, self.requests_per_minute))
+        if self.tokens_per_minute:
+            buckets.append((f"{self.provider}:tokens", tokens, self.tokens_per_minute / 60, self.tokens_per_minute))
+        return buckets
+
+    # ---- fair queue -----------------------------------------------------
+
+    def _enqueue(self, ticket: object, session: str) -> None:
+        with self._lock:
+            self._waiting.setdefault(session, deque()).append(ticket)
+
+    def _discard(self, ticket: object, session: str) -> None:
+        with self._lock:
+            queue = self._waiting.get(session)
+            if queue and ticket in queue:
+                queue.remove(ticket)
+                if not queue:
+                    del self._waiting[session]
+            self._lock.notify_all()
+
+    def _is_head(self, ticket: object, session: str) -> bool:
+        with self._lock:
+            head_session = next(iter(self._waiting), None)
+            return head_session == session and self._waiting[session][0] is ticket
+
+    def _granted(self, ticket: object, session: str) -> None:
+        # The session goes to the back of the round-robin
+        with self._lock:
+            queue = self._waiting.pop(session)
+            queue.popleft()
+            if queue:
+                self._waiting[session] = queue
+            self._lock.notify_all()
+
+    # Only the head ticket's owner calls the backend and `_granted`, so the
+    # queue lock is never held across backend I/O.
+
+    def _try_grant(self, ticket: object, session: str, tokens: int) -> float:
+        """0 when granted; otherwise how long to wait before trying again."""
+        if not self._is_head(ticket, session):
+            return self.poll_interval
+        wait = self.backend.acquire(self._buckets(tokens))
+        if wait > 0:
+            return min(wait, 1.0)
+        self._granted(ticket, session)
+        return 0.0
+
+    async def _atry_grant(self, ticket: object, session: str, tokens: int) -> float:
+        if not self._is_head(ticket, session):
+            return self.poll_interval
+        wait = await self._abackend(self.backend.acquire, self._buckets(tokens))
+        if wait > 0:
+            return min(wait, 1.0)
+        self._granted(ticket, session)
+        return 0.0
+
+    async def _abackend(self, call, buckets: list):
+        if self.backend.blocking:
+            return await asyncio.to_thread(call, buckets)
+        return call(buckets)
+
+    # ---- public API -----------------------------------------------------
+
+    def reserve(self, prompt) -> int:
+        return estimate_tokens(prompt) + self.expected_output_tokens
+
+    def acquire(self, prompt) -> int:
+        """Blocks until the call may go out; returns the reserved token count."""
+        tokens = self.reserve(prompt)
+        if not self.requests_per_minute and not self.tokens_per_minute:
+            return tokens
+        session, ticket, started = current_session.get(), object(), time.monotonic()
+        self._enqueue(ticket, session)
+        try:
+            while True:
+                wait = self._try_grant(ticket, session, tokens)
+                if wait == 0:
+                    break
+                if time.monotonic() - started + wait > self.max_wait_seconds:
+                    raise RateLimitTimeout(self.provider, time.monotonic() - started)
+                with self._lock:
+                    self._lock.wait(wait)
+        finally:
+            self._discard(ticket, session)
+        self._record_wait(started)
+        return tokens
+
+    async def aacquire(self, prompt) -> int:
+        """Async twin of `acquire`: sleeps on the event loop, and blocking backends run in a worker thread."""
+        tokens = self.reserve(prompt)
+        if not self.requests_per_minute and not self.tokens_per_minute:
+            return tokens
+        session, ticket, started = current_session.get(), object(), time.monotonic()
+        self._enqueue(ticket, session)
+        try:
+            while True:
+                wait = await self._atry_grant(ticket, session, tokens)
+                if wait == 0:
+                    break
+                if time.monotonic() - started + wait > self.max_wait_seconds:
+                    raise RateLimitTimeout(self.provider, time.monotonic() - started)
+                await asyncio.sleep(min(wait, self.poll_interval))
+        finally:
+            self._discard(ticket, session)
+        self._record_wait(started)
+        return tokens
+
+    def _correction(self, reserved: int, usage: Optional[dict]) -> Optional[list]:
+        if not self.tokens_per_minute or not usage:
+            return None
+        actual = usage.get("total_tokens") or (usage.get("input_tokens", 0) + usage.get("output_tokens", 0))
+        if not actual:
+            return None
+        return [(f"{self.provider}:tokens", actual - reserved, self.tokens_per_minute / 60, self.tokens_per_minute)]
+
+    def reconcile(self, reserved: int, usage: Optional[dict]) -> None:
+        """Replaces the token estimate with the provider-reported total."""
+        buckets = self._correction(reserved, usage)
+        if buckets:
+            self.backend.adjust(buckets)
+
+    async def areconcile(self, reserved: int, usage: Optional[dict]) -> None:
+        """Async twin of `reconcile`."""
+        buckets = self._correction(reserved, usage)
+        if buckets:
+            await self._abackend(self.backend.adjust, buckets)
+
+    def _record_wait(self, started: float) -> None:
+        metrics.observe("llm_rate_limit_wait_seconds", time.monotonic() - started, provider=self.provider)
+
+
+class RateLimitedLLM:
+    """
+    Puts a `RateLimiter` in front of a chat model's invoke/ainvoke/stream/astream
+    and batch/abatch. Other call entry points are refused (they would bypass
+    the limiter); any other attribute is delegated to the wrapped model.
+
+    With `timeout`, the async calls enforce it themselves, starting once
+    budget is granted: waiting for budget is bounded by the limiter's
+    `max_wait_seconds` (and ends in `RateLimitTimeout`), not by the call timeout.
+    """
+
+    _UNLIMITED = frozenset({
+        "generate", "agenerate", "generate_prompt", "agenerate_prompt", "predict", "apredict",
+        "predict_messages", "apredict_messages", "batch_as_completed", "abatch_as_completed",
+        "astream_events", "astream_log", "transform", "atransform",
+    })
+
+    def __init__(self, llm, limiter: RateLimiter, timeout: Optional[float] = None):
+        self.llm = llm
+        self.limiter = limiter
+        self.timeout = timeout
+
+    @property
+    def times_calls(self) -> bool:
+        """True when the per-call timeout is enforced here (callers must not add their own around the budget wait)."""
+        return self.timeout is not None
+
+    def __getattr__(self, name):
+        if name in self._UNLIMITED:
+            raise AppException(f"{name} is not rate limited; use invoke/ainvoke/stream/astream/batch/abatch")
+        return getattr(self.llm, name)
+
+    def invoke(self, input, config=None, **kwargs):
+        reserved = self.limiter.acquire(input)
+        response = None
+        try:
+            response = self.llm.invoke(input, config, **kwargs)
+            return response
+        finally:
+            self.limiter.reconcile(reserved, getattr(response, "usage_metadata", None))
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        reserved = await self.limiter.aacquire(input)
+        response = None
+        try:
+            response = await asyncio.wait_for(self.llm.ainvoke(input, config, **kwargs), self.timeout)
+            return response
+        finally:
+            await self.limiter.areconcile(reserved, getattr(response, "usage_metadata", None))
+
+    def stream(self, input, config=None, **kwargs):
+        reserved = self.limiter.acquire(input)
+        usage = None
+        try:
+            for chunk in self.llm.stream(input, config, **kwargs):
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                yield chunk
+        finally:
+            self.limiter.reconcile(reserved, usage)
+
+    async def astream(self, input, config=None, **kwargs):
+        reserved = await self.limiter.aacquire(input)
+        loop = asyncio.get_running_loop()
+        deadline = None if self.timeout is None else loop.time() + self.timeout
+        chunks = self.llm.astream(input, config, **kwargs)
+        usage = None
+        try:
+            while True:
+                # One deadline for the whole stream, checked around each chunk
+                remaining = None if deadline is None else max(0.0, deadline - loop.time())
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+                except StopAsyncIteration:
+                    break
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                yield chunk
+        finally:
+            if hasattr(chunks, "aclose"):
+                await chunks.aclose()
+            await self.limiter.areconcile(reserved, usage)
+
+    def batch(self, inputs: list, config=None, *, return_exceptions: bool = False, **kwargs):
+        """Each input goes through `invoke`, so every request is charged to the limiter."""
+        configs = config if isinstance(config, list) else [config] * len(inputs)
+        results = []
+        for input, item_config in zip(inputs, configs):
+            try:
+                results.append(self.invoke(input, item_config, **kwargs))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    async def abatch(self, inputs: list, config=None, *, return_exceptions: bool = False, **kwargs):
+        """Async twin of `batch`: the requests queue for budget concurrently."""
+        configs = config if isinstance(config, list) else [config] * len(inputs)
+        return await asyncio.gather(
+            *(self.ainvoke(input, item_config, **kwargs) for input, item_config in zip(inputs, configs)),
+            return_exceptions=return_exceptions,
+        )
+
+
+_backend_lock = threading.Lock()
+_backends: dict = {}
+
+
+def get_budget_backend(conf: Optional[dict]) -> BudgetBackend:
+    """Process-wide backend for the `rate_limiting` section of config/llm.yaml."""
+    conf = conf or {}
+    backend = conf.get("backend", "memory")
+    key = (backend, conf.get("path"))
+    with _backend_lock:
+        if key not in _backends:
+            if backend == "memory":
+                _backends[key] = InProcessBudgetBackend()
+            elif backend == "sqlite":
+                _backends[key] = SQLiteBudgetBackend(conf.get("path", "/tmp/cache/rate_limits.sqlite"))
+            else:
+                raise AppException(f"Unsupported rate limiting backend: {backend}")
+            logger.info(f"Rate limit budget backend ready | backend: {backend}")
+        return _backends[key]
@@ -0,0 +1,373 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from utils.logger import get_logger
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+
+class ProviderStats:
+    """
+    Rolling health of one provider: latency samples, recent outcomes and a
+    simple circuit breaker that opens after consecutive failures or a high
+    error rate and closes again after `cooldown_seconds`.
+    """
+
+    def __init__(self, name: str, window: int = 100, failure_threshold: int = 3,
+                 error_rate_threshold: float = 0.5, cooldown_seconds: float = 30, min_samples: int = 20):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+            self._outcomes.append(True)
+            self._consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._outcomes.append(False)
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold or self._error_rate() > self.error_rate_threshold:
+                self._open_until = time.monotonic() + self.cooldown_seconds
+
+    def _error_rate(self) -> float:
+        if len(self._outcomes) < self.min_samples:
+            return 0.0
+        return 1 - sum(self._outcomes) / len(self._outcomes)
+
+    def healthy(self) -> bool:
+        with self._lock:
+            return time.monotonic() >= self._open_until
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile over the window, or None until `min_samples` calls succeeded."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "provider": self.name,
+                "healthy": time.monotonic() >= self._open_until,
+                "calls": len(self._outcomes),
+                "error_rate": round(1 - sum(self._outcomes) / len(self._outcomes), 4) if self._outcomes else 0.0,
+                "p50_s": round(latencies[len(latencies) // 2], 4) if latencies else None,
+                "p95_s": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 4) if latencies else None,
+                "consecutive_failures": self._consecutive_failures,
+            }
+
+
+@dataclass
+class RoutingDecision:
+    """One routed call, kept in `LLMRouter.decisions` and logged for observability."""
+    primary: str
+    served_by: Optional[str] = None
+    hedged: bool = False
+    failovers: list = field(default_factory=list)
+    skipped: list = field(default_factory=list)
+    latency_s: float = 0.0
+    validated: bool = True
+
+
+class LLMRouter:
+    """
+    Routes calls across several LangChain chat models.
+
+    - Providers are tried in configured order, skipping ones whose circuit
+      is open (they are still used as a last resort).
+    - On an exception the call fails over to the next provider.
+    - With `hedge=True`, if the primary hasn't answered after its p95
+      latency (or `hedge_after_seconds` until enough samples exist), the
+      next provider is called too and the first response that passes
+      `validate` wins.
+    - A response that fails `validate` also fails over; it is only returned
+      (for the caller to repair) once every provider has been tried.
+
+    The provider that answered is stamped on the response as
+    `response_metadata["served_by"]`, so callers can price and cache by it.
+
+    Exposes `invoke` / `ainvoke` / `astream`, so it can replace the single
+    chat model inside QuestionGenerator. Any object with that interface can
+    be routed, which keeps the router testable with fake local providers.
+    """
+
+    def __init__(self, providers: dict, order: Optional[list] = None, hedge: bool = False,
+                 hedge_percentile: float = 0.95, hedge_after_seconds: float = 10.0,
+                 window: int = 100, min_samples: int = 20, failure_threshold: int = 3,
+                 error_rate_threshold: float = 0.5, cooldown_seconds: float = 30, history: int = 200):
+        if not providers:
+            raise AppException("LLMRouter requires at least one provider")
+        self.providers = providers
+        self.order = [name for name in (order or list(providers)) if name in providers]
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_after_seconds = hedge_after_seconds
+        self.stats = {
+            name: ProviderStats(name, window, failure_threshold, error_rate_threshold, cooldown_seconds, min_samples)
+            for name in self.order
+        }
+        self.decisions = deque(maxlen=history)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(4, 2 * len(self.order)), thread_name_prefix="llm-router"
+        )
+
+    @property
+    def times_calls(self) -> bool:
+        """True when every routed model enforces its own call timeout (see `RateLimitedLLM`)."""
+        return all(getattr(model, "times_calls", False) for model in self.providers.values())
+
+    # ---- routing policy -------------------------------------------------
+
+    def _plan(self) -> tuple:
+        """Healthy providers first (config order), degraded ones only as a last resort."""
+        healthy = [name for name in self.order if self.stats[name].healthy()]
+        degraded = [name for name in self.order if name not in healthy]
+        candidates = healthy + degraded
+        return RoutingDecision(primary=candidates[0], skipped=degraded), candidates
+
+    def _hedge_delay(self, name: str) -> float:
+        observed = self.stats[name].percentile(self.hedge_percentile)
+        return observed if observed is not None else self.hedge_after_seconds
+
+    def _record(self, decision: RoutingDecision, started: float) -> None:
+        decision.latency_s = round(time.perf_counter() - started, 4)
+        self.decisions.append(decision)
+        logger.info(
+            f"Routing | primary: {decision.primary} | served_by: {decision.served_by} | "
+            f"hedged: {decision.hedged} | failovers: {decision.failovers} | skipped: {decision.skipped} | "
+            f"validated: {decision.validated} | latency: {decision.latency_s}s"
+        )
+
+    @staticmethod
+    def _passes(validate: Optional[Callable], response) -> bool:
+        if validate is None:
+            return True
+        try:
+            validate(response)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _stamp(response, name: str):
+        metadata = getattr(response, "response_metadata", None)
+        if isinstance(metadata, dict):
+            metadata["served_by"] = name
+        return response
+
+    def snapshot(self) -> list:
+        """Per-provider health, for dashboards and the metrics endpoint."""
+        return [self.stats[name].snapshot() for name in self.order]
+
+    # ---- sync -----------------------------------------------------------
+
+    def _call(self, name: str, input, config):
+        started = time.perf_counter()
+        try:
+            response = self.providers[name].invoke(input, config)
+        except Exception:
+            self.stats[name].record_failure()
+            raise
+        self.stats[name].record_success(time.perf_counter() - started)
+        return response
+
+    def invoke(self, input, config=None, *, validate: Optional[Callable] = None, **kwargs):
+        # Provider calls run on the pool under the caller's context (session, usage accounting)
+        started = time.perf_counter()
+        decision, candidates = self._plan()
+        remaining = candidates[1:]
+        in_flight = {self._executor.submit(contextvars.copy_context().run, self._call, candidates[0], input, config): candidates[0]}
+        hedge_delay = self._hedge_delay(candidates[0]) if self.hedge and remaining else None
+        fallback = None
+        last_error = None
+
+        while in_flight:
+            timeout = hedge_delay if not decision.hedged else None
+            done, _ = concurrent.futures.wait(in_flight, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            if not done:
+                # Primary is slower than its p95: hedge on the next provider
+                name = remaining.pop(0)
+                decision.hedged = True
+                in_flight[self._executor.submit(contextvars.copy_context().run, self._call, name, input, config)] = name
+                continue
+
+            for future in done:
+                name = in_flight.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"Provider {name} failed: {str(e)}")
+                    continue
+                if self._passes(validate, response):
+                    decision.served_by = name
+                    self._record(decision, started)
+                    return self._stamp(response, name)
+                fallback = fallback or (name, response)
+
+            if not in_flight and remaining:
+                name = remaining.pop(0)
+                decision.failovers.append(name)
+                decision.hedged = True  # no further hedging once we are failing over
+                in_flight[self._executor.submit(contextvars.copy_context().run, self._call, name, input, config)] = name
+
+        return self._finish(decision, started, fallback, last_error)
+
+    def _finish(self, decision: RoutingDecision, started: float, fallback, last_error):
+        if fallback is not None:
+            # Nothing validated: hand the first response back so the caller can repair it
+            decision.served_by, decision.validated = fallback[0], False
+            self._record(decision, started)
+            return self._stamp(fallback[1], fallback[0])
+        self._record(decision, started)
+        raise AppException("All LLM providers failed", last_error)
+
+    # ---- async ----------------------------------------------------------
+
+    async def _acall(self, name: str, input, config):
+        started = time.perf_counter()
+        try:
+            response = await self.providers[name].ainvoke(input, config)
+        except Exception:
+            self.stats[name].record_failure()
+            raise
+        self.stats[name].record_success(time.perf_counter() - started)
+        return response
+
+    async def ainvoke(self, input, config=None, *, validate: Optional[Callable] = None, **kwargs):
+        started = time.perf_counter()
+        decision, candidates = self._plan()
+        remaining = candidates[1:]
+        in_flight = {asyncio.ensure_future(self._acall(candidates[0], input, config)): candidates[0]}
+        hedge_delay = self._hedge_delay(candidates[0]) if self.hedge and remaining else None
+        fallback = None
+        last_error = None
+
+        try:
+            while in_flight:
+                timeout = hedge_delay if not decision.hedged else None
+                done, _ = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    name = remaining.pop(0)
+                    decision.hedged = True
+                    in_flight[asyncio.ensure_future(self._acall(name, input, config))] = name
+                    continue
+
+                for task in done:
+                    name = in_flight.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        last_error = e
+                        logger.warning(f"Provider {name} failed: {str(e)}")
+                        continue
+                    if self._passes(validate, response):
+                        decision.served_by = name
+                        self._record(decision, started)
+                        return self._stamp(response, name)
+                    fallback = fallback or (name, response)
+
+                if not in_flight and remaining:
+                    name = remaining.pop(0)
+                    decision.failovers.append(name)
+                    decision.hedged = True
+                    in_flight[asyncio.ensure_future(self._acall(name, input, config))] = name
+        finally:
+            # The losing hedge is cancelled instead of being left to finish
+            for task in in_flight:
+                task.cancel()
+
+        return self._finish(decision, started, fallback, last_error)
+
+    async def astream(self, input, config=None, **kwargs):
+        """Streams from the first provider that starts answering; no hedging mid-stream."""
+        started = time.perf_counter()
+        decision, candidates = self._plan()
+        last_error = None
+
+        for name in candidates:
+            call_started = time.perf_counter()
+            emitted = False
+            try:
+                async for chunk in self.providers[name].astream(input, config):
+                    # Only the first chunk is stamped: chunk metadata is concatenated on merge
+                    first, emitted = not emitted, True
+                    yield self._stamp(chunk, name) if first else chunk
+            except Exception as e:
+                self.stats[name].record_failure()
+                if emitted:
+                    raise
+                last_error = e
+                logger.warning(f"Provider {name} failed before streaming: {str(e)}")
+                decision.failovers.append(name)
+                continue
+            self.stats[name].record_success(time.perf_counter() - call_started)
+            decision.served_by = name
+            self._record(decision, started)
+            return
+
+        self._record(decision, started)
+        raise AppException("All LLM providers failed", last_error)
+
+
+_router_lock = threading.Lock()
+_routers: dict = {}
+
+
+def get_llm_router(config_path: str = "config/llm.yaml") -> Optional[LLMRouter]:
+    """
+    Process-wide router built from the `routing` section of config/llm.yaml
+    (None when routing is disabled). Stats are shared by every generator.
+    """
+    from src.llm.llm_client import get_llm_client
+
+    client = get_llm_client(config_path)
+    conf = client.config.get("routing") or {}
+    if not conf.get("enabled", False):
+        return None
+
+    key = (os.path.abspath(config_path), id(client))
+    with _router_lock:
+        router = _routers.get(key)
+        if router is None:
+            names = conf.get("providers") or [client.provider]
+            providers = {name: get_llm_client(config_path, provider=name).get_llm() for name in names}
+            router = LLMRouter(
+                providers,
+                order=names,
+                hedge=conf.get("hedge", False),
+                hedge_percentile=conf.get("hedge_percentile", 0.95),
+                hedge_after_seconds=conf.get("hedge_after_seconds", 10.0),
+                window=conf.get("window", 100),
+                min_samples=conf.get("min_samples", 20),
+                failure_threshold=conf.get("failure_threshold", 3),
+                error_rate_threshold=conf.get("error_rate_threshold", 0.5),
+                cooldown_seconds=conf.get("cooldown_seconds", 30),
+            )
+            _routers.clear()
+            _routers[key] = router
+            logger.info(f"LLM router enabled | providers: {names} | hedge: {router.hedge}")
+        return router
@@ -0,0 +1,152 @@
+import sys
+import threading
+import weakref
+from collections.abc import Mapping
+
+_QUESTION_FIELDS = ("question", "options", "correct_answer", "answer", "explanation", "difficulty", "type")
+_RESULT_FIELDS = ("question", "user_answer", "correct_answer", "explanation", "is_correct", "options", "timestamp")
+_NO_EXPLANATION = "Sem explicação disponível."
+
+
+class QuestionRecord(Mapping):
+    """
+    Registro imutável de uma questão, compartilhado entre sessões.
+
+    Substitui o dict copiado do modelo Pydantic: usa `__slots__` (sem dict
+    por instância) e é internado por `intern_question`, então a mesma questão
+    servida pelo banco/cache/API a cem sessões é um único objeto na memória.
+    Continua se comportando como o dict antigo (`q['question']`,
+    `q.get('options')`, `dict(q)`); campos ausentes (ex.: `options` em FIB)
+    não aparecem como chaves.
+    """
+
+    __slots__ = _QUESTION_FIELDS + ("_key", "__weakref__")
+
+    def __init__(self, key: tuple):
+        for name, value in zip(_QUESTION_FIELDS, key):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_key", key)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QuestionRecord é imutável")
+
+    def __getitem__(self, name):
+        value = getattr(self, name, None) if name in _QUESTION_FIELDS else None
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __iter__(self):
+        return (name for name, value in zip(_QUESTION_FIELDS, self._key) if value is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for value in self._key if value is not None)
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+    def __eq__(self, other):
+        if isinstance(other, QuestionRecord):
+            return self._key == other._key
+        return super().__eq__(other)
+
+    def __reduce__(self):
+        # pickle/deepcopy voltam pelo registro de internação
+        return intern_question, (self.to_dict(),)
+
+    def __repr__(self) -> str:
+        return f"QuestionRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> dict:
+        """Dict serializável em JSON (o formato antigo de `_to_record`)."""
+        data = dict(self)
+        if "options" in data:
+            data["options"] = list(data["options"])
+        return data
+
+
+_intern_lock = threading.Lock()
+# Só as questões em uso por alguma sessão/banco ficam vivas aqui
+_interned: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def intern_question(data, question_type=None) -> QuestionRecord:
+    """
+    Devolve o `QuestionRecord` canônico para `data` (modelo Pydantic, dict
+    ou registro). Questões com o mesmo conteúdo viram o mesmo objeto.
+    `question_type` ("Multiple Choice"/"Fill in the Blank") define o campo
+    `type` quando `data` não o traz.
+    """
+    if isinstance(data, QuestionRecord):
+        return data
+    if hasattr(data, "model_dump"):
+        data = data.model_dump()
+
+    q_type = data.get("type")
+    if q_type is None and question_type is not None:
+        q_type = "MCQ" if question_type == "Multiple Choice" else "FIB"
+    options = data.get("options")
+    difficulty = data.get("difficulty")
+    key = (
+        _text(data.get("question")),
+        tuple(sys.intern(str(o)) for o in options) if options is not None else None,
+        _text(data.get("correct_answer")),
+        _text(data.get("answer")),
+        _text(data.get("explanation")),
+        sys.intern(str(difficulty)) if difficulty is not None else None,
+        sys.intern(q_type) if q_type is not None else None,
+    )
+    with _intern_lock:
+        record = _interned.get(key)
+        if record is None:
+            record = _interned[key] = QuestionRecord(key)
+        return record
+
+
+def interned_count() -> int:
+    """Quantas questões distintas estão vivas no processo."""
+    return len(_interned)
+
+
+class QuizResult(Mapping):
+    """
+    Resultado de uma questão: só a referência ao `QuestionRecord` e a
+    resposta do usuário. Enunciado, gabarito, explicação e opções são lidos
+    do registro compartilhado, não copiados para cada linha; o timestamp é o
+    mesmo objeto para toda a avaliação.
+    """
+
+    __slots__ = ("record", "user_answer", "is_correct", "timestamp")
+
+    def __init__(self, record: QuestionRecord, user_answer, is_correct: bool, timestamp: str):
+        self.record = record
+        self.user_answer = user_answer
+        self.is_correct = is_correct
+        self.timestamp = timestamp
+
+    def __getitem__(self, name):
+        if name in ("user_answer", "is_correct", "timestamp"):
+            return getattr(self, name)
+        if name == "correct_answer":
+            record = self.record
+            return record.correct_answer if record.correct_answer is not None else record.answer
+        if name == "explanation":
+            return self.record.explanation or _NO_EXPLANATION
+        if name == "options":
+            return self.record.options
+        if name == "question":
+            return self.record.question
+        raise KeyError(name)
+
+    def __iter__(self):
+        return iter(_RESULT_FIELDS)
+
+    def __len__(self) -> int:
+        return len(_RESULT_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"QuizResult({dict(self)!r})"
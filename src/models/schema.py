@@ -40,4 +40,18 @@ class FillBlankQuestion(BaseModel):
     def check_blank_exists(cls, v):
         if "___" not in v:
             raise ValueError("O enunciado deve conter '___' para representar a lacuna.")
-        return v
\ No newline at end of file
+        return v
+
+class MCQQuestionList(BaseModel):
+    """
+    Envelope para geração em lote: várias MCQs em uma única completion.
+    Cada item é validado individualmente pelo QuestionGenerator.
+    """
+    questions: List[MCQQuestion] = Field(..., min_length=1, description="Lista de questões de múltipla escolha")
+
+
+class FillBlankQuestionList(BaseModel):
+    """
+    Envelope para geração em lote de questões de lacuna.
+    """
+    questions: List[FillBlankQuestion] = Field(..., min_length=1, description="Lista de questões de preenchimento de lacuna")
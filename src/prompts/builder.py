@@ -0,0 +1,93 @@
+import hashlib
+import json
+from string import Formatter
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.models.schema import MCQQuestion, FillBlankQuestion, MCQQuestionList, FillBlankQuestionList
+from src.prompts.templates import (
+    SYSTEM_PROMPT,
+    MCQ_TEMPLATE,
+    FILL_BLANK_TEMPLATE,
+    MCQ_BATCH_TEMPLATE,
+    FILL_BLANK_BATCH_TEMPLATE,
+)
+from utils.metrics import metrics
+
+
+def count_tokens(text: str) -> int:
+    """Prompt size in tokens: the same ~4 chars/token estimate the rate limiter reserves with."""
+    from src.llm.rate_limit import estimate_tokens
+    return estimate_tokens(text)
+
+
+def _render_schema(node: dict, defs: dict) -> str:
+    if "$ref" in node:
+        return _render_schema(defs[node["$ref"].rsplit("/", 1)[-1]], defs)
+    if "enum" in node:
+        return "|".join(json.dumps(v) for v in node["enum"])
+    kind = node.get("type")
+    if kind == "object":
+        required = set(node.get("required", ()))
+        fields = [
+            f'"{name}"{"" if name in required else "?"}:{_render_schema(prop, defs)}'
+            for name, prop in node.get("properties", {}).items()
+        ]
+        return "{" + ",".join(fields) + "}"
+    if kind == "array":
+        item = _render_schema(node.get("items", {}), defs)
+        size = node.get("minItems")
+        if size is not None and size == node.get("maxItems"):
+            return f"{item}[{size}]"
+        return f"[{item},...]"
+    if kind == "string" and "minLength" in node:
+        return f"string(>={node['minLength']} chars)"
+    return kind or "any"
+
+
+def compact_schema(model) -> str:
+    """
+    One-line schema derived from a Pydantic model, e.g.
+    {"question":string(>=10 chars),"options":string[4],"difficulty"?:"Easy"|"Medium"|"Hard"}.
+    A fraction of the tokens of PydanticOutputParser's JSON-Schema dump.
+    """
+    schema = model.model_json_schema()
+    return _render_schema(schema, schema.get("$defs", {}))
+
+
+class CompiledPrompt:
+    """
+    A template compiled once per process: the static system message is built
+    a single time (identical prefix on every call, so providers can cache it)
+    and the compact schema is baked into the user template, leaving only
+    `str.format_map` per call.
+    """
+
+    def __init__(self, name: str, template: str, schema_model, system: str = SYSTEM_PROMPT):
+        self.name = name
+        self.schema = compact_schema(schema_model)
+        self.system_message = SystemMessage(content=system)
+        self._user = template.replace("{schema}", self.schema.replace("{", "{{").replace("}", "}}"))
+        self.variables = tuple(sorted({field for _, field, _, _ in Formatter().parse(self._user) if field}))
+        self.fingerprint = hashlib.sha1((system + "\x00" + self._user).encode("utf-8")).hexdigest()[:12]
+        self.system_tokens = count_tokens(system)
+
+    def as_prompt_template(self):
+        """The system and user text as one LangChain `PromptTemplate` (the pre-compilation interface)."""
+        from langchain_core.prompts import PromptTemplate
+        return PromptTemplate(template=self.system_message.content + "\n\n" + self._user,
+                              input_variables=list(self.variables))
+
+    def render(self, suffix: str = "", **values) -> list:
+        """[system, user] messages; `suffix` is appended to the user text (e.g. exclusions)."""
+        text = self._user.format_map(values) + suffix
+        metrics.inc("llm_prompts_total", template=self.name)
+        metrics.inc("llm_prompt_tokens_total", self.system_tokens, template=self.name, part="system")
+        metrics.inc("llm_prompt_tokens_total", count_tokens(text), template=self.name, part="user")
+        return [self.system_message, HumanMessage(content=text)]
+
+
+MCQ_PROMPT = CompiledPrompt("mcq", MCQ_TEMPLATE, MCQQuestion)
+FILL_BLANK_PROMPT = CompiledPrompt("fill_blank", FILL_BLANK_TEMPLATE, FillBlankQuestion)
+MCQ_BATCH_PROMPT = CompiledPrompt("mcq_batch", MCQ_BATCH_TEMPLATE, MCQQuestionList)
+FILL_BLANK_BATCH_PROMPT = CompiledPrompt("fill_blank_batch", FILL_BLANK_BATCH_TEMPLATE, FillBlankQuestionList)
@@ -1,43 +1,68 @@
-from langchain_core.prompts import PromptTemplate
-
-# 1. Define as diretrizes de sistema para garantir consistência
-SYSTEM_RULES = (
-    "You are an expert Educational Content Creator.\n"
-    "Your goal is to generate high-quality study materials.\n"
-    "RULES:\n"
-    "1. Respond ONLY in the same language as the requested {topic}.\n"
-    "2. Provide detailed educational explanations.\n"
-    "3. Ensure the JSON is perfectly valid and matches the schema requirements.\n"
+# Os templates são texto puro: `src.prompts.builder` os compila uma única vez
+# (mensagem de sistema estática + template do usuário com o schema embutido).
+
+# 1. Diretrizes de sistema: estáticas (sem variáveis) para permitir prefix caching
+#    nos provedores; idênticas em todos os templates.
+SYSTEM_PROMPT = (
+    "You are an expert educational content creator writing study quizzes.\n"
+    "- Write in the same language as the requested topic.\n"
+    "- Explanations must teach why the answer is right, not restate it.\n"
+    "- Reply with ONLY one valid JSON object matching the given schema: no markdown, no comments."
+)
+
+# 2. Múltipla Escolha (MCQ). `{schema}` é preenchido na compilação a partir de MCQQuestion.
+MCQ_TEMPLATE = (
+    "Generate a {difficulty} multiple-choice question about the topic: {topic}.\n"
+    "Exactly 4 options. 'correct_answer' is the FULL text of one option, never a letter. "
+    "'difficulty' is \"{difficulty}\".\n"
+    "JSON schema: {schema}"
+)
+
+# 3. Preenchimento de Lacuna
+FILL_BLANK_TEMPLATE = (
+    "Generate a {difficulty} fill-in-the-blank question about the topic: {topic}.\n"
+    "Mark the blank in 'question' with '___'; 'answer' is the exact missing word or phrase.\n"
+    "JSON schema: {schema}"
+)
+
+# 4. Em lote: N questões em uma única completion (regras pagas uma vez)
+MCQ_BATCH_TEMPLATE = (
+    "Generate {count} DISTINCT {difficulty} multiple-choice questions about the topic: {topic}.\n"
+    "Each has exactly 4 options; 'correct_answer' is the FULL text of one option, never a letter; "
+    "'difficulty' is \"{difficulty}\".\n"
+    "JSON schema: {schema}"
 )
 
-# 2. Template de Múltipla Escolha (MCQ)
-mcq_prompt_template = PromptTemplate(
-    template=(
-        SYSTEM_RULES +
-        "\nGenerate a {difficulty} multiple-choice question about the topic: {topic}.\n\n"
-        "FIELDS REQUIRED:\n"
-        "- 'question': Clear and challenging enunciado.\n"
-        "- 'options': List with EXACTLY 4 options.\n"
-        # MUDANÇA AQUI: Reforço semântico para evitar apenas a letra
-        "- 'correct_answer': The EXACT text content of the correct option. "
-        "DO NOT return just a letter (like 'A' or 'B'), you MUST return the full string as it appears in the options list.\n"
-        "- 'explanation': A teaching paragraph explaining why the answer is correct.\n"
-        "- 'difficulty': Must be '{difficulty}'.\n\n"
-        "Return ONLY the JSON object."
-    ),
-    input_variables=["topic", "difficulty"]
+FILL_BLANK_BATCH_TEMPLATE = (
+    "Generate {count} DISTINCT {difficulty} fill-in-the-blank questions about the topic: {topic}.\n"
+    "Mark each blank with '___'; 'answer' is the exact missing word or phrase.\n"
+    "JSON schema: {schema}"
 )
 
-# 3. Template de Preenchimento de Lacuna
-fill_blank_prompt_template = PromptTemplate(
-    template=(
-        SYSTEM_RULES +
-        "\nGenerate a {difficulty} fill-in-the-blank question about the topic: {topic}.\n\n"
-        "FIELDS REQUIRED:\n"
-        "- 'question': A sentence where '___' represents the missing part.\n"
-        "- 'answer': The precise word or phrase for the blank.\n"
-        "- 'explanation': Why this answer is the most appropriate.\n\n"
-        "Return ONLY the JSON object."
-    ),
-    input_variables=["topic", "difficulty"]
-)
\ No newline at end of file
+# 5. Bloco de exclusões: anexado ao prompt ao pedir de novo uma questão rejeitada como duplicata
+EXCLUSIONS_HEADER = "\nDo NOT repeat or paraphrase any of these existing questions:\n"
+
+
+def format_exclusions(questions, limit: int = 10) -> str:
+    """Lista (limitada) das questões a evitar; string vazia quando não há nenhuma."""
+    recent = list(questions or ())[-limit:]
+    if not recent:
+        return ""
+    return EXCLUSIONS_HEADER + "".join(f"- {q}\n" for q in recent)
+
+
+# 6. Nomes antigos, mantidos por compatibilidade: `SYSTEM_RULES` e os
+#    PromptTemplate `mcq_prompt_template` / `fill_blank_prompt_template`
+#    (sistema + pedido em um texto só). Novos usos devem ir pelo builder.
+SYSTEM_RULES = SYSTEM_PROMPT
+
+_LEGACY_TEMPLATES = {"mcq_prompt_template": "MCQ_PROMPT", "fill_blank_prompt_template": "FILL_BLANK_PROMPT"}
+
+
+def __getattr__(name):
+    # Criados sob demanda: o builder importa este módulo
+    if name not in _LEGACY_TEMPLATES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from src.prompts import builder
+    template = globals()[name] = getattr(builder, _LEGACY_TEMPLATES[name]).as_prompt_template()
+    return template
@@ -0,0 +1,79 @@
+"""
+Compactação/exportação do results store para CSV ou Parquet, sob demanda.
+
+Uso:
+    python -m src.storage.export --format parquet --output /tmp/quiz_results/export.parquet
+    python -m src.storage.export --format csv --output dump.csv --truncate
+"""
+import argparse
+import sys
+from typing import Optional
+
+from src.storage.results_store import ResultsStore, get_results_store, rows_to_csv
+from utils.logger import get_logger
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+
+def _write(rows, output: str, fmt: str) -> int:
+    if fmt == "csv":
+        count = 0
+
+        def _counted():
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        with open(output, "w", encoding="utf-8", newline="") as f:
+            for chunk in rows_to_csv(_counted()):
+                f.write(chunk)
+        return count
+    if fmt == "parquet":
+        # pandas (e pyarrow) só são importados neste caminho de exportação
+        import pandas as pd
+        rows = list(rows)
+        try:
+            pd.DataFrame(rows).to_parquet(output, index=False)
+        except ImportError as exc:
+            raise AppException("Parquet export requires pyarrow or fastparquet", exc)
+        return len(rows)
+    raise AppException(f"Unsupported export format: {fmt}")
+
+
+def export_results(store: ResultsStore, output: str, fmt: str = "csv",
+                   session_id: Optional[str] = None, truncate: bool = False) -> int:
+    """
+    Writes the stored rows to `output`. With `truncate`, the exported rows
+    are removed from the store afterwards (compaction: the export becomes the
+    archive); rows appended by other writers during the export are kept.
+    Returns the row count.
+    """
+    if fmt not in ("csv", "parquet"):
+        raise AppException(f"Unsupported export format: {fmt}")
+    if truncate and session_id is None:
+        count = store.compact(lambda rows: _write(rows, output, fmt))
+    else:
+        count = _write(store.iter_rows(session_id), output, fmt)
+    logger.info(f"Exported {count} result row(s) to {output} ({fmt})")
+    return count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--session", help="Export a single session")
+    parser.add_argument("--truncate", action="store_true", help="Remove the exported rows from the store (full export only)")
+    parser.add_argument("--config", default="config/storage.yaml")
+    args = parser.parse_args(argv)
+
+    store = get_results_store(args.config)
+    export_results(store, args.output, args.format, args.session, args.truncate)
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
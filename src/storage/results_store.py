@@ -0,0 +1,364 @@
+import csv
+import fcntl
+import io
+import json
+import os
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, Iterator, Optional
+
+import yaml
+
+from utils.logger import get_logger
+from utils.custom_exception import AppException
+
+logger = get_logger(__name__)
+
+RESULT_FIELDS = [
+    "session_id", "topic", "difficulty", "question_type", "question", "user_answer",
+    "correct_answer", "explanation", "is_correct", "timestamp",
+]
+
+
+class ResultsStore(ABC):
+    """
+    Append-only store of quiz results.
+
+    `append` only enqueues rows; a background thread writes them in batches
+    (as soon as `batch_size` rows are queued, or every `flush_interval_seconds`),
+    so the interactive path never waits on disk. Implementations must be
+    safe with several writers (threads, processes and replicas sharing the
+    same volume).
+    """
+
+    def __init__(self, batch_size: int = 50, flush_interval_seconds: float = 1.0):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self._pending = queue.Queue()
+        self._unwritten: list = []
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._wake = threading.Event()
+        self._writer = threading.Thread(target=self._run, name=f"{type(self).__name__}-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, rows: Iterable[dict]) -> int:
+        count = 0
+        for row in rows:
+            self._pending.put(row)
+            count += 1
+        if self._pending.qsize() >= self.batch_size:
+            self._wake.set()
+        return count
+
+    def _drain(self) -> list:
+        rows = []
+        while True:
+            try:
+                rows.append(self._pending.get_nowait())
+            except queue.Empty:
+                return rows
+
+    def flush(self) -> None:
+        """
+        Writes everything queued so far (called by the writer and before reads).
+        A batch that fails to write is kept, in order, and retried first on the
+        next flush.
+        """
+        with self._flush_lock:
+            rows = self._unwritten + self._drain()
+            self._unwritten = []
+            if rows:
+                try:
+                    self._write_batch(rows)
+                except Exception as e:
+                    self._unwritten = rows
+                    logger.error(f"Failed to persist {len(rows)} result row(s), will retry: {str(e)}")
+                    raise
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval_seconds)
+            self._wake.clear()
+            if self._pending.qsize() or self._unwritten or self._closed.is_set():
+                try:
+                    self.flush()
+                except Exception:
+                    pass
+
+    def close(self) -> None:
+        self._closed.set()
+        self._wake.set()
+        self._writer.join(timeout=5)
+        self.flush()
+
+    def iter_rows(self, session_id: Optional[str] = None) -> Iterator[dict]:
+        """Streams stored rows (optionally one session), oldest first."""
+        self.flush()
+        return self._read(session_id)
+
+    def compact(self, consume: Callable[[Iterator[dict]], int]) -> int:
+        """
+        Hands every stored row to `consume` (the export) and then drops
+        exactly those rows: rows other processes or replicas append in the
+        meantime stay in the store. Nothing is dropped if `consume` fails.
+        Returns what `consume` returned.
+        """
+        self.flush()
+        handle = self._detach()
+        if handle is None:
+            return consume(iter(()))
+        try:
+            result = consume(self._read_detached(handle))
+        except BaseException:
+            self._restore_detached(handle)
+            raise
+        self._drop_detached(handle)
+        return result
+
+    @abstractmethod
+    def _write_batch(self, rows: list) -> None:
+        """Durably appends one batch."""
+
+    @abstractmethod
+    def _read(self, session_id: Optional[str]) -> Iterator[dict]:
+        """Yields stored rows."""
+
+    @abstractmethod
+    def _detach(self):
+        """Freezes the rows stored so far for `compact`; returns a handle (None when empty)."""
+
+    @abstractmethod
+    def _read_detached(self, handle) -> Iterator[dict]:
+        ...
+
+    @abstractmethod
+    def _drop_detached(self, handle) -> None:
+        ...
+
+    @abstractmethod
+    def _restore_detached(self, handle) -> None:
+        ...
+
+
+class JSONLResultsStore(ResultsStore):
+    """
+    One JSON object per line. Each batch is a single `write` on an O_APPEND
+    descriptor under an exclusive `flock`, so concurrent writers never
+    interleave lines. Compaction renames the file under that lock; writers
+    check, once they hold the lock, that their descriptor is still the live
+    file and reopen it otherwise, so no row lands in a detached file.
+    """
+
+    def __init__(self, path: str, batch_size: int = 50, flush_interval_seconds: float = 1.0):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        super().__init__(batch_size, flush_interval_seconds)
+
+    def _lock_live(self) -> int:
+        """Opens the live file and returns its descriptor, exclusively locked."""
+        while True:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                live = os.stat(self.path)
+            except FileNotFoundError:
+                live = None
+            opened = os.fstat(fd)
+            if live is not None and (live.st_dev, live.st_ino) == (opened.st_dev, opened.st_ino):
+                return fd
+            # Renamed by a compaction between our open and our lock: retry on the new file
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _write_batch(self, rows: list) -> None:
+        data = "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows).encode("utf-8")
+        fd = self._lock_live()
+        try:
+            os.write(fd, data)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _read(self, session_id: Optional[str]) -> Iterator[dict]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            try:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    row = json.loads(line)
+                    if session_id is None or row.get("session_id") == session_id:
+                        yield row
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _detach(self) -> Optional[str]:
+        if not os.path.exists(self.path):
+            return None
+        detached = f"{self.path}.compacting-{os.getpid()}-{threading.get_ident()}"
+        fd = self._lock_live()
+        try:
+            os.rename(self.path, detached)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        return detached
+
+    def _read_detached(self, handle: str) -> Iterator[dict]:
+        with open(handle, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _drop_detached(self, handle: str) -> None:
+        os.remove(handle)
+
+    def _restore_detached(self, handle: str) -> None:
+        with open(handle, "rb") as f:
+            data = f.read()
+        fd = self._lock_live()
+        try:
+            os.write(fd, data)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        os.remove(handle)
+
+
+class SQLiteResultsStore(ResultsStore):
+    """
+    SQLite in WAL mode: readers don't block the writer and several processes
+    can append to the same file (SQLite serializes the write transactions).
+    """
+
+    def __init__(self, path: str, batch_size: int = 50, flush_interval_seconds: float = 1.0):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        try:
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS quiz_results ("
+                    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                    " session_id TEXT,"
+                    " payload TEXT NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_quiz_results_session ON quiz_results(session_id)")
+        except sqlite3.Error as exc:
+            raise AppException(f"Could not open results store at {path}", exc)
+        super().__init__(batch_size, flush_interval_seconds)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _write_batch(self, rows: list) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO quiz_results (session_id, payload) VALUES (?, ?)",
+                    [(row.get("session_id"), json.dumps(row, ensure_ascii=False, default=str)) for row in rows],
+                )
+        finally:
+            conn.close()
+
+    def _read(self, session_id: Optional[str]) -> Iterator[dict]:
+        conn = self._connect()
+        try:
+            if session_id is None:
+                cursor = conn.execute("SELECT payload FROM quiz_results ORDER BY id")
+            else:
+                cursor = conn.execute(
+                    "SELECT payload FROM quiz_results WHERE session_id = ? ORDER BY id", (session_id,)
+                )
+            for (payload,) in cursor:
+                yield json.loads(payload)
+        finally:
+            conn.close()
+
+    def _detach(self) -> Optional[int]:
+        # Ids only grow, so "everything up to the current max" is a stable cut
+        conn = self._connect()
+        try:
+            (max_id,) = conn.execute("SELECT MAX(id) FROM quiz_results").fetchone()
+        finally:
+            conn.close()
+        return max_id
+
+    def _read_detached(self, handle: int) -> Iterator[dict]:
+        conn = self._connect()
+        try:
+            for (payload,) in conn.execute("SELECT payload FROM quiz_results WHERE id <= ? ORDER BY id", (handle,)):
+                yield json.loads(payload)
+        finally:
+            conn.close()
+
+    def _drop_detached(self, handle: int) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM quiz_results WHERE id <= ?", (handle,))
+        finally:
+            conn.close()
+
+    def _restore_detached(self, handle: int) -> None:
+        # The rows were never removed
+        pass
+
+
+def rows_to_csv(rows: Iterable[dict], fields: list = RESULT_FIELDS) -> Iterator[str]:
+    """Streams rows as CSV text chunks (header first) without building a DataFrame."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+def load_storage_config(path: str = "config/storage.yaml") -> dict:
+    try:
+        with open(path, "r") as f:
+            return yaml.safe_load(f) or {}
+    except Exception as exc:
+        logger.error(f"Critical failure while loading config file: {path}")
+        raise AppException("Infrastructure Configuration Error", exc)
+
+
+_store_lock = threading.Lock()
+_store: Optional[ResultsStore] = None
+
+
+def get_results_store(config_path: str = "config/storage.yaml") -> ResultsStore:
+    """Process-wide results store described by the `results` section of config/storage.yaml."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            return _store
+
+        conf = load_storage_config(config_path).get("results", {})
+        backend = conf.get("backend", "jsonl")
+        options = {
+            "batch_size": conf.get("batch_size", 50),
+            "flush_interval_seconds": conf.get("flush_interval_seconds", 1.0),
+        }
+        if backend == "jsonl":
+            _store = JSONLResultsStore(conf.get("path", "/tmp/quiz_results/results.jsonl"), **options)
+        elif backend == "sqlite":
+            _store = SQLiteResultsStore(conf.get("path", "/tmp/quiz_results/results.sqlite"), **options)
+        else:
+            raise AppException(f"Unsupported results backend: {backend}")
+
+        logger.info(f"Results store ready | backend: {backend} | path: {_store.path}")
+        return _store
@@ -0,0 +1,252 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Optional
+
+from src.storage.results_store import load_storage_config
+from utils.logger import get_logger
+from utils.custom_exception import AppException
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class SessionStore(ABC):
+    """
+    Server-side store of session snapshots (`QuizManager.snapshot()`), keyed by session id.
+
+    Reads refresh a session's last-seen time; sessions idle for longer than
+    `idle_ttl_seconds` are evicted by a sweep that runs at most every
+    `sweep_interval_seconds`, piggybacked on regular calls (no extra thread).
+    """
+
+    backend = "abstract"
+
+    def __init__(self, idle_ttl_seconds: float = 1800.0, sweep_interval_seconds: float = 60.0):
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._last_sweep = time.monotonic()
+        self._sweep_lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[dict]:
+        """The session's snapshot, or None if it is unknown or was evicted."""
+
+    @abstractmethod
+    def put(self, session_id: str, state: dict) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def _evict_before(self, cutoff: float) -> int:
+        """Drops sessions last seen before `cutoff` (wall clock); returns how many."""
+
+    def evict_idle(self) -> int:
+        evicted = self._evict_before(time.time() - self.idle_ttl_seconds)
+        if evicted:
+            metrics.inc("sessions_evicted_total", evicted, backend=self.backend, reason="idle")
+            logger.info(f"Evicted {evicted} idle session(s) | backend: {self.backend}")
+        return evicted
+
+    def _maybe_sweep(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep < self.sweep_interval_seconds:
+            return
+        with self._sweep_lock:
+            if now - self._last_sweep < self.sweep_interval_seconds:
+                return
+            self._last_sweep = now
+        self.evict_idle()
+
+
+class InProcessSessionStore(SessionStore):
+    """
+    Snapshots kept as live objects in an LRU-ordered dict (one replica).
+    Question records stay shared with every other session; `max_sessions`
+    caps memory by evicting the least recently used session first.
+    """
+
+    backend = "memory"
+
+    def __init__(self, idle_ttl_seconds: float = 1800.0, max_sessions: Optional[int] = None,
+                 sweep_interval_seconds: float = 60.0):
+        super().__init__(idle_ttl_seconds, sweep_interval_seconds)
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[dict]:
+        self._maybe_sweep()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            state, last_seen = entry
+            if last_seen < time.time() - self.idle_ttl_seconds:
+                del self._sessions[session_id]
+                return None
+            self._sessions[session_id] = (state, time.time())
+            self._sessions.move_to_end(session_id)
+            return state
+
+    def put(self, session_id: str, state: dict) -> None:
+        self._maybe_sweep()
+        evicted = 0
+        with self._lock:
+            self._sessions[session_id] = (state, time.time())
+            self._sessions.move_to_end(session_id)
+            while self.max_sessions and len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                evicted += 1
+        if evicted:
+            metrics.inc("sessions_evicted_total", evicted, backend=self.backend, reason="capacity")
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _evict_before(self, cutoff: float) -> int:
+        evicted = 0
+        with self._lock:
+            # Oldest access first, so the sweep stops at the first live session
+            while self._sessions:
+                session_id, (_, last_seen) = next(iter(self._sessions.items()))
+                if last_seen >= cutoff:
+                    break
+                del self._sessions[session_id]
+                evicted += 1
+        return evicted
+
+
+def _encode(value):
+    # QuestionRecord / QuizResult are read-only mappings
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, tuple):
+        return list(value)
+    return str(value)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Snapshots as JSON in a SQLite file (WAL). On a volume shared by the
+    replicas, sessions survive pod restarts and can be picked up by any pod.
+    Reads only rewrite the last-seen time once per `touch_interval_seconds`.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = "/tmp/quiz_sessions/sessions.sqlite", idle_ttl_seconds: float = 1800.0,
+                 sweep_interval_seconds: float = 60.0, touch_interval_seconds: float = 60.0):
+        super().__init__(idle_ttl_seconds, sweep_interval_seconds)
+        self.path = path
+        self.touch_interval_seconds = touch_interval_seconds
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        try:
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions "
+                    "(session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated)")
+        except sqlite3.Error as exc:
+            raise AppException(f"Could not open session store at {path}", exc)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, session_id: str) -> Optional[dict]:
+        self._maybe_sweep()
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT state, updated FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            state, updated = row
+            if updated < now - self.idle_ttl_seconds:
+                with conn:
+                    conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                return None
+            if now - updated > self.touch_interval_seconds:
+                with conn:
+                    conn.execute("UPDATE sessions SET updated = ? WHERE session_id = ?", (now, session_id))
+            return json.loads(state)
+        finally:
+            conn.close()
+
+    def put(self, session_id: str, state: dict) -> None:
+        self._maybe_sweep()
+        payload = json.dumps(state, ensure_ascii=False, default=_encode)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, state, updated) VALUES (?, ?, ?)",
+                    (session_id, payload, time.time()),
+                )
+        finally:
+            conn.close()
+
+    def delete(self, session_id: str) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        finally:
+            conn.close()
+
+    def _evict_before(self, cutoff: float) -> int:
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute("DELETE FROM sessions WHERE updated < ?", (cutoff,)).rowcount
+        finally:
+            conn.close()
+
+
+_store_lock = threading.Lock()
+_store: Optional[SessionStore] = None
+_configured = False
+
+
+def get_session_store(config_path: str = "config/storage.yaml") -> Optional[SessionStore]:
+    """
+    Process-wide session store described by the `sessions` section of
+    config/storage.yaml, or None when it is disabled (`backend: none`).
+    """
+    global _store, _configured
+    with _store_lock:
+        if _configured:
+            return _store
+
+        conf = load_storage_config(config_path).get("sessions") or {}
+        backend = conf.get("backend", "none")
+        options = {
+            "idle_ttl_seconds": conf.get("idle_ttl_seconds", 1800.0),
+            "sweep_interval_seconds": conf.get("sweep_interval_seconds", 60.0),
+        }
+        if backend == "none":
+            _store = None
+        elif backend == "memory":
+            _store = InProcessSessionStore(max_sessions=conf.get("max_sessions"), **options)
+        elif backend == "sqlite":
+            _store = SQLiteSessionStore(conf.get("path", "/tmp/quiz_sessions/sessions.sqlite"), **options)
+        else:
+            raise AppException(f"Unsupported sessions backend: {backend}")
+
+        _configured = True
+        logger.info(f"Session store ready | backend: {backend}")
+        return _store
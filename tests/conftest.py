@@ -0,0 +1,64 @@
+import os
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# Everything runs against the offline fake provider (no API keys, no network)
+os.environ["LLM_PROVIDER"] = "fake"
+
+from src.llm.fake_llm import FakeChatModel
+
+
+@pytest.fixture
+def fake_model():
+    """Builds a FakeChatModel with no simulated latency unless asked for."""
+    def _build(latency: float = 0.0, **kwargs):
+        return FakeChatModel(latency=latency, jitter=0.0, **kwargs)
+    return _build
+
+
+@pytest.fixture
+def generator(fake_model):
+    """QuestionGenerator on the fake provider, without the shared question cache."""
+    from src.generation.question_generator import QuestionGenerator
+    from src.llm.llm_client import get_llm_client
+
+    def _build(llm=None):
+        generator = QuestionGenerator(llm_client=get_llm_client(provider="fake"), cache=False)
+        generator.llm = llm or fake_model()
+        return generator
+    return _build
+
+
+class ScriptedModel:
+    """
+    Chat model stand-in that answers each call with the next of `replies`
+    (an exception instance is raised instead) and keeps the prompts it got.
+    """
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def _next(self, input):
+        self.prompts.append(input[-1].content if isinstance(input, list) else str(input))
+        reply = self.replies.pop(0)
+        if isinstance(reply, BaseException):
+            raise reply
+        return reply
+
+    def invoke(self, input, config=None):
+        return AIMessage(content=self._next(input))
+
+    async def ainvoke(self, input, config=None):
+        return AIMessage(content=self._next(input))
+
+    async def astream(self, input, config=None):
+        content = self._next(input)
+        for i in range(0, len(content), 16):
+            yield AIMessageChunk(content=content[i:i + 16])
+
+
+@pytest.fixture
+def scripted_model():
+    return ScriptedModel
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+from collections import Counter
+
+import pytest
+
+from src.bulk.batch_api import LocalBatchSubmitter
+from src.bulk.manifest import expand_manifest
+from src.bulk.output import Checkpoint
+from src.bulk.runner import BulkJob
+
+MANIFEST = {
+    "defaults": {"count": 4, "difficulties": ["Easy", "Hard"], "question_types": ["Multiple Choice", "Fill in the Blank"]},
+    "topics": ["Python Programming", {"topic": "Docker", "count": 2, "difficulties": ["Medium"]}],
+}
+
+
+@pytest.fixture
+def tasks():
+    return expand_manifest(MANIFEST, batch_size=2)
+
+
+def shard_lines(directory) -> list:
+    lines = []
+    for name in sorted(os.listdir(directory)):
+        if name.startswith("questions-"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                lines.extend(f.read().splitlines())
+    return lines
+
+
+def test_manifest_expands_into_stable_task_ids(tasks):
+    assert len(tasks) == 2 * 2 * 2 + 2
+    assert max(t.count for t in tasks) == 2
+    assert tasks[0].id == "mcq:Easy:python programming:0"
+    assert expand_manifest(MANIFEST, batch_size=2) == tasks
+
+
+def test_run_writes_every_task_once(generator, tasks, tmp_path):
+    report = BulkJob(generator(), tasks, str(tmp_path), shard_size=5, report_interval_seconds=60).run()
+
+    records = [json.loads(line) for line in shard_lines(tmp_path)]
+    assert report["tasks_done"] == len(tasks)
+    assert report["questions_this_run"] == len(records) == sum(t.count for t in tasks)
+    assert set(Counter(r["task_id"] for r in records)) == {t.id for t in tasks}
+    assert report["shards"] > 1
+
+
+def test_resume_after_torn_write_skips_finished_tasks(generator, tasks, tmp_path):
+    BulkJob(generator(), tasks, str(tmp_path), report_interval_seconds=60).run()
+
+    # Crash: the last two tasks reached the shard but not the checkpoint,
+    # and both files end in a half-written line
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    entries = checkpoint.read_text(encoding="utf-8").splitlines()
+    lost = {json.loads(line)["task_id"] for line in entries[-2:]}
+    checkpoint.write_text("\n".join(entries[:-2]) + '\n{"event": "task_do', encoding="utf-8")
+    with open(tmp_path / "questions-00000.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"task_id": "torn')
+
+    job = BulkJob(generator(), tasks, str(tmp_path), report_interval_seconds=60)
+    report = job.run()
+
+    assert report["tasks_done_this_run"] == 2
+    assert report["tasks_from_previous_runs"] == len(tasks) - 2
+    records = [json.loads(line) for line in shard_lines(tmp_path)]
+    per_task = Counter(r["task_id"] for r in records)
+    assert set(per_task) == {t.id for t in tasks}
+    assert all(per_task[t.id] == t.count for t in tasks)
+    # The torn checkpoint line was cut, not glued to the next entry
+    reloaded = Checkpoint(str(checkpoint))
+    assert set(reloaded.done) == {t.id for t in tasks}
+    assert lost <= set(reloaded.done)
+
+    again = BulkJob(generator(), tasks, str(tmp_path), report_interval_seconds=60).run()
+    assert again["tasks_done_this_run"] == 0
+
+
+class FailingGenerator:
+    _pricing = {}
+
+    async def agenerate_mcq_batch(self, *args, **kwargs):
+        raise RuntimeError("429 Too Many Requests")
+
+    agenerate_fill_blank_batch = agenerate_mcq_batch
+
+
+def test_stops_after_consecutive_failures(tasks, tmp_path):
+    report = BulkJob(FailingGenerator(), tasks, str(tmp_path), concurrency=1, stop_after_failures=3,
+                     report_interval_seconds=60).run()
+
+    assert report["stopped"] == "too_many_failures"
+    assert report["tasks_failed"] == 3
+    assert report["tasks_done"] == 0
+    assert shard_lines(tmp_path) == []
+
+
+def test_batch_api_resume_polls_submitted_batches(generator, fake_model, tasks, tmp_path):
+    submitter = LocalBatchSubmitter(fake_model(), str(tmp_path / "batches"), completion_delay_seconds=0.3)
+    output = str(tmp_path / "out")
+
+    async def interrupted():
+        job = BulkJob(generator(), tasks, output, submitter=submitter, max_requests_per_batch=4,
+                      poll_interval_seconds=0.05, report_interval_seconds=60)
+        run = asyncio.create_task(job.arun())
+        await asyncio.sleep(0.1)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        return job
+
+    first = asyncio.run(interrupted())
+    submitted = set(first.checkpoint.batches)
+    assert len(submitted) == 3 and not first.checkpoint.done
+
+    resumed = BulkJob(generator(), tasks, output, submitter=submitter, max_requests_per_batch=4,
+                      poll_interval_seconds=0.05, report_interval_seconds=60)
+    report = resumed.run()
+
+    assert report["tasks_done"] == len(tasks)
+    # Nothing was submitted twice
+    batch_inputs = [n for n in os.listdir(tmp_path / "batches") if n.endswith(".input.json")]
+    assert len(batch_inputs) == len(submitted)
+    assert not resumed.checkpoint.batches
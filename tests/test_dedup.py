@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.common.helpers import QuizManager
+from src.generation.dedup import DedupIndex, DuplicateMatch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_quiz_manager_loads_numpy_only_when_a_quiz_is_deduplicated():
+    script = (
+        "import sys\n"
+        "from src.common.helpers import QuizManager\n"
+        "manager = QuizManager()\n"
+        "print('numpy' in sys.modules)\n"
+        "manager._accept('Which keyword defines a function in Python?', 1, final=False)\n"
+        "print('numpy' in sys.modules)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                         cwd=ROOT).stdout
+
+    assert out.split() == ["False", "True"]
+
+
+QUESTION = "Which built-in Python function returns the number of items stored in a list?"
+REWORDED = "Which built-in Python function returns the number of items stored in a list object?"
+DISTINCT = [
+    "What does the global interpreter lock serialize inside CPython?",
+    "Which exception is raised when a dictionary lookup misses its key?",
+    "What keyword starts the definition of a generator function's yield?",
+    "Which module provides high resolution monotonic clocks in Python?",
+]
+
+
+def test_exact_repeats_match_after_normalization():
+    index = DedupIndex()
+    index.add(QUESTION, "quiz-1")
+
+    assert index.find("  which BUILT-IN python function returns the number of items stored in a list ") == \
+        DuplicateMatch("quiz-1", 1.0)
+
+
+def test_near_duplicates_match_and_distinct_questions_do_not():
+    index = DedupIndex(threshold=0.75)
+    for i, text in enumerate(DISTINCT * 3):
+        # More entries than the initial storage: exercises its growth
+        index.add(f"{text} ({i})", i)
+    index.add(QUESTION, "target")
+
+    match = index.find(REWORDED)
+    assert match is not None and match.key == "target" and 0.75 <= match.similarity < 1.0
+    assert DedupIndex(threshold=1.0).find(REWORDED) is None
+    assert index.find("How do you open a file for appending in text mode?") is None
+
+
+def test_add_if_new_only_counts_entries_within_the_given_keys():
+    index = DedupIndex()
+    assert index.add_if_new(QUESTION, 1) is None
+
+    assert index.add_if_new(REWORDED, 2).key == 1
+    assert index.add_if_new(REWORDED, 2, within={2}) is None
+    assert index.add_if_new(QUESTION, 2, within={2}).key == 2
+    assert len(index) == 2
+
+
+def test_bands_must_divide_the_permutations():
+    with pytest.raises(ValueError):
+        DedupIndex(num_perm=64, bands=10)
+
+
+def test_session_tolerates_history_repeats_only_on_the_last_attempt():
+    manager = QuizManager()
+    assert manager._accept(QUESTION, 1, final=False)
+
+    assert not manager._accept(REWORDED, 2, final=False)
+    assert manager._accept(REWORDED, 2, final=True)
+    # A repeat inside the same quiz is never accepted
+    assert not manager._accept(QUESTION, 2, final=True)
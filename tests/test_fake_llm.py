@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.llm.fake_llm import FakeProviderError
+from src.models.schema import FillBlankQuestion, MCQQuestion, MCQQuestionList
+from src.prompts.builder import FILL_BLANK_PROMPT, MCQ_BATCH_PROMPT, MCQ_PROMPT
+
+
+def replies(llm, prompt, n: int = 5, **values) -> list:
+    return [llm.invoke(prompt.render(**values)).content for _ in range(n)]
+
+
+def test_same_seed_same_outputs(fake_model):
+    first = replies(fake_model(), MCQ_PROMPT, topic="Python", difficulty="Easy")
+
+    assert replies(fake_model(), MCQ_PROMPT, topic="Python", difficulty="Easy") == first
+    assert replies(fake_model(seed=7), MCQ_PROMPT, topic="Python", difficulty="Easy") != first
+    assert len(set(first)) == len(first)
+
+
+def test_answers_match_the_requested_schema(fake_model):
+    llm = fake_model()
+
+    mcq = MCQQuestion(**json.loads(llm.invoke(MCQ_PROMPT.render(topic="Docker", difficulty="Hard")).content))
+    blank = FillBlankQuestion(**json.loads(llm.invoke(FILL_BLANK_PROMPT.render(topic="Docker", difficulty="Hard")).content))
+    batch = MCQQuestionList(**json.loads(
+        llm.invoke(MCQ_BATCH_PROMPT.render(count=3, topic="Docker", difficulty="Hard")).content
+    ))
+
+    assert "Docker" in mcq.question and mcq.difficulty == "Hard"
+    assert "___" in blank.question
+    assert len(batch.questions) == 3
+
+
+def test_usage_is_reported_for_invoke_and_stream(fake_model):
+    llm = fake_model(stream_chunk_size=8)
+    messages = [HumanMessage(content="Generate a Easy fill-in-the-blank question about the topic: Git.")]
+
+    chunks = list(llm.stream(messages))
+
+    assert len(chunks) > 1
+    assert sum(chunks[1:], chunks[0]).usage_metadata["input_tokens"] == llm.invoke(messages).usage_metadata["input_tokens"]
+
+
+def test_failures_are_rate_limit_errors(fake_model):
+    llm = fake_model(failure_rate=1.0)
+    messages = MCQ_PROMPT.render(topic="Python", difficulty="Easy")
+
+    with pytest.raises(FakeProviderError):
+        llm.invoke(messages)
+    with pytest.raises(FakeProviderError):
+        asyncio.run(llm.ainvoke(messages))
+
+
+def test_generator_recovers_from_malformed_output(generator, fake_model):
+    # Every reply is truncated, wrapped in prose or answers with a letter
+    generator = generator(fake_model(malformed_rate=1.0))
+
+    questions = [generator.generate_mcq("Python", "Easy") for _ in range(20)]
+
+    assert all(q.correct_answer in q.options for q in questions)
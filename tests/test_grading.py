@@ -0,0 +1,102 @@
+import math
+
+import pandas as pd
+import pytest
+
+from src.analytics.answers import expected_answer, normalize_answer
+from src.analytics.grading import (
+    build_answer_key, distractor_analysis, grade_submissions, question_stats, topic_accuracy,
+)
+from src.common.helpers import QuizManager
+
+CAPITAL = "What is the capital of France?"
+BLANK = "Python is a ___ language."
+OPTIONS = ["Paris", "Lisbon", "Rome", "Madrid"]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("  Paris. ", "paris"),
+    ("\"PARIS\"", "paris"),
+    ("New   York", "new york"),
+    ("Straße", "strasse"),
+    ("ｐｙｔｈｏｎ", "python"),
+    (None, ""),
+    (math.nan, ""),
+    (3, "3"),
+])
+def test_answers_are_normalized(value, expected):
+    assert normalize_answer(value) == expected
+
+
+def test_expected_answer_reads_either_schema():
+    assert expected_answer({"correct_answer": "Paris", "answer": None}) == "Paris"
+    assert expected_answer({"correct_answer": None, "answer": "dynamic"}) == "dynamic"
+
+
+def submissions() -> pd.DataFrame:
+    answers = [
+        ("s1", CAPITAL, "paris", BLANK, "Dynamic."),
+        ("s2", CAPITAL, "Paris ", BLANK, "dynamic"),
+        ("s3", CAPITAL, "Lisbon", BLANK, "static"),
+        ("s4", CAPITAL, "Rome", BLANK, None),
+    ]
+    rows = []
+    for session, mcq, mcq_answer, fib, fib_answer in answers:
+        rows.append({"session_id": session, "topic": "Geo", "question": mcq, "user_answer": mcq_answer,
+                     "correct_answer": "Paris", "options": OPTIONS})
+        rows.append({"session_id": session, "topic": "Python", "question": fib, "user_answer": fib_answer,
+                     "correct_answer": None, "answer": "dynamic"})
+    return pd.DataFrame(rows)
+
+
+def test_grading_uses_each_rows_normalized_key():
+    graded = grade_submissions(submissions())
+
+    assert graded["is_correct"].tolist() == [True, True, True, True, False, False, False, False]
+
+
+def test_a_separate_answer_key_overrides_the_rows():
+    key = build_answer_key([{"question": CAPITAL, "correct_answer": "Lisbon"},
+                            {"question": BLANK, "answer": "static"}])
+
+    graded = grade_submissions(submissions().drop(columns=["correct_answer", "answer"]), key)
+
+    assert graded["is_correct"].tolist() == [False, False, False, False, True, True, False, False]
+
+
+def test_item_and_topic_reports():
+    graded = grade_submissions(submissions())
+
+    stats = question_stats(graded).set_index("question")
+    assert stats.loc[CAPITAL, "accuracy"] == 0.5
+    assert stats.loc[BLANK, "correct"] == 2
+    assert stats.loc[CAPITAL, "discrimination"] == pytest.approx(1.0)
+
+    topics = topic_accuracy(graded).set_index("topic")
+    assert topics.loc["Geo", "accuracy"] == 0.5 and topics.loc["Python", "submissions"] == 4
+
+
+def test_distractor_analysis_flags_unused_options():
+    graded = grade_submissions(submissions())
+
+    table = distractor_analysis(graded).set_index("option")
+
+    assert table["picks"].to_dict() == {"Paris": 2, "Lisbon": 1, "Rome": 1, "Madrid": 0}
+    assert table.loc["Paris", "is_key"]
+    assert table["non_functional"].to_dict() == {"Paris": False, "Lisbon": False, "Rome": False, "Madrid": True}
+    assert not table["outperforms_key"].any()
+
+
+def test_quiz_evaluation_is_normalized():
+    manager = QuizManager()
+    manager.load_questions(
+        [{"question": CAPITAL, "options": OPTIONS, "correct_answer": "Paris", "explanation": "It is."},
+         {"question": BLANK, "answer": "Dynamic", "explanation": "It is."}],
+        "Mixed", "Multiple Choice", "Easy",
+    )
+
+    manager.evaluate_quiz([" paris.", "dynamic "])
+    assert manager.score() == (2, 2, 100.0)
+
+    manager.evaluate_quiz(["Rome", ""])
+    assert manager.score() == (0, 2, 0.0)
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.jobs import QuizJobQueue, QueueFullError
+from src.api.server import create_app
+
+
+def test_identical_requests_share_one_job(generator, fake_model):
+    llm = fake_model(latency=0.1)
+    queue = QuizJobQueue(generator(llm), workers=2, max_pending=4, max_concurrency=2)
+
+    async def scenario():
+        await queue.start()
+        try:
+            first = queue.submit("Python", "Multiple Choice", "Easy", 2)
+            second = queue.submit("  python ", "Multiple Choice", "Easy", 2)
+            other = queue.submit("Python", "Multiple Choice", "Hard", 2)
+            await asyncio.gather(first.future, other.future)
+            return first, second, other
+        finally:
+            await queue.stop()
+
+    first, second, other = asyncio.run(scenario())
+
+    assert second is first
+    assert first.subscribers == 2
+    assert other is not first
+    assert first.status()["state"] == "done"
+    assert len(first.status()["questions"]) == 2
+    # 2 questions per distinct job: the coalesced request made no calls of its own
+    assert llm.calls == 4
+
+
+def test_finished_job_is_not_coalesced(generator):
+    queue = QuizJobQueue(generator(), workers=1, max_pending=4)
+
+    async def scenario():
+        await queue.start()
+        try:
+            first = queue.submit("Python", "Multiple Choice", "Easy", 1)
+            await first.future
+            return first, queue.submit("Python", "Multiple Choice", "Easy", 1)
+        finally:
+            await queue.stop()
+
+    first, again = asyncio.run(scenario())
+
+    assert again is not first
+
+
+def test_full_queue_raises_with_retry_after(generator, fake_model):
+    queue = QuizJobQueue(generator(fake_model(latency=1.0)), workers=1, max_pending=1)
+
+    async def scenario():
+        await queue.start()
+        try:
+            queue.submit("Python", "Multiple Choice", "Easy", 1)
+            await asyncio.sleep(0.05)  # the worker takes the first job
+            queue.submit("Docker", "Multiple Choice", "Easy", 1)
+            with pytest.raises(QueueFullError) as error:
+                queue.submit("Kubernetes", "Multiple Choice", "Easy", 1)
+            return error.value
+        finally:
+            await queue.stop()
+
+    error = asyncio.run(scenario())
+
+    assert error.retry_after >= 1.0
+
+
+@pytest.fixture
+def client(generator, fake_model):
+    app = create_app(generator=generator(fake_model(latency=0.5)), workers=1, max_pending=1, wait_seconds=5)
+    with TestClient(app) as client:
+        yield client
+
+
+def test_api_returns_429_when_queue_is_full(client):
+    statuses = [
+        client.post("/v1/quizzes", json={"topic": topic, "num_questions": 1, "wait": False})
+        for topic in ("Python", "Docker", "Kubernetes")
+    ]
+
+    # One job running + one pending fill the queue: the third is turned away
+    assert [r.status_code for r in statuses[:2]] == [202, 202]
+    assert statuses[2].status_code == 429
+    assert int(statuses[2].headers["Retry-After"]) >= 1
+    assert client.get("/readyz").status_code == 503
+
+
+def test_api_coalesces_identical_requests(client):
+    first = client.post("/v1/quizzes", json={"topic": "Python", "num_questions": 1, "wait": False}).json()
+    second = client.post("/v1/quizzes", json={"topic": "python", "num_questions": 1, "wait": False}).json()
+
+    assert second["job_id"] == first["job_id"]
+    assert second["subscribers"] == 2
+
+
+def test_api_waits_for_the_quiz(client):
+    response = client.post("/v1/quizzes", json={"topic": "Python", "num_questions": 2})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["state"] == "done"
+    assert len(body["questions"]) == 2
+    assert client.get(f"/v1/jobs/{body['job_id']}").json()["state"] == "done"
@@ -0,0 +1,55 @@
+import os
+import shutil
+
+import pytest
+import yaml
+
+from src.llm.llm_client import get_llm_client
+from utils.custom_exception import AppException
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "llm.yaml"
+    shutil.copy(os.path.join(ROOT, "config", "llm.yaml"), path)
+    return str(path)
+
+
+def rewrite(path: str, update) -> None:
+    with open(path) as f:
+        conf = yaml.safe_load(f)
+    update(conf)
+    with open(path, "w") as f:
+        yaml.safe_dump(conf, f)
+    # Make sure the mtime moves even on coarse-grained filesystems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_client_is_shared_until_the_file_changes(config_path):
+    client = get_llm_client(config_path, provider="fake")
+
+    assert get_llm_client(config_path, provider="fake") is client
+
+    rewrite(config_path, lambda conf: conf["cache"].update(pool_size=9))
+    reloaded = get_llm_client(config_path, provider="fake")
+
+    assert reloaded is not client
+    assert reloaded.config["cache"]["pool_size"] == 9
+    # The provider section did not change: same chat model, same connection pool
+    assert reloaded.get_llm() is client.get_llm()
+
+
+def test_changed_provider_settings_build_a_new_model(config_path):
+    llm = get_llm_client(config_path, provider="fake").get_llm()
+
+    rewrite(config_path, lambda conf: conf["providers"]["fake"]["simulation"].update(latency=0.0))
+
+    assert get_llm_client(config_path, provider="fake").get_llm() is not llm
+
+
+def test_unknown_provider_is_rejected(config_path):
+    with pytest.raises(AppException):
+        get_llm_client(config_path, provider="nope")
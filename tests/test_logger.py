@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = (
+    "import sys, threading\n"
+    "from utils.logger import get_logger\n"
+    "logger = get_logger('test.logger', log_dir=sys.argv[1])\n"
+    "logger.info('quiz ready')\n"
+    "logger.warning('slow provider')\n"
+    "print(sorted(t.name for t in threading.enumerate() if t is not threading.main_thread()))\n"
+)
+
+
+def run_logger(log_dir, **env) -> list:
+    environ = {k: v for k, v in os.environ.items() if not k.startswith("LOG_")}
+    environ.update(env)
+    proc = subprocess.run([sys.executable, "-c", SCRIPT, str(log_dir)], capture_output=True, text=True,
+                          check=True, cwd=ROOT, env=environ)
+    return proc.stdout
+
+
+def log_files(log_dir) -> dict:
+    return {name: (log_dir / name).read_text(encoding="utf-8").splitlines() for name in os.listdir(log_dir)}
+
+
+def test_default_is_sync_with_the_original_text_format(tmp_path):
+    threads = run_logger(tmp_path)
+
+    files = log_files(tmp_path)
+    assert threads.strip() == "[]"
+    [(name, lines)] = files.items()
+    assert name.endswith(".log")
+    assert [line.split(" | ")[1:] for line in lines] == [
+        ["INFO", "test.logger", "quiz ready"], ["WARNING", "test.logger", "slow provider"],
+    ]
+
+
+@pytest.mark.parametrize("file_format, extension", [("text", ".log"), ("json", ".jsonl")])
+def test_async_mode_is_opt_in(tmp_path, file_format, extension):
+    run_logger(tmp_path, LOG_MODE="async", LOG_FILE_FORMAT=file_format)
+
+    [(name, lines)] = log_files(tmp_path).items()
+    assert name.endswith(extension)
+    if file_format == "json":
+        assert [json.loads(line)["message"] for line in lines] == ["quiz ready", "slow provider"]
+    else:
+        assert [line.split(" | ")[-1] for line in lines] == ["quiz ready", "slow provider"]
@@ -0,0 +1,64 @@
+import contextvars
+
+from src.common.helpers import QuizManager
+from utils.metrics import MetricsRegistry, UsageAccumulator, current_usage
+
+
+def test_counters_and_histograms_render_as_prometheus_text():
+    registry = MetricsRegistry(buckets=(0.1, 1))
+    registry.describe("calls_total", "Calls made")
+    registry.inc("calls_total", provider="groq")
+    registry.inc("calls_total", 2, provider="groq")
+    registry.observe("latency_seconds", 0.05, stage="parse")
+    registry.observe("latency_seconds", 0.5, stage="parse")
+    registry.observe("latency_seconds", 5, stage="parse")
+
+    lines = registry.render_prometheus().splitlines()
+
+    assert lines[:3] == ["# HELP calls_total Calls made", "# TYPE calls_total counter", 'calls_total{provider="groq"} 3.0']
+    assert 'latency_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="parse",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="parse",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{stage="parse"} 3' in lines
+    assert registry.snapshot()["histograms"]["latency_seconds"]['{stage="parse"}'] == {"count": 3, "sum": 5.55}
+
+
+def test_a_failing_sink_does_not_break_recording():
+    class Broken:
+        def emit(self, kind, name, value, labels):
+            raise RuntimeError("sink down")
+
+    registry = MetricsRegistry()
+    registry.add_sink(Broken())
+    registry.inc("calls_total")
+
+    assert registry.snapshot()["counters"]["calls_total"] == {"total": 1.0}
+
+
+def test_usage_is_priced_and_summed_into_the_current_scope():
+    registry = MetricsRegistry()
+    pricing = {"input_per_1m": 0.5, "output_per_1m": 1.5}
+    usage = UsageAccumulator()
+
+    def _quiz():
+        current_usage.set(usage)
+        registry.record_usage("groq", "llama", 1000, 200, pricing)
+        return registry.record_usage("groq", "llama", 1000, 200, pricing)
+
+    cost = contextvars.copy_context().run(_quiz)
+    # Outside the scope, calls are still counted but not attributed to the quiz
+    registry.record_usage("groq", "llama", 1000, 200, pricing)
+
+    assert cost == (1000 * 0.5 + 200 * 1.5) / 1e6
+    assert usage.as_dict() == {"input_tokens": 2000, "output_tokens": 400, "cost_usd": 0.0016, "llm_calls": 2}
+    counters = registry.snapshot()["counters"]
+    assert counters["llm_tokens_total"]['{direction="input",model="llama",provider="groq"}'] == 3000
+
+
+def test_quiz_reports_its_own_token_usage(generator):
+    manager = QuizManager()
+
+    manager.generate_questions(generator(), "Python", "Multiple Choice", "Easy", 3)
+
+    assert manager.last_usage["llm_calls"] == 3
+    assert manager.last_usage["input_tokens"] > 0 and manager.last_usage["output_tokens"] > 0
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from src.generation.parsing import decode_first, extract_json, get_parser, json_spans
+from src.models.schema import FillBlankQuestion, MCQQuestion
+
+MCQ = {
+    "question": "What is the capital of France?",
+    "options": ["Paris", "Lisbon", "Rome", "Madrid"],
+    "correct_answer": "Paris",
+    "explanation": "Paris is the capital {and largest city} of France.",
+}
+
+
+def test_spans_skip_prose_fences_and_brackets_inside_strings():
+    payload = json.dumps(MCQ)
+    text = f"Here you go (with a stray }} and a {{ brace):\n```json\n{payload}\n```\nAnything else?"
+
+    assert extract_json(text) == payload
+    assert json_spans('{"a": {"b": 1}} then [1, 2] and {"c": "]"}', openers="{[") == [(0, 15), (21, 27), (32, 42)]
+    assert json_spans('{"truncated": "no end') == []
+
+
+def test_decode_first_returns_the_first_value_of_the_wanted_type():
+    assert decode_first('[1, 2] {"a": 1}') == {"a": 1}
+    assert decode_first('noise [1, 2] {"a": 1}', (list,), openers="[") == [1, 2]
+    # Two objects: the one-slice fast path fails, the span scan still finds the first
+    assert decode_first('{"a": 1} and {"b": 2}') == {"a": 1}
+    assert decode_first('{"text": "line one\nline two"}') == {"text": "line one\nline two"}
+    with pytest.raises(json.JSONDecodeError):
+        decode_first("no json at all")
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(MCQ),
+    f"  {json.dumps(MCQ, indent=2)}\n",
+    f"```json\n{json.dumps(MCQ)}\n```",
+    f"Sure! {json.dumps(MCQ)} Hope it helps.",
+])
+def test_parse_accepts_bare_and_wrapped_objects(text):
+    assert get_parser(MCQQuestion).parse(text) == MCQQuestion(**MCQ)
+
+
+def test_parse_reports_schema_errors_not_decode_errors():
+    with pytest.raises(ValidationError):
+        get_parser(MCQQuestion).parse(json.dumps({**MCQ, "options": ["Paris"]}))
+
+
+def test_batch_items_are_returned_undecoded():
+    parser = get_parser(MCQQuestion)
+    items = [MCQ, {"question": "broken"}]
+
+    assert parser.items(json.dumps({"questions": items})) == items
+    assert parser.items(f"```\n{json.dumps(items)}\n```") == items
+    with pytest.raises(ValueError):
+        parser.items('{"questions": "none"}')
+
+
+def chunks(text: str, size: int = 7) -> list:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_streaming_parser_completes_fields_as_they_arrive():
+    text = "```json\n" + json.dumps({**MCQ, "explanation": 'Quoted "Paris", escaped \\.'}) + "\n```"
+    stream = get_parser(MCQQuestion).stream()
+
+    completed = [name for chunk in chunks(text) for name in stream.feed(chunk)]
+
+    assert completed == ["question", "options", "correct_answer", "explanation"]
+    assert stream.complete
+    assert stream.result().explanation == 'Quoted "Paris", escaped \\.'
+
+
+def test_streaming_parser_fails_fast_on_a_bad_field():
+    text = json.dumps({**MCQ, "options": ["Paris", "Lisbon"]})
+    stream = get_parser(MCQQuestion).stream(fail_fast=True)
+
+    with pytest.raises(ValidationError):
+        for chunk in chunks(text):
+            stream.feed(chunk)
+    # It stopped before the rest of the completion was read
+    assert "explanation" not in stream.fields
+
+
+def test_tolerated_fields_wait_for_the_end():
+    text = json.dumps({"question": "Python is a dynamic language.", "answer": "dynamic", "explanation": "It is."})
+    stream = get_parser(FillBlankQuestion).stream(fail_fast=True, tolerate={"question"})
+
+    for chunk in chunks(text):
+        stream.feed(chunk)
+
+    assert stream.complete and "question" in stream.errors
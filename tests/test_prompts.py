@@ -0,0 +1,52 @@
+from src.models.schema import FillBlankQuestionList, MCQQuestion
+from src.prompts.builder import FILL_BLANK_PROMPT, MCQ_PROMPT, CompiledPrompt, compact_schema
+from src.prompts.templates import MCQ_TEMPLATE, SYSTEM_PROMPT
+
+
+def test_legacy_template_names_still_import():
+    from src.prompts.templates import SYSTEM_RULES, fill_blank_prompt_template, mcq_prompt_template
+
+    text = mcq_prompt_template.format(topic="Python", difficulty="Easy")
+
+    assert text.startswith(SYSTEM_RULES)
+    assert MCQ_PROMPT.schema in text
+    assert "about the topic: Python." in text
+    assert set(fill_blank_prompt_template.input_variables) == {"topic", "difficulty"}
+
+
+def test_compact_schema_is_derived_from_the_model():
+    assert compact_schema(MCQQuestion) == (
+        '{"question":string(>=10 chars),"options":string[4],"correct_answer":string,'
+        '"explanation":string,"difficulty"?:"Easy"|"Medium"|"Hard"}'
+    )
+    assert compact_schema(FillBlankQuestionList).startswith('{"questions":[{"question":string,')
+
+
+def test_fingerprint_follows_the_prompt_text():
+    same = CompiledPrompt("again", MCQ_TEMPLATE, MCQQuestion)
+    edited = CompiledPrompt("mcq", MCQ_TEMPLATE + " Be concise.", MCQQuestion)
+    other_system = CompiledPrompt("mcq", MCQ_TEMPLATE, MCQQuestion, system="Be brief.")
+
+    assert same.fingerprint == MCQ_PROMPT.fingerprint
+    assert len({MCQ_PROMPT.fingerprint, edited.fingerprint, other_system.fingerprint}) == 3
+
+
+def test_render_reuses_the_static_system_message():
+    first = MCQ_PROMPT.render(topic="Python", difficulty="Easy")
+    second = MCQ_PROMPT.render("\nAvoid: X", topic="Docker", difficulty="Hard")
+
+    assert first[0] is second[0] and first[0].content == SYSTEM_PROMPT
+    assert MCQ_PROMPT.variables == ("difficulty", "topic")
+    # The schema's braces survive formatting verbatim
+    assert first[1].content.endswith(f"JSON schema: {MCQ_PROMPT.schema}")
+    assert "a Hard multiple-choice question about the topic: Docker." in second[1].content
+    assert second[1].content.endswith("\nAvoid: X")
+
+
+def test_generator_sends_the_compiled_prompt(generator, scripted_model):
+    reply = '{"question": "Python is a ___ language.", "answer": "dynamic", "explanation": "It is."}'
+    llm = scripted_model(reply)
+
+    generator(llm).generate_fill_blank("Python", "Easy")
+
+    assert llm.prompts == [FILL_BLANK_PROMPT.render(topic="Python", difficulty="Easy")[1].content]
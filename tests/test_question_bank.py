@@ -0,0 +1,81 @@
+from src.bank.question_bank import BankWarmupWorker, QuestionBank
+from src.common.helpers import QuizManager
+
+MCQ = "Multiple Choice"
+
+TEXTS = [
+    "Which keyword starts a function definition in Python source code?",
+    "What does the GIL serialize inside the CPython interpreter process?",
+    "Which builtin returns the number of items held by a list object?",
+    "What exception is raised when a dictionary lookup misses its key?",
+]
+
+
+def record(text: str) -> dict:
+    return {
+        "type": "MCQ", "question": text, "options": ["a", "b", "c", "d"], "correct_answer": "a",
+        "explanation": "Because.", "difficulty": "Easy",
+    }
+
+
+def stocked_bank(texts=TEXTS, **kwargs) -> QuestionBank:
+    bank = QuestionBank(low_watermark=kwargs.pop("low_watermark", 1), **kwargs)
+    bank.add(MCQ, "Python", "Easy", [record(t) for t in texts])
+    return bank
+
+
+def test_records_the_session_already_saw_stay_in_the_bank(generator):
+    bank = stocked_bank()
+    manager = QuizManager()
+    # A previous quiz of this session already showed the second question
+    manager.dedup_index.add(TEXTS[1], 0)
+
+    manager.generate_questions(generator(), "Python", MCQ, "Easy", 2, bank=bank)
+
+    assert [q["question"] for q in manager.questions] == [TEXTS[0], TEXTS[2]]
+    # The skipped record is still there for the next session, in its place
+    assert [r["question"] for r in bank.take(MCQ, "Python", "Easy", 10)] == [TEXTS[1], TEXTS[3]]
+
+
+def test_add_skips_near_duplicates_and_stops_at_the_high_watermark():
+    bank = QuestionBank(low_watermark=1, high_watermark=3)
+
+    kept = bank.add(MCQ, "Python", "Easy", [record(TEXTS[0]), record(TEXTS[0] + "!")] + [record(t) for t in TEXTS[1:]])
+
+    assert kept == 3
+    assert bank.size(MCQ, " python ", "Easy") == 3
+
+
+def test_take_below_the_low_watermark_asks_for_a_refill():
+    bank = stocked_bank(low_watermark=3, high_watermark=10)
+
+    bank.take(MCQ, "Python", "Easy", 1)
+    assert not bank.refill_needed.is_set()
+    assert bank.deficit(MCQ, "Python", "Easy") == 0
+
+    bank.take(MCQ, "Python", "Easy", 1)
+    assert bank.refill_needed.is_set()
+    assert bank.deficit(MCQ, "Python", "Easy") == 8
+
+
+def test_warmup_refills_hot_slots_to_the_high_watermark(generator):
+    bank = QuestionBank(low_watermark=2, high_watermark=6)
+    worker = BankWarmupWorker(bank, generator(), [(MCQ, "Python", "Easy"), ("Fill in the Blank", "Docker", "Hard")],
+                              refill_batch_size=4)
+
+    assert worker.refill_once() == 12
+    assert bank.size(MCQ, "Python", "Easy") == 6
+    assert bank.size("Fill in the Blank", "Docker", "Hard") == 6
+    assert worker.refill_once() == 0
+
+
+def test_quiz_draws_from_the_bank_first(generator, fake_model):
+    bank = stocked_bank()
+    llm = fake_model()
+
+    questions = QuizManager().generate_questions(generator(llm), "Python", MCQ, "Easy", 6, bank=bank)
+
+    assert [q["question"] for q in questions[:4]] == TEXTS
+    assert len(questions) == 6
+    assert llm.calls == 2
+    assert bank.size(MCQ, "Python", "Easy") == 0
@@ -0,0 +1,104 @@
+import pytest
+
+from src.cache import question_cache
+from src.cache.question_cache import InMemoryLRUCache, SQLiteCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(question_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def _make(**kwargs):
+        if request.param == "memory":
+            return InMemoryLRUCache(**kwargs)
+        return SQLiteCache(path=str(tmp_path / "questions.sqlite"), **kwargs)
+    return _make
+
+
+def payload(text: str) -> dict:
+    return {"question": text, "answer": "x", "explanation": "y"}
+
+
+def test_expired_keys_do_not_evict_live_ones(clock, make_cache):
+    cache = make_cache(ttl_seconds=10, max_keys=2, pool_size=1)
+    cache.put("a", payload("a1"))
+    clock.now += 5
+    cache.put("b", payload("b1"))
+    clock.now += 4
+    assert cache.get("a") == payload("a1")  # a is now the most recently used key
+
+    clock.now += 3  # a expired, b is still live
+    cache.put("c", payload("c1"))
+
+    assert cache.get("b") == payload("b1")
+    assert cache.get("c") == payload("c1")
+    assert cache.get("a") is None
+
+
+def test_sqlite_lookup_removes_a_fully_expired_key(clock, tmp_path):
+    cache = SQLiteCache(path=str(tmp_path / "questions.sqlite"), ttl_seconds=10, pool_size=1)
+    cache.put("a", payload("a1"))
+    clock.now += 11
+
+    assert cache.get("a") is None
+    assert cache._conn.execute("SELECT COUNT(*) FROM cache_keys").fetchone()[0] == 0
+
+
+def test_pool_fills_before_serving_and_honours_exclusions(make_cache):
+    cache = make_cache(pool_size=2)
+    cache.put("k", payload("q1"))
+
+    assert cache.get("k") is None  # still filling: a miss, so a new variant gets generated
+    cache.put("k", payload("q1"))  # repeats are not pooled twice
+    assert cache.get("k") is None
+    cache.put("k", payload("q2"))
+
+    assert cache.get("k")["question"] in {"q1", "q2"}
+    assert cache.get("k", exclude={"q1"})["question"] == "q2"
+    assert cache.get("k", exclude={"q1", "q2"}) is None
+
+
+def test_least_recently_used_key_is_evicted(make_cache):
+    cache = make_cache(max_keys=2, pool_size=1)
+    cache.put("a", payload("a1"))
+    cache.put("b", payload("b1"))
+    cache.get("a")
+
+    cache.put("c", payload("c1"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == payload("a1")
+    assert cache.get("c") == payload("c1")
+
+
+def test_cache_key_normalizes_the_topic():
+    from src.cache.question_cache import make_cache_key
+
+    assert make_cache_key("t", "Python  Programming ", "Easy", "m") == make_cache_key("t", "python programming", "easy", "m")
+    assert make_cache_key("t", "Python", "Easy", "m") != make_cache_key("t", "Python", "Easy", "other-model")
+
+
+def test_generator_serves_repeat_topics_from_a_full_pool(generator, fake_model):
+    llm = fake_model()
+    question_generator = generator(llm)
+    question_generator.cache = InMemoryLRUCache(pool_size=2)
+
+    first = [question_generator.generate_mcq("Python", "Easy").question for _ in range(2)]
+    calls = llm.calls
+    again = question_generator.generate_mcq("python", "Easy", exclude={first[0]})
+
+    assert llm.calls == calls
+    assert again.question == first[1]
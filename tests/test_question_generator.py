@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+import pytest
+
+from utils.custom_exception import AppException
+
+
+def mcq(n: int, **overrides) -> dict:
+    options = [f"option {n}-{i}" for i in range(4)]
+    return {"question": f"Batch question number {n} about Python?", "options": options,
+            "correct_answer": options[1], "explanation": "Because.", "difficulty": "Easy", **overrides}
+
+
+def batch(*items) -> str:
+    return json.dumps({"questions": list(items)})
+
+
+def test_batch_keeps_valid_items_and_requests_only_the_missing_ones(generator, scripted_model):
+    llm = scripted_model(
+        batch(mcq(1), mcq(2, correct_answer="B"), mcq(3, options=["a", "b", "c"])),
+        batch(mcq(4), mcq(5), mcq(6)),
+    )
+
+    questions = generator(llm).generate_mcq_batch("Python", "Easy", count=4)
+
+    assert [q.question for q in questions] == [mcq(n)["question"] for n in (1, 2, 4, 5)]
+    # The letter answer was repaired locally, the 3-option item discarded
+    assert questions[1].correct_answer == "option 2-1"
+    assert "Generate 4 DISTINCT" in llm.prompts[0]
+    assert "Generate 2 DISTINCT" in llm.prompts[1]
+
+
+def test_async_batch_returns_a_partial_batch(generator, scripted_model):
+    question_generator = generator(scripted_model(batch(mcq(1)), "not json", batch()))
+
+    questions = asyncio.run(question_generator.agenerate_mcq_batch("Python", "Easy", count=3))
+
+    assert len(questions) == 1
+
+
+def test_batch_with_no_valid_item_fails(generator, scripted_model):
+    question_generator = generator(scripted_model("not json", batch(mcq(1, options=[])), "{}"))
+
+    with pytest.raises(AppException):
+        question_generator.generate_mcq_batch("Python", "Easy", count=2)
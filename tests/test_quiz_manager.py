@@ -0,0 +1,129 @@
+import asyncio
+import json
+import time
+
+from src.common import helpers
+from src.common.helpers import QuizManager
+
+MCQ = "Multiple Choice"
+
+
+class ProviderAuthError(Exception):
+    """Fatal (401): never retried."""
+    status_code = 401
+
+
+class Probe:
+    """
+    Wraps a fake chat model: records the question each call returned (in call
+    order) and the peak number of calls in flight. Later calls answer sooner,
+    so completion order is the reverse of call order.
+    """
+
+    def __init__(self, llm, calls: int, step: float = 0.02, fail_on=()):
+        self.llm = llm
+        self.calls = calls
+        self.step = step
+        self.fail_on = set(fail_on)
+        self.started = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.questions = []
+
+    async def ainvoke(self, input, config=None):
+        call = self.started
+        self.started += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.step * (self.calls - call))
+            if call in self.fail_on:
+                raise ProviderAuthError("invalid api key")
+            response = await self.llm.ainvoke(input, config)
+            self.questions.append((call, json.loads(response.content)["question"]))
+            return response
+        finally:
+            self.in_flight -= 1
+
+
+def test_questions_keep_their_order_and_concurrency_is_bounded(generator, fake_model):
+    probe = Probe(fake_model(), calls=6)
+    manager = QuizManager()
+
+    questions = manager.generate_questions(generator(probe), "Python", MCQ, "Easy", 6, max_concurrency=2)
+
+    assert probe.peak == 2
+    assert [q["question"] for q in questions] == [text for _, text in sorted(probe.questions)]
+
+
+def test_serial_mode_makes_one_call_at_a_time(generator, fake_model):
+    probe = Probe(fake_model(), calls=3, step=0.0)
+
+    QuizManager().generate_questions(generator(probe), "Python", MCQ, "Easy", 3, max_concurrency=1)
+
+    assert probe.peak == 1
+
+
+def test_one_failed_question_does_not_discard_the_others(generator, fake_model):
+    probe = Probe(fake_model(), calls=4, step=0.0, fail_on={2})
+    manager = QuizManager()
+
+    questions = manager.generate_questions(generator(probe), "Python", MCQ, "Easy", 4)
+
+    assert len(questions) == 3
+    assert probe.started == 4  # the fatal error was not retried
+
+
+def test_sync_calls_share_one_event_loop_even_inside_a_running_loop(generator):
+    manager = QuizManager()
+    question_generator = generator()
+
+    manager.generate_questions(question_generator, "Python", MCQ, "Easy", 2)
+    loop = helpers._background_loop()
+
+    async def from_async_code():
+        return manager.generate_questions(question_generator, "Docker", MCQ, "Easy", 2)
+
+    assert len(asyncio.run(from_async_code())) == 2
+    assert helpers._background_loop() is loop and loop.is_running()
+
+
+def test_streamed_quiz_reports_progress_then_each_question(generator, fake_model):
+    manager = QuizManager()
+
+    async def collect():
+        return [e async for e in manager.aiter_questions(
+            generator(fake_model(latency=0.02)), "Python", MCQ, "Easy", 3, stream_tokens=True
+        )]
+
+    events = asyncio.run(collect())
+
+    assert sorted(e.index for e in events if e.kind == "question") == [0, 1, 2]
+    for i in range(3):
+        progress = [e.chars for e in events if e.kind == "progress" and e.index == i]
+        position = next(n for n, e in enumerate(events) if e.kind == "question" and e.index == i)
+        assert progress == sorted(progress) and progress[-1] > 0
+        assert all(n < position for n, e in enumerate(events) if e.kind == "progress" and e.index == i)
+    assert [q["question"] for q in manager.questions] == [
+        e.record["question"] for e in sorted((e for e in events if e.kind == "question"), key=lambda e: e.index)
+    ]
+
+
+def test_iter_questions_yields_before_the_quiz_is_done(generator, fake_model):
+    started = time.perf_counter()
+    arrivals = []
+
+    for event in QuizManager().iter_questions(generator(fake_model(latency=0.05)), "Python", MCQ, "Easy", 4,
+                                              max_concurrency=1):
+        arrivals.append((event.kind, time.perf_counter() - started))
+
+    assert [kind for kind, _ in arrivals] == ["question"] * 4
+    assert arrivals[0][1] < arrivals[-1][1] / 2
+
+
+def test_failed_question_is_reported_as_an_error_event(generator, fake_model):
+    probe = Probe(fake_model(), calls=3, step=0.0, fail_on={1})
+
+    events = list(QuizManager().iter_questions(generator(probe), "Python", MCQ, "Easy", 3))
+
+    assert sorted((e.kind, e.index) for e in events) == [("error", 1), ("question", 0), ("question", 2)]
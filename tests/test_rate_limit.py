@@ -0,0 +1,141 @@
+import asyncio
+import dataclasses
+import time
+
+import pytest
+
+from src.llm.rate_limit import (
+    InProcessBudgetBackend, RateLimitedLLM, RateLimiter, RateLimitTimeout, SQLiteBudgetBackend, current_session,
+)
+from utils.custom_exception import AppException
+
+PROMPT = "Generate a Easy multiple choice question about the topic: Python."
+
+
+def drained_limiter(requests_per_minute: float, **kwargs) -> RateLimiter:
+    """A limiter whose request bucket is empty: calls are granted at the refill rate."""
+    backend = InProcessBudgetBackend()
+    limiter = RateLimiter("test", requests_per_minute=requests_per_minute, backend=backend,
+                          poll_interval=0.01, **kwargs)
+    backend.acquire([("test:requests", requests_per_minute, requests_per_minute / 60, requests_per_minute)])
+    return limiter
+
+
+def test_sessions_are_served_round_robin():
+    limiter = drained_limiter(1200)  # one grant every 50 ms
+    granted = []
+
+    async def call(session: str):
+        current_session.set(session)
+        await limiter.aacquire(PROMPT)
+        granted.append(session)
+
+    async def scenario():
+        busy = [asyncio.create_task(call("busy")) for _ in range(6)]
+        await asyncio.sleep(0.01)  # the busy session queues all its calls first
+        other = [asyncio.create_task(call("other")) for _ in range(2)]
+        await asyncio.gather(*busy, *other)
+
+    asyncio.run(scenario())
+
+    assert len(granted) == 8
+    # The late session gets one grant per round instead of waiting for all six
+    assert granted[:5].count("other") == 2
+
+
+def test_wait_beyond_max_wait_raises_rate_limit_timeout():
+    limiter = drained_limiter(60, max_wait_seconds=0.2)
+
+    with pytest.raises(RateLimitTimeout):
+        asyncio.run(limiter.aacquire(PROMPT))
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(PROMPT)
+
+
+class SlowSQLiteBudgetBackend(SQLiteBudgetBackend):
+    """Every transaction holds the database for a while, as under contention between replicas."""
+
+    def _transaction(self, buckets, commit_if):
+        time.sleep(0.1)
+        return super()._transaction(buckets, commit_if)
+
+
+def test_shared_backend_does_not_block_the_event_loop(fake_model, tmp_path):
+    limiter = RateLimiter("test", requests_per_minute=600, tokens_per_minute=100_000,
+                          backend=SlowSQLiteBudgetBackend(str(tmp_path / "budget.sqlite")))
+    llm = RateLimitedLLM(fake_model(), limiter)
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(llm.ainvoke(PROMPT), llm.ainvoke(PROMPT))
+        task.cancel()
+
+    asyncio.run(scenario())
+
+    # Acquire + reconcile take >= 0.2 s per call; the loop kept running meanwhile
+    assert len(ticks) > 10
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.08
+
+
+def test_call_timeout_starts_after_budget_is_granted(generator, fake_model):
+    limiter = drained_limiter(600)  # 100 ms between grants, longer than the call timeout
+    question_generator = generator(RateLimitedLLM(fake_model(latency=0.01), limiter, timeout=0.05))
+    question_generator.retry_policy = dataclasses.replace(question_generator.retry_policy, timeout=0.05, max_attempts=1)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(question_generator.agenerate_mcq("Python", "Easy") for _ in range(5)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+
+    assert not [r for r in results if isinstance(r, Exception)]
+
+
+def test_call_timeout_still_bounds_the_provider_call(fake_model):
+    llm = RateLimitedLLM(fake_model(latency=0.5), RateLimiter("test", requests_per_minute=600), timeout=0.05)
+
+    async def stream():
+        async for _ in llm.astream(PROMPT):
+            pass
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(llm.ainvoke(PROMPT))
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(stream())
+
+
+def test_stream_and_batch_are_limited(fake_model):
+    llm = RateLimitedLLM(fake_model(), drained_limiter(60, max_wait_seconds=0.1))
+
+    with pytest.raises(RateLimitTimeout):
+        list(llm.stream(PROMPT))
+    with pytest.raises(RateLimitTimeout):
+        llm.batch([PROMPT])
+    results = asyncio.run(llm.abatch([PROMPT, PROMPT], return_exceptions=True))
+    assert all(isinstance(r, RateLimitTimeout) for r in results)
+
+
+def test_batch_goes_through_the_limiter(fake_model):
+    limiter = RateLimiter("test", requests_per_minute=3, backend=InProcessBudgetBackend(), max_wait_seconds=0.1)
+    llm = RateLimitedLLM(fake_model(), limiter)
+
+    assert len(llm.batch([PROMPT, PROMPT])) == 2
+    assert len(list(llm.stream(PROMPT))) > 1
+    # Three requests per minute: the budget is spent
+    with pytest.raises(RateLimitTimeout):
+        llm.invoke(PROMPT)
+
+
+def test_unlimited_entry_points_are_refused(fake_model):
+    llm = RateLimitedLLM(fake_model(), RateLimiter("test", requests_per_minute=60))
+
+    with pytest.raises(AppException):
+        llm.generate([[PROMPT]])
+    assert llm.model_name == "fake-quiz"
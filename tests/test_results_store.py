@@ -0,0 +1,123 @@
+import csv
+import threading
+import time
+
+import pytest
+
+from src.storage.export import export_results
+from src.storage.results_store import JSONLResultsStore, SQLiteResultsStore
+
+BACKENDS = {"jsonl": JSONLResultsStore, "sqlite": SQLiteResultsStore}
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def store(request, tmp_path):
+    # Long interval: the tests flush explicitly, the writer thread stays idle
+    store = BACKENDS[request.param](str(tmp_path / f"results.{request.param}"), flush_interval_seconds=60)
+    yield store
+    store.close()
+
+
+def rows(session_id: str, n: int) -> list:
+    return [{"session_id": session_id, "question": f"q{i}", "is_correct": i % 2 == 0} for i in range(n)]
+
+
+def test_failed_write_is_retried_on_next_flush(store, monkeypatch):
+    write_batch = store._write_batch
+    calls = []
+
+    def _flaky(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise OSError("disk full")
+        write_batch(batch)
+
+    monkeypatch.setattr(store, "_write_batch", _flaky)
+    store.append(rows("a", 3))
+    with pytest.raises(OSError):
+        store.flush()
+
+    store.append(rows("b", 2))
+    store.flush()
+
+    assert calls == [3, 5]
+    assert [(r["session_id"], r["question"]) for r in store.iter_rows()] == (
+        [("a", f"q{i}") for i in range(3)] + [("b", f"q{i}") for i in range(2)]
+    )
+
+
+def test_full_batch_is_written_in_the_background(tmp_path):
+    store = JSONLResultsStore(str(tmp_path / "results.jsonl"), batch_size=3, flush_interval_seconds=60)
+    try:
+        store.append(rows("a", 3))
+        deadline = time.monotonic() + 5
+        # `_read` does not flush: only the writer thread can have put the rows there
+        while not list(store._read(None)) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(list(store._read(None))) == 3
+    finally:
+        store.close()
+
+
+def test_concurrent_writers_keep_every_row(store):
+    # A second instance on the same file plays another process/replica
+    other = type(store)(store.path, flush_interval_seconds=60)
+
+    def _write(target, session_id):
+        for _ in range(20):
+            target.append(rows(session_id, 5))
+            target.flush()
+
+    threads = [threading.Thread(target=_write, args=(s, sid)) for s, sid in ((store, "a"), (other, "b"), (store, "c"))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    other.close()
+
+    stored = list(store.iter_rows())
+    assert len(stored) == 300
+    assert len(list(store.iter_rows("b"))) == 100
+
+
+def test_compaction_keeps_rows_appended_during_the_export(store):
+    other = type(store)(store.path, flush_interval_seconds=60)
+    store.append(rows("old", 4))
+
+    def _consume(stored):
+        exported = list(stored)
+        other.append(rows("new", 2))
+        other.flush()
+        return len(exported)
+
+    assert store.compact(_consume) == 4
+    other.close()
+    assert [r["session_id"] for r in store.iter_rows()] == ["new", "new"]
+
+
+def test_failed_compaction_drops_nothing(store):
+    store.append(rows("a", 3))
+
+    def _consume(stored):
+        next(stored)
+        raise OSError("export target unavailable")
+
+    with pytest.raises(OSError):
+        store.compact(_consume)
+
+    assert len(list(store.iter_rows())) == 3
+
+
+def test_export_with_truncate_archives_the_rows(store, tmp_path):
+    store.append(rows("a", 2) + rows("b", 1))
+    output = tmp_path / "export.csv"
+
+    assert export_results(store, str(output), session_id="b") == 1
+    assert len(list(store.iter_rows())) == 3
+
+    assert export_results(store, str(output), truncate=True) == 3
+    with open(output, newline="", encoding="utf-8") as f:
+        exported = list(csv.DictReader(f))
+    assert [r["session_id"] for r in exported] == ["a", "a", "b"]
+    assert list(store.iter_rows()) == []
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from src.generation.repair import repair_locally, repair_payload
+from src.generation.retry import ErrorKind, RetryPolicy, classify_error, retry_after_seconds
+from src.llm.fake_llm import FakeProviderError
+from src.models.schema import FillBlankQuestion, MCQQuestion
+from utils.custom_exception import AppException
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code=None, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+
+class RateLimitError(Exception):
+    """Recognized by class name, like the provider SDKs' errors."""
+
+
+def validation_error() -> ValidationError:
+    try:
+        MCQQuestion(question="Too short?", options=[], correct_answer="", explanation="")
+    except ValidationError as e:
+        return e
+
+
+@pytest.mark.parametrize("error, kind", [
+    (validation_error(), ErrorKind.VALIDATION),
+    (json.JSONDecodeError("bad", "x", 0), ErrorKind.PARSE),
+    (TimeoutError(), ErrorKind.TRANSIENT),
+    (ProviderError(429), ErrorKind.TRANSIENT),
+    (ProviderError(503), ErrorKind.TRANSIENT),
+    (ProviderError(401), ErrorKind.FATAL),
+    (ProviderError(400), ErrorKind.FATAL),
+    (RateLimitError(), ErrorKind.TRANSIENT),
+    (AppException("LLM Generation Final Failure", ProviderError(403)), ErrorKind.FATAL),
+])
+def test_errors_are_classified(error, kind):
+    assert classify_error(error) == kind
+
+
+def test_retry_after_header_is_honoured():
+    assert retry_after_seconds(ProviderError(429, {"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(ProviderError(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(ProviderError(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after_seconds(ProviderError(429)) is None
+
+    policy = RetryPolicy(base_delay=0.01, max_delay=1.0)
+    assert policy.delay(ErrorKind.TRANSIENT, 0, ProviderError(429, {"retry-after": "5"})) == 5.0
+    assert policy.delay(ErrorKind.PARSE, 0) == 0.0
+    assert not policy.should_retry(ErrorKind.FATAL, 0)
+    assert policy.should_retry(ErrorKind.PARSE, 1) and not policy.should_retry(ErrorKind.PARSE, 2)
+
+
+@pytest.mark.parametrize("answer", ["B", "b)", "(B)", "Option B", "B) Lisbon", "lisbon "])
+def test_mcq_answers_are_repaired_to_the_option_text(answer):
+    data = {"options": ["Paris", "Lisbon", "Rome", "Madrid"], "correct_answer": answer}
+
+    assert repair_payload(data, MCQQuestion)["correct_answer"] == "Lisbon"
+
+
+def test_fill_blank_markers_are_normalized():
+    fixed = repair_payload({"question": "Python is a [blank] language.", "answer": "dynamic"}, FillBlankQuestion)
+    inferred = repair_payload({"question": "Python is a dynamic language.", "answer": "dynamic"}, FillBlankQuestion)
+
+    assert fixed["question"] == inferred["question"] == "Python is a ___ language."
+
+
+def test_chatty_output_is_repaired_without_another_call():
+    payload = {"question": "Python is a [blank] language.", "answer": "dynamic", "explanation": "It is."}
+    text = f"Sure! Here it is:\n```json\n{json.dumps(payload)}\n```"
+
+    assert repair_locally(text, FillBlankQuestion).question == "Python is a ___ language."
+    assert repair_locally('{"question": "truncated', FillBlankQuestion) is None
+
+
+VALID_FILL_BLANK = json.dumps({"question": "Python is a ___ language.", "answer": "dynamic", "explanation": "It is."})
+
+
+def test_unrepairable_output_gets_a_short_fixup_call(generator, scripted_model):
+    llm = scripted_model('{"question": "Python is a ___ language.", "answer": "dynamic"}', VALID_FILL_BLANK)
+
+    question = generator(llm).generate_fill_blank("Python", "Easy")
+
+    assert question.answer == "dynamic"
+    assert len(llm.prompts) == 2
+    assert "rejected by the validator" in llm.prompts[1]
+
+
+def test_fatal_errors_are_not_retried(generator, scripted_model):
+    llm = scripted_model(ProviderError(401), VALID_FILL_BLANK)
+
+    with pytest.raises(AppException):
+        generator(llm).generate_fill_blank("Python", "Easy")
+    assert len(llm.prompts) == 1
+
+
+def test_transient_errors_are_retried(generator, scripted_model):
+    llm = scripted_model(FakeProviderError(retry_after=0.0), VALID_FILL_BLANK)
+
+    assert generator(llm).generate_fill_blank("Python", "Easy").answer == "dynamic"
+    assert len(llm.prompts) == 2
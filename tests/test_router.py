@@ -0,0 +1,172 @@
+import asyncio
+import json
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.cache.question_cache import InMemoryLRUCache
+from src.llm.router import LLMRouter
+from src.prompts.builder import MCQ_PROMPT
+from utils.metrics import metrics
+from utils.custom_exception import AppException
+
+PROMPT = "Generate a Medium multiple choice question about the topic: Python."
+
+
+def test_fails_over_to_next_provider(fake_model):
+    router = LLMRouter({"a": fake_model(failure_rate=1.0), "b": fake_model()})
+
+    response = router.invoke(PROMPT)
+
+    decision = router.decisions[-1]
+    assert response.content
+    assert decision.primary == "a"
+    assert decision.served_by == "b"
+    assert decision.failovers == ["b"]
+    assert router.stats["a"].snapshot()["consecutive_failures"] == 1
+
+
+def test_async_failover(fake_model):
+    router = LLMRouter({"a": fake_model(failure_rate=1.0), "b": fake_model()})
+
+    asyncio.run(router.ainvoke(PROMPT))
+
+    assert router.decisions[-1].served_by == "b"
+
+
+def test_all_providers_failing_raises(fake_model):
+    router = LLMRouter({"a": fake_model(failure_rate=1.0), "b": fake_model(failure_rate=1.0)})
+
+    with pytest.raises(AppException):
+        router.invoke(PROMPT)
+
+
+def test_open_circuit_moves_provider_to_last_resort(fake_model):
+    router = LLMRouter({"a": fake_model(failure_rate=1.0), "b": fake_model()}, failure_threshold=2)
+
+    router.invoke(PROMPT)
+    router.invoke(PROMPT)
+    router.invoke(PROMPT)
+
+    decision = router.decisions[-1]
+    assert decision.primary == "b"
+    assert decision.skipped == ["a"]
+    assert decision.failovers == []
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_slow_primary_is_hedged(fake_model, mode):
+    router = LLMRouter({"slow": fake_model(latency=1.0), "fast": fake_model()}, hedge=True, hedge_after_seconds=0.05)
+
+    started = time.perf_counter()
+    if mode == "sync":
+        router.invoke(PROMPT)
+    else:
+        asyncio.run(router.ainvoke(PROMPT))
+    elapsed = time.perf_counter() - started
+
+    decision = router.decisions[-1]
+    assert decision.hedged
+    assert decision.served_by == "fast"
+    assert elapsed < 0.8
+
+
+def test_no_hedge_when_primary_answers_in_time(fake_model):
+    router = LLMRouter({"a": fake_model(), "b": fake_model()}, hedge=True, hedge_after_seconds=0.5)
+
+    asyncio.run(router.ainvoke(PROMPT))
+
+    decision = router.decisions[-1]
+    assert not decision.hedged
+    assert decision.served_by == "a"
+
+
+class ScriptedProvider:
+    """Answers every call with `content` after `delay` seconds (no model name in the response)."""
+
+    def __init__(self, content: str, delay: float = 0.0):
+        self.content = content
+        self.delay = delay
+        self.calls = 0
+
+    def _message(self) -> AIMessage:
+        self.calls += 1
+        return AIMessage(content=self.content,
+                         usage_metadata={"input_tokens": 1000, "output_tokens": 1000, "total_tokens": 2000})
+
+    def invoke(self, input, config=None):
+        time.sleep(self.delay)
+        return self._message()
+
+    async def ainvoke(self, input, config=None):
+        await asyncio.sleep(self.delay)
+        return self._message()
+
+
+def test_hedge_waits_for_a_response_that_validates():
+    router = LLMRouter({"a": ScriptedProvider('{"ok": true}', delay=0.3), "b": ScriptedProvider("not json")},
+                       hedge=True, hedge_after_seconds=0.05)
+
+    response = asyncio.run(router.ainvoke(PROMPT, validate=lambda r: json.loads(r.content)))
+
+    decision = router.decisions[-1]
+    assert decision.hedged
+    assert decision.served_by == "a"
+    assert decision.validated
+    assert response.content == '{"ok": true}'
+
+
+def test_unvalidated_response_is_returned_for_repair():
+    router = LLMRouter({"a": ScriptedProvider("not json"), "b": ScriptedProvider("still not json")})
+
+    response = asyncio.run(router.ainvoke(PROMPT, validate=lambda r: json.loads(r.content)))
+
+    assert response.content == "not json"
+    assert not router.decisions[-1].validated
+
+
+VALID_MCQ = json.dumps({
+    "question": "Which keyword defines a function in Python?",
+    "options": ["def", "func", "lambda", "fn"],
+    "correct_answer": "def",
+    "explanation": "Functions are defined with def.",
+    "difficulty": "Easy",
+})
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_invalid_response_fails_over_to_a_healthy_provider(mode):
+    router = LLMRouter({"a": ScriptedProvider("not json"), "b": ScriptedProvider('{"ok": true}')})
+    validate = lambda r: json.loads(r.content)
+
+    if mode == "sync":
+        response = router.invoke(PROMPT, validate=validate)
+    else:
+        response = asyncio.run(router.ainvoke(PROMPT, validate=validate))
+
+    decision = router.decisions[-1]
+    assert response.content == '{"ok": true}'
+    assert decision.served_by == "b"
+    assert decision.failovers == ["b"]
+    assert decision.validated
+    assert response.response_metadata["served_by"] == "b"
+
+
+def test_generator_prices_and_caches_by_the_serving_provider(generator):
+    # The primary's answer is unusable, so groq serves the question (the configured provider is fake)
+    groq = ScriptedProvider(VALID_MCQ)
+    question_generator = generator(LLMRouter({"openai": ScriptedProvider("not json at all"), "groq": groq}))
+    question_generator.cache = InMemoryLRUCache(pool_size=1)
+    metrics.reset()
+
+    question = question_generator.generate_mcq("Python", "Easy")
+
+    assert question.correct_answer == "def"
+    costs = metrics.snapshot()["counters"]["llm_cost_usd_total"]
+    assert costs == {'{model="llama-3.1-8b-instant",provider="groq"}': pytest.approx((1000 * 0.05 + 1000 * 0.08) / 1e6)}
+    groq_key = question_generator._cache_key(MCQ_PROMPT, "Python", "Easy", "groq")
+    assert question_generator.cache.get(groq_key)["question"] == question.question
+    # The next request is served from groq's pool
+    assert question_generator.generate_mcq("Python", "Easy").question == question.question
+    assert groq.calls == 1
@@ -0,0 +1,103 @@
+import pickle
+
+import pytest
+
+from src.common.helpers import QuizManager
+from src.models.records import QuizResult, intern_question
+from src.models.schema import FillBlankQuestion, MCQQuestion
+from src.storage import session_store
+from src.storage.session_store import InProcessSessionStore, SQLiteSessionStore
+
+MCQ = {
+    "question": "What is the capital of France?",
+    "options": ["Paris", "Lisbon", "Rome", "Madrid"],
+    "correct_answer": "Paris",
+    "explanation": "It is.",
+    "difficulty": "Easy",
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InProcessSessionStore(idle_ttl_seconds=60)
+    return SQLiteSessionStore(str(tmp_path / "sessions.sqlite"), idle_ttl_seconds=60)
+
+
+def test_the_same_question_is_one_shared_record():
+    record = intern_question(MCQ, "Multiple Choice")
+
+    assert intern_question(MCQQuestion(**MCQ), "Multiple Choice") is record
+    assert intern_question(dict(record)) is record
+    assert pickle.loads(pickle.dumps(record)) is record
+    assert record["type"] == "MCQ" and record.get("answer") is None
+    with pytest.raises(AttributeError):
+        record.question = "Edited?"
+
+
+def test_fill_blank_records_have_no_options_key():
+    record = intern_question(FillBlankQuestion(question="Python is a ___ language.", answer="dynamic",
+                                               explanation=""), "Fill in the Blank")
+
+    assert "options" not in record and record.to_dict()["type"] == "FIB"
+    result = QuizResult(record, "dynamic", True, "2024-01-01 10:00:00")
+    assert result["correct_answer"] == "dynamic"
+    assert result["explanation"] == "Sem explicação disponível."
+
+
+def test_session_survives_a_round_trip_through_the_store(store, generator):
+    manager = QuizManager()
+    manager.generate_questions(generator(), "Python", "Multiple Choice", "Easy", 3)
+    manager.evaluate_quiz([q["correct_answer"] for q in manager.questions[:2]] + ["wrong"])
+
+    store.put(manager.session_id, manager.snapshot())
+    restored = QuizManager.restore(store.get(manager.session_id))
+
+    assert restored.session_id == manager.session_id
+    assert all(a is b for a, b in zip(restored.questions, manager.questions))
+    assert restored.score() == manager.score() == (2, 3, pytest.approx(66.67, abs=0.01))
+    assert [dict(r) for r in restored.results] == [dict(r) for r in manager.results]
+    assert restored.quiz_meta == manager.quiz_meta and restored.last_usage == manager.last_usage
+    # The current quiz's questions are still known to the session's dedup index
+    assert not restored._accept(manager.questions[0]["question"], restored._quiz_serial, final=True)
+
+
+def test_idle_sessions_are_evicted(clock, store):
+    store.put("old", {"session_id": "old"})
+    clock.now += 30
+    store.put("recent", {"session_id": "recent"})
+
+    clock.now += 45
+
+    assert store.get("old") is None
+    assert store.get("recent") == {"session_id": "recent"}
+    assert store.evict_idle() == 0
+
+
+def test_memory_store_evicts_the_least_recently_used_session():
+    store = InProcessSessionStore(max_sessions=2)
+    store.put("a", {})
+    store.put("b", {})
+    store.get("a")
+    store.put("c", {})
+
+    assert len(store) == 2
+    assert store.get("b") is None and store.get("a") == {}
@@ -0,0 +1,28 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SDKS = ["pandas", "numpy", "langchain_groq", "langchain_openai", "groq", "openai", "pyarrow", "streamlit"]
+
+
+def loaded_after(code: str) -> list:
+    script = f"import json, sys\n{code}\nprint(json.dumps([m for m in {SDKS!r} if m in sys.modules]))\n"
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True, cwd=ROOT,
+                         env={**os.environ, "LLM_PROVIDER": "fake"}).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def test_core_modules_import_no_provider_sdk():
+    assert loaded_after(
+        "import src.common.helpers, src.generation.question_generator, src.llm.llm_client"
+    ) == []
+
+
+def test_only_the_configured_provider_is_loaded():
+    assert loaded_after(
+        "from src.llm.llm_client import get_llm_client\n"
+        "get_llm_client(provider='fake').get_llm()"
+    ) == []
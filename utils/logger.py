@@ -1,11 +1,210 @@
+import atexit
+import itertools
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
 from datetime import datetime
 from typing import Optional
 
 LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# LOG_MODE=sync (padrão): comportamento original, escrita direta na thread da requisição
+# LOG_MODE=async: handlers rodam em uma thread dedicada (QueueListener), arquivo gravado em lote
+LOG_MODE = os.getenv("LOG_MODE", "sync").lower()
+# Formato do arquivo no modo async: text (padrão, o mesmo `<dia>.log` do modo
+# sync) ou json (`<dia>.jsonl`, uma linha JSON por registro)
+LOG_FILE_FORMAT = os.getenv("LOG_FILE_FORMAT", "text").lower()
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro (JSON-lines), pronta para ingestão."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class BatchedRotatingFileHandler(logging.Handler):
+    """
+    Grava em lote em `<log_dir>/<AAAA-MM-DD>.<ext>`.
+
+    - Troca de arquivo na virada do dia (o handler antigo nunca rotacionava);
+    - Rotação por tamanho (`max_bytes`) com `backup_count` arquivos .1, .2, ...;
+    - Acumula até `batch_size` registros antes de escrever (WARNING+ força o flush).
+    """
+
+    def __init__(self, log_dir: str, extension: str = "jsonl", max_bytes: int = 50 * 1024 * 1024,
+                 backup_count: int = 5, batch_size: int = 100):
+        super().__init__()
+        self.log_dir = log_dir
+        self.extension = extension
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self._buffer = []
+        self._day = None
+        self._stream = None
+        os.makedirs(log_dir, exist_ok=True)
+
+    def _path(self) -> str:
+        return os.path.join(self.log_dir, f"{self._day}.{self.extension}")
+
+    def _ensure_stream(self) -> None:
+        today = datetime.now().strftime("%Y-%m-%d")
+        if today != self._day or self._stream is None:
+            if self._stream is not None:
+                self._stream.close()
+            self._day = today
+            self._stream = open(self._path(), "a", encoding="utf-8")
+
+    def _rotate(self) -> None:
+        self._stream.close()
+        base = self._path()
+        for i in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{base}.{i}"):
+                os.replace(f"{base}.{i}", f"{base}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(base, f"{base}.1")
+        self._stream = open(base, "w" if self.backup_count == 0 else "a", encoding="utf-8")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buffer.append(self.format(record))
+            if len(self._buffer) >= self.batch_size or record.levelno >= logging.WARNING:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if not self._buffer:
+                return
+            self._ensure_stream()
+            data = "\n".join(self._buffer) + "\n"
+            self._buffer.clear()
+            if self.max_bytes and self._stream.tell() > 0 and self._stream.tell() + len(data) > self.max_bytes:
+                self._rotate()
+            self._stream.write(data)
+            self._stream.flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self.flush()
+        self.acquire()
+        try:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+        finally:
+            self.release()
+        super().close()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Mantém apenas 1 a cada N registros INFO/DEBUG (N = 1/rate); WARNING+ sempre passa.
+    Aplicado na thread da requisição, antes do enfileiramento.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        if self.every == 0:
+            return False
+        return next(self._counter) % self.every == 0
+
+
+def _sample_rates() -> dict:
+    """LOG_SAMPLE_RATES="QuestionGenerator=0.1,src.common.helpers=0.5" -> {nome: taxa}."""
+    rates = {}
+    for item in os.getenv("LOG_SAMPLE_RATES", "").split(","):
+        if "=" in item:
+            name, rate = item.split("=", 1)
+            try:
+                rates[name.strip()] = float(rate)
+            except ValueError:
+                pass
+    return rates
+
+
+class _BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener que descarrega os buffers dos handlers quando a fila fica ociosa."""
+
+    def __init__(self, log_queue, *handlers, flush_interval: float = 1.0):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.flush_interval)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+
+
+_listeners_lock = threading.Lock()
+_listeners: dict = {}
+
+
+def _shared_queue(log_dir: Optional[str]) -> queue.SimpleQueue:
+    """
+    Uma fila + QueueListener por diretório de log, compartilhados por todos os
+    loggers: o custo por chamada na thread da requisição é só um `put`.
+    """
+    with _listeners_lock:
+        entry = _listeners.get(log_dir)
+        if entry is not None:
+            return entry[0]
+
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+        handlers = [console_handler]
+
+        if log_dir:
+            try:
+                as_json = LOG_FILE_FORMAT == "json"
+                file_handler = BatchedRotatingFileHandler(
+                    log_dir,
+                    extension="jsonl" if as_json else "log",
+                    max_bytes=int(os.getenv("LOG_MAX_BYTES", 50 * 1024 * 1024)),
+                    backup_count=int(os.getenv("LOG_BACKUP_COUNT", 5)),
+                    batch_size=int(os.getenv("LOG_BATCH_SIZE", 100)),
+                )
+                file_handler.setFormatter(JsonFormatter() if as_json else logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+                handlers.append(file_handler)
+            except Exception as e:
+                print(f"Aviso: Não foi possível criar arquivo de log em {log_dir}: {e}")
+
+        log_queue = queue.SimpleQueue()
+        listener = _BatchingQueueListener(log_queue, *handlers)
+        listener.start()
+        atexit.register(listener.stop)
+        _listeners[log_dir] = (log_queue, listener)
+        return log_queue
+
+
 def get_logger(
     name: str,
     log_level: int = logging.INFO,
@@ -16,6 +215,9 @@ def get_logger(
     """
     Cria e retorna uma instância de logger configurada para MLOps.
     Redireciona arquivos para /tmp para evitar erros de permissão em containers.
+
+    Com LOG_MODE=async o logger só enfileira registros; console e arquivo são
+    escritos por uma thread dedicada (LOG_FILE_FORMAT=json para JSON-lines).
     """
 
     logger = logging.getLogger(name)
@@ -25,6 +227,14 @@ def get_logger(
     if logger.handlers:
         return logger 
 
+    if LOG_MODE == "async":
+        queue_handler = logging.handlers.QueueHandler(_shared_queue(log_dir))
+        rate = _sample_rates().get(name)
+        if rate is not None and rate < 1:
+            queue_handler.addFilter(SamplingFilter(rate))
+        logger.addHandler(queue_handler)
+        return logger
+
     formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
 
     # 1. Console handler: Essencial para ver logs via 'kubectl logs'
@@ -49,4 +259,4 @@ def get_logger(
             # Fallback: Se mesmo o /tmp falhar, o console handler já está ativo
             print(f"Aviso: Não foi possível criar arquivo de log em {log_dir}: {e}")
 
-    return logger
\ No newline at end of file
+    return logger
@@ -0,0 +1,236 @@
+import bisect
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Buckets (segundos) adequados a chamadas de LLM: de 5 ms a 2 min
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: tuple, extra: Optional[tuple] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class UsageAccumulator:
+    """Soma tokens e custo de um escopo (ex.: um quiz inteiro)."""
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+        self.llm_calls = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "llm_calls": self.llm_calls,
+        }
+
+
+# Acumulador do escopo corrente (propagado para tasks asyncio via contexto)
+current_usage: contextvars.ContextVar = contextvars.ContextVar("current_usage", default=None)
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas em memória (counters + histogramas com labels).
+
+    Exportado em formato texto do Prometheus via `render_prometheus()` e,
+    opcionalmente, replicado para sinks plugáveis (qualquer objeto com
+    `emit(kind, name, value, labels)`).
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self._counters: dict = {}
+        self._histograms: dict = {}
+        self._help: dict = {}
+        self._sinks: list = []
+
+    def describe(self, name: str, text: str) -> None:
+        self._help[name] = text
+
+    def add_sink(self, sink) -> None:
+        self._sinks.append(sink)
+
+    def _emit(self, kind: str, name: str, value: float, labels: dict) -> None:
+        for sink in self._sinks:
+            try:
+                sink.emit(kind, name, value, labels)
+            except Exception:
+                pass
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+        self._emit("counter", name, value, labels)
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self._buckets)
+            histogram.observe(value)
+        self._emit("histogram", name, value, labels)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def record_usage(self, provider: str, model: str, input_tokens: int, output_tokens: int,
+                     pricing: Optional[dict] = None) -> float:
+        """Contabiliza tokens e custo (USD) de uma chamada; devolve o custo."""
+        pricing = pricing or {}
+        cost = (input_tokens * pricing.get("input_per_1m", 0.0) + output_tokens * pricing.get("output_per_1m", 0.0)) / 1e6
+        self.inc("llm_tokens_total", input_tokens, provider=provider, model=model, direction="input")
+        self.inc("llm_tokens_total", output_tokens, provider=provider, model=model, direction="output")
+        self.inc("llm_cost_usd_total", cost, provider=provider, model=model)
+
+        usage = current_usage.get()
+        if usage is not None:
+            usage.input_tokens += input_tokens
+            usage.output_tokens += output_tokens
+            usage.cost_usd += cost
+            usage.llm_calls += 1
+        return cost
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": {
+                    name: {_format_labels(k) or "total": v for k, v in series.items()}
+                    for name, series in self._counters.items()
+                },
+                "histograms": {
+                    name: {
+                        _format_labels(k) or "total": {"count": h.count, "sum": round(h.total, 6)}
+                        for k, h in series.items()
+                    }
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in series.items():
+                    cumulative = 0
+                    for bound, count in zip(h.buckets, h.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', str(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {h.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {h.total}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+class LoggingSink:
+    """Sink simples: cada observação vira uma linha JSON no logger informado."""
+
+    def __init__(self, logger: logging.Logger, level: int = logging.DEBUG):
+        self.logger = logger
+        self.level = level
+
+    def emit(self, kind: str, name: str, value: float, labels: dict) -> None:
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, json.dumps({"metric": name, "kind": kind, "value": value, **labels}))
+
+
+# Registro global do processo
+metrics = MetricsRegistry()
+
+metrics.describe("generation_stage_seconds", "Time per generation stage (prompt_format, provider_call, parse, validate, repair)")
+metrics.describe("llm_attempts_total", "Generation attempts by outcome and error kind")
+metrics.describe("llm_tokens_total", "Provider-reported tokens by direction")
+metrics.describe("llm_cost_usd_total", "Estimated spend in USD from config/llm.yaml pricing")
+metrics.describe("quiz_generation_seconds", "Wall time to produce a full quiz")
+metrics.describe("quiz_time_to_first_question_seconds", "Wall time until the first question is ready")
+metrics.describe("quiz_cost_usd", "Estimated USD spent per quiz")
+
+
+_server_lock = threading.Lock()
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0", registry: MetricsRegistry = metrics):
+    """
+    Sobe (uma única vez por processo) um endpoint HTTP `/metrics` no formato
+    texto do Prometheus, em thread daemon.
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        _server = ThreadingHTTPServer((host, port), _Handler)
+        threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        return _server